@@ -10,20 +10,20 @@ ComicHub CLI - 主入口程序
 配置文件：config.yaml
 """
 
+import time
+_IMPORT_STARTED = time.perf_counter()
+
 import sys
 import logging
-import time
 import re
 from pathlib import Path
 from typing import Optional, List
 import click
-import requests
 
+# selenium / bs4 / psycopg2 / requests 等较重的依赖在首次使用时才导入，
+# list / info 等只读数据库的命令无需启动浏览器
 from comichub.core.config import get_config
-from comichub.core.database import Database
-from comichub.core.fetcher import ManhuaGuiFetcherSelenium
-from comichub.downloader.batch import BatchDownloader
-from comichub.utils.info import InfoTxtGenerator
+from comichub.downloader.storage import is_partial_file
 
 # 配置日志
 logging.basicConfig(
@@ -32,6 +32,8 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+_IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
+
 
 # Telegram 通知和进度日志辅助函数
 def send_telegram_message(bot_token: str, chat_id: str, text: str) -> bool:
@@ -46,6 +48,8 @@ def send_telegram_message(bot_token: str, chat_id: str, text: str) -> bool:
     Returns:
         是否发送成功
     """
+    import requests
+
     try:
         url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
         response = requests.post(url, json={'chat_id': chat_id, 'text': text}, timeout=10)
@@ -73,14 +77,23 @@ def log_progress(log_path: Path, msg: str):
 class ComicHubCLI:
     """ComicHub 命令行接口"""
 
-    def __init__(self, config_path: str = "config.yaml"):
+    def __init__(self, config_path: str = "config.yaml", timings: bool = False):
         """
         初始化 CLI
 
+        数据库和抓取器在首次使用时才创建。
+
         Args:
             config_path: 配置文件路径
+            timings: 是否在结束时输出各组件的启动耗时
         """
+        self.config_path = config_path
+        self.show_timings = timings
+        self.timings = {}
+
+        started = time.perf_counter()
         self.config_loader = get_config(config_path)
+        self.timings['config'] = time.perf_counter() - started
         self.save_path = self.config_loader.get_save_path()
 
         # Telegram 配置
@@ -93,16 +106,45 @@ class ComicHubCLI:
         # 进度日志
         self.progress_log_path = self.config_loader.get_progress_log_path()
 
-        # 初始化数据库
-        try:
-            self.db = Database(config_path)
-            logger.info("数据库初始化成功")
-        except Exception as e:
-            logger.warning(f"数据库初始化失败: {e}")
-            self.db = None
-
-        # 初始化抓取器
-        self.fetcher = ManhuaGuiFetcherSelenium(headless=True)
+        # 数据库和抓取器（懒加载）
+        self._db = None
+        self._db_initialized = False
+        self._fetcher = None
+        self._downloader = None
+
+    @property
+    def db(self):
+        """数据库（首次访问时连接，连接失败返回 None）"""
+        if not self._db_initialized:
+            self._db_initialized = True
+            started = time.perf_counter()
+            try:
+                from comichub.core.database import Database
+                self._db = Database(self.config_path)
+                logger.info("数据库初始化成功")
+            except Exception as e:
+                logger.warning(f"数据库初始化失败: {e}")
+                self._db = None
+            self.timings['database'] = time.perf_counter() - started
+        return self._db
+
+    @property
+    def fetcher(self):
+        """抓取器（首次访问时启动浏览器）"""
+        if self._fetcher is None:
+            started = time.perf_counter()
+            from comichub.core.fetcher import create_fetcher
+            self._fetcher = create_fetcher(headless=True, config_path=self.config_path)
+            self.timings['fetcher'] = time.perf_counter() - started
+        return self._fetcher
+
+    @property
+    def downloader(self):
+        """批量下载器（与 CLI 共用同一个抓取器和数据库连接）"""
+        if self._downloader is None:
+            from comichub.downloader.batch import BatchDownloader
+            self._downloader = BatchDownloader(self.config_path, fetcher=self.fetcher, db=self.db)
+        return self._downloader
 
     def send_notification(self, text: str):
         """发送 Telegram 通知（如果启用）"""
@@ -198,9 +240,7 @@ class ComicHubCLI:
         self.log_progress(log_msg)
 
         try:
-            downloader = BatchDownloader()
-            stats = downloader.download_comic(comic_url, start_chapter, end_chapter, reverse_chapters)
-            downloader.close()
+            stats = self.downloader.download_comic(comic_url, start_chapter, end_chapter, reverse_chapters)
 
             # 记录完成日志
             log_msg = f"下载完成: {stats['comic_name']} - 章节: {stats['downloaded_chapters']}/{stats['total_chapters']}, 图片: {stats['downloaded_images']}/{stats['total_images']}"
@@ -345,12 +385,13 @@ class ComicHubCLI:
         logger.info(f"检查下载完整性: {comic_url}")
 
         try:
-            # 获取漫画信息
-            comic_info = self.fetcher.get_comic_info(comic_url)
-            if not comic_info:
+            # 获取漫画信息和章节列表（一次页面加载）
+            comic_page = self.fetcher.get_comic_page(comic_url)
+            if not comic_page:
                 logger.error(f"无法获取漫画信息: {comic_url}")
                 return {'error': '无法获取漫画信息'}
 
+            comic_info = comic_page['info']
             comic_name = comic_info['name']
             comic_dir_name = re.sub(r'[\\/:*?"<>|]', '', comic_name)
             comic_dir = self.save_path / comic_dir_name
@@ -365,8 +406,7 @@ class ComicHubCLI:
                     'details': []
                 }
 
-            # 获取章节列表
-            chapters = self.fetcher.get_chapters(comic_url)
+            chapters = comic_page['chapters']
             if not chapters:
                 return {'error': '无法获取章节列表'}
 
@@ -402,7 +442,7 @@ class ComicHubCLI:
                     })
                     print(f"❌ 缺失: {chapter_title}")
                 else:
-                    files = list(chapter_dir.glob('*'))
+                    files = [f for f in chapter_dir.glob('*') if not is_partial_file(f)]
                     if not files:
                         result['incomplete_chapters'] += 1
                         result['details'].append({
@@ -447,8 +487,8 @@ class ComicHubCLI:
                                 if expected_count == 0:
                                     # 如果快速方法也失败，使用完整获取（作为最后的后备）
                                     logger.debug(f"快速方法失败，使用完整获取: {chapter_title}")
-                                    result = self.fetcher.get_images(chapter['url'])
-                                    expected_count = result['total_count']
+                                    images_result = self.fetcher.get_images(chapter['url'])
+                                    expected_count = images_result['total_count']
                                     actual_count = len(files)
 
                                 if actual_count < expected_count:
@@ -502,19 +542,43 @@ class ComicHubCLI:
             traceback.print_exc()
             return {'error': str(e)}
 
+    def print_timings(self):
+        """输出各组件的启动耗时"""
+        print(f"\n{'='*60}")
+        print("启动耗时")
+        print(f"{'='*60}")
+        print(f"  模块导入: {_IMPORT_SECONDS * 1000:.0f} ms")
+        for component, seconds in self.timings.items():
+            print(f"  {component}: {seconds * 1000:.0f} ms")
+
     def cleanup(self):
-        """清理资源"""
-        if self.fetcher:
-            self.fetcher.close()
-        if self.db:
-            self.db.close()
+        """清理资源（只关闭已创建的组件）"""
+        if self._downloader:
+            self._downloader.close()
+            self._downloader = None
+        if self._fetcher:
+            self._fetcher.close()
+            self._fetcher = None
+        if self._db:
+            self._db.close()
+            self._db = None
+        if self.show_timings:
+            self.print_timings()
+
+
+def create_app() -> ComicHubCLI:
+    """根据全局选项创建 CLI 实例"""
+    ctx = click.get_current_context(silent=True)
+    options = (ctx.find_root().obj if ctx else None) or {}
+    return ComicHubCLI(timings=options.get('timings', False))
 
 
 # CLI 命令定义
 @click.group(invoke_without_command=True)
 @click.version_option(version='1.0.0', prog_name='comichub')
+@click.option('--timings', is_flag=True, help='结束时输出配置、数据库、抓取器的启动耗时')
 @click.pass_context
-def cli(ctx):
+def cli(ctx, timings: bool):
     """ComicHub - 漫画抓取工具
 
     \b
@@ -526,6 +590,7 @@ def cli(ctx):
       python cli.py info -n "海贼王"              # 查看漫画详情
       python cli.py examples                     # 查看更多使用示例
     """
+    ctx.obj = {'timings': timings}
     if ctx.invoked_subcommand is None:
         click.echo(ctx.get_help())
 
@@ -557,7 +622,7 @@ def search(keyword: str, limit: int, start_chapter: Optional[int], end_chapter:
         print(f"章节范围: {start_chapter or '开始'} - {end_chapter or '结束'}")
     print()
 
-    app = ComicHubCLI()
+    app = create_app()
     try:
         stats = app.search_and_fetch(keyword, limit, start_chapter, end_chapter)
 
@@ -609,7 +674,7 @@ def url(url: str, start_chapter: Optional[int], end_chapter: Optional[int], all:
         print(f"章节范围: {start_chapter or '开始'} - {end_chapter or '结束'}")
     print()
 
-    app = ComicHubCLI()
+    app = create_app()
     try:
         stats = app.fetch_comic_by_url(url, start_chapter, end_chapter, reverse_chapters=all)
 
@@ -647,7 +712,7 @@ def fullsite(pages: int):
         print("已取消")
         return
 
-    app = ComicHubCLI()
+    app = create_app()
     try:
         stats = app.fullsite_fetch(pages)
 
@@ -670,7 +735,7 @@ def list_comics():
     示例：
       python cli.py list
     """
-    app = ComicHubCLI()
+    app = create_app()
     try:
         app.list_comics()
     finally:
@@ -690,7 +755,7 @@ def info(name: str):
       python cli.py info -n "海贼王"
       python cli.py info -n "火影"
     """
-    app = ComicHubCLI()
+    app = create_app()
     try:
         app.show_comic_info(name)
     finally:
@@ -720,7 +785,7 @@ def check(url: str, verify: bool):
     检查完成后，如有问题，重新运行下载命令即可自动修复：
       python cli.py url -u "https://m.manhuagui.com/comic/2592/" --all
     """
-    app = ComicHubCLI()
+    app = create_app()
     try:
         app.check_download_integrity(url, verify=verify)
     finally:
@@ -746,7 +811,7 @@ def test(url: Optional[str], keyword: Optional[str]):
     print("ComicHub 测试模式")
     print(f"{'='*60}\n")
 
-    app = ComicHubCLI()
+    app = create_app()
     try:
         # 默认测试 URL
         if not url:
@@ -804,6 +869,29 @@ def test(url: Optional[str], keyword: Optional[str]):
         app.cleanup()
 
 
+@cli.command(name='clear-profile')
+def clear_profile():
+    """清除持久化浏览器配置目录
+
+    \b
+    删除 browser.profile.dir 下的磁盘缓存和 Cookie。
+    正在被其他进程使用的目录会被跳过。
+
+    \b
+    示例：
+      python cli.py clear-profile
+    """
+    from comichub.core.profile import clear_profiles
+
+    profile_config = get_config().get_browser_config().get('profile', {})
+    profile_dir = profile_config.get('dir', '~/.cache/comichub/chrome-profile')
+
+    cleared, skipped = clear_profiles(profile_dir)
+    print(f"已清除 {cleared} 个配置目录: {profile_dir}")
+    if skipped:
+        print(f"⚠️  {skipped} 个配置目录正在使用，已跳过")
+
+
 @cli.command(name='examples')
 def show_examples():
     """显示详细的使用示例"""
@@ -881,6 +969,12 @@ def show_examples():
   python cli.py test -k "海贼王"
 
 
+🧹 浏览器缓存
+─────────────────────────────────────────────────────────────────────────────
+  # 清除持久化浏览器配置目录（需先在 config.yaml 启用 browser.profile）
+  python cli.py clear-profile
+
+
 💡 使用技巧
 ─────────────────────────────────────────────────────────────────────────────
   • 短选项：-u (url), -k (keyword), -s (start-chapter), -e (end-chapter), -a (all)
@@ -0,0 +1,218 @@
+"""
+资源拦截模块
+通过 Chrome DevTools Protocol 拦截图片、字体、样式表和广告请求，
+只需要 HTML 的页面不再下载这些资源（DOM 中的 img src 属性仍可读取）
+"""
+
+import json
+import logging
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _extension_patterns(*extensions: str) -> List[str]:
+    """
+    生成按扩展名匹配的 URL 模式（Network.setBlockedURLs 支持 * 通配符）
+
+    扩展名必须位于路径末尾或查询串之前，*.png* 之类的子串模式会误伤
+    路径中恰好含有这些字符的页面和脚本。
+    """
+    patterns = []
+    for ext in extensions:
+        patterns.extend([f'*.{ext}', f'*.{ext}?*'])
+    return patterns
+
+
+# 资源类型 -> URL 匹配模式
+RESOURCE_TYPE_PATTERNS = {
+    'image': _extension_patterns('jpg', 'jpeg', 'png', 'gif', 'webp', 'bmp', 'svg', 'ico'),
+    'font': _extension_patterns('woff', 'woff2', 'ttf', 'otf', 'eot'),
+    'stylesheet': _extension_patterns('css'),
+    'media': _extension_patterns('mp4', 'webm', 'mp3'),
+}
+
+# 已知广告/统计域名
+DEFAULT_BLOCKED_HOSTS = [
+    '*googlesyndication.com*',
+    '*doubleclick.net*',
+    '*google-analytics.com*',
+    '*googletagmanager.com*',
+    '*googleadservices.com*',
+    '*hm.baidu.com*',
+    '*cnzz.com*',
+]
+
+# 被拦截请求的预估大小（字节），被拦截的请求没有实际传输量，只能按类型估算
+ESTIMATED_RESOURCE_BYTES = {
+    'Image': 80 * 1024,
+    'Font': 40 * 1024,
+    'Stylesheet': 20 * 1024,
+    'Script': 30 * 1024,
+    'Media': 500 * 1024,
+}
+DEFAULT_ESTIMATED_BYTES = 10 * 1024
+
+
+class ResourceBlocker:
+    """基于 CDP 的资源拦截器"""
+
+    def __init__(self, config: Optional[Dict] = None):
+        """
+        初始化资源拦截器
+
+        Args:
+            config: 拦截配置（browser.block_resources）
+        """
+        config = config or {}
+        self.enabled = config.get('enabled', False)
+        self.types = config.get('types', ['image', 'font', 'stylesheet'])
+        self.url_patterns = config.get('url_patterns', DEFAULT_BLOCKED_HOSTS)
+        self.pages = set(config.get('pages', ['search', 'comic', 'reader']))
+
+        self._applied: Optional[List[str]] = None
+
+        # 累计统计
+        self.total_blocked_requests = 0
+        self.total_blocked_bytes = 0
+
+    def patterns_for(self, page_type: Optional[str]) -> List[str]:
+        """
+        获取页面类型对应的拦截模式
+
+        Args:
+            page_type: 页面类型（search / comic / reader）
+
+        Returns:
+            URL 匹配模式列表
+        """
+        if not self.enabled or page_type not in self.pages:
+            return []
+
+        patterns = []
+        for resource_type in self.types:
+            patterns.extend(RESOURCE_TYPE_PATTERNS.get(resource_type, []))
+        patterns.extend(self.url_patterns)
+        return patterns
+
+    def apply(self, driver, page_type: Optional[str]):
+        """
+        在导航前为页面类型设置拦截规则（规则未变化时不重复下发）
+
+        Args:
+            driver: WebDriver
+            page_type: 页面类型
+        """
+        if not self.enabled:
+            return
+
+        patterns = self.patterns_for(page_type)
+        if patterns == self._applied:
+            return
+
+        try:
+            if self._applied is None:
+                driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+            self._applied = patterns
+        except Exception as e:
+            logger.warning(f"设置资源拦截规则失败: {e}")
+
+    def _collect(self, driver) -> Optional[Tuple[Counter, int]]:
+        """
+        读取并清空 performance 日志，统计被拦截的请求
+
+        requestWillBeSent 提供资源类型，loadingFailed(blockedReason) 表示被拦截，
+        loadingFinished 提供实际传输字节数。
+
+        Returns:
+            (按资源类型计数的被拦截请求, 实际传输字节数)，读取失败时返回 None
+        """
+        try:
+            entries = driver.get_log('performance')
+        except Exception as e:
+            logger.debug(f"读取 performance 日志失败: {e}")
+            return None
+
+        request_types = {}
+        blocked = Counter()
+        transferred_bytes = 0
+
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+
+            method = message.get('method')
+            params = message.get('params', {})
+            if method == 'Network.requestWillBeSent':
+                request_types[params.get('requestId')] = params.get('type', 'Other')
+            elif method == 'Network.loadingFailed' and params.get('blockedReason'):
+                blocked[params.get('type') or request_types.get(params.get('requestId'), 'Other')] += 1
+            elif method == 'Network.loadingFinished':
+                transferred_bytes += int(params.get('encodedDataLength', 0))
+
+        return blocked, transferred_bytes
+
+    def _account(self, blocked: Counter) -> int:
+        """累计被拦截的请求，返回估算节省的字节数"""
+        saved_bytes = sum(ESTIMATED_RESOURCE_BYTES.get(t, DEFAULT_ESTIMATED_BYTES) * n
+                          for t, n in blocked.items())
+        self.total_blocked_requests += sum(blocked.values())
+        self.total_blocked_bytes += saved_bytes
+        return saved_bytes
+
+    def report(self, driver, url: str):
+        """
+        统计并记录本页被拦截的请求数和节省的流量
+
+        Args:
+            driver: WebDriver
+            url: 页面 URL
+        """
+        if not self.enabled:
+            return
+
+        collected = self._collect(driver)
+        if collected is None:
+            return
+        blocked, transferred_bytes = collected
+
+        blocked_count = sum(blocked.values())
+        if not blocked_count:
+            return
+
+        saved_bytes = self._account(blocked)
+        detail = ', '.join(f"{t}: {n}" for t, n in blocked.most_common())
+        logger.info(f"资源拦截: {url} 拦截 {blocked_count} 个请求 ({detail})，"
+                    f"约节省 {saved_bytes / 1024:.0f} KB（估算），实际传输 {transferred_bytes / 1024:.0f} KB")
+
+    def drain(self, driver):
+        """
+        统计翻页等不经过 _request 的导航产生的日志（只计入累计统计，不逐页输出）
+
+        每次导航后清空日志，避免这些请求被算到下一个页面的报告中。
+
+        Args:
+            driver: WebDriver
+        """
+        if not self.enabled:
+            return
+
+        collected = self._collect(driver)
+        if collected is not None:
+            self._account(collected[0])
+
+    def summary(self) -> Dict[str, int]:
+        """
+        获取累计拦截统计
+
+        Returns:
+            {'blocked_requests': int, 'blocked_bytes': int}
+        """
+        return {
+            'blocked_requests': self.total_blocked_requests,
+            'blocked_bytes': self.total_blocked_bytes
+        }
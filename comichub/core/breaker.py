@@ -0,0 +1,350 @@
+"""
+按主机熔断模块
+每个主机一个熔断器（closed / open / half_open）：连续失败达到阈值后打开，
+打开期间该主机的请求暂停等待而不是继续失败；冷却结束后进入半开状态，
+只放行少量探测请求，探测成功即关闭，失败则重新打开并加倍冷却时间。
+浏览器导航、HTTP 抓取和图片下载（线程池与 async 引擎）共用同一组熔断器，
+状态变化通知监听者（下载器写入 fetch_history）
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from comichub.core.config import get_config
+
+logger = logging.getLogger(__name__)
+
+# 熔断器状态
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+# 半开状态下探测名额已满时的轮询间隔（秒）
+PROBE_POLL_INTERVAL = 1.0
+
+# 熔断暂停期间输出进度日志的间隔（秒）
+PAUSE_LOG_INTERVAL = 60.0
+
+
+def is_failure_status(status: int) -> bool:
+    """状态码是否表示主机故障（5xx；429 由限速器处理，4xx 说明主机正常响应）"""
+    return status >= 500
+
+
+def host_of(url: str) -> str:
+    """获取 URL 的主机名"""
+    return urlsplit(url).hostname or url
+
+
+class CircuitBreaker:
+    """单个主机的熔断器（线程安全）"""
+
+    def __init__(self, host: str, failure_threshold: int = 5, open_seconds: float = 30,
+                 max_open_seconds: float = 600, half_open_probes: int = 1,
+                 probe_timeout: float = 120,
+                 on_transition: Optional[Callable[[Dict], None]] = None):
+        """
+        初始化熔断器
+
+        Args:
+            host: 主机名
+            failure_threshold: 连续失败多少次后打开
+            open_seconds: 首次打开的冷却时间（秒）
+            max_open_seconds: 探测连续失败时冷却时间翻倍的上限（秒）
+            half_open_probes: 半开状态允许同时进行的探测请求数
+            probe_timeout: 探测请求超过此时间（秒）未报告结果时释放名额
+            on_transition: 状态变化回调（参数为变化事件字典）
+        """
+        self.host = host
+        self.failure_threshold = max(failure_threshold, 1)
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max(max_open_seconds, open_seconds)
+        self.half_open_probes = max(half_open_probes, 1)
+        self.probe_timeout = probe_timeout
+        self.on_transition = on_transition
+
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.cooldown = open_seconds
+        self.open_until = 0.0
+        # 半开状态下已放行的探测请求的开始时刻
+        self._probes: List[float] = []
+        self._lock = threading.Lock()
+
+        # 统计
+        self.opened = 0
+        self.open_time = 0.0
+        self._opened_at: Optional[float] = None
+
+    def reserve(self) -> float:
+        """
+        请求前检查是否放行
+
+        Returns:
+            需要等待的秒数（0 表示放行）
+        """
+        events = []
+        with self._lock:
+            now = time.monotonic()
+            if self.state == STATE_OPEN:
+                if now < self.open_until:
+                    return self.open_until - now
+                events.append(self._transition(STATE_HALF_OPEN))
+
+            if self.state == STATE_HALF_OPEN:
+                self._probes = [t for t in self._probes if now - t < self.probe_timeout]
+                if len(self._probes) >= self.half_open_probes:
+                    delay = PROBE_POLL_INTERVAL
+                else:
+                    self._probes.append(now)
+                    delay = 0.0
+            else:
+                delay = 0.0
+        self._emit(events)
+        return delay
+
+    def record_success(self):
+        """记录一次成功请求（主机正常响应）"""
+        events = []
+        with self._lock:
+            self.failures = 0
+            if self._probes:
+                self._probes.pop(0)
+            if self.state != STATE_CLOSED:
+                self.cooldown = self.open_seconds
+                self._probes = []
+                events.append(self._transition(STATE_CLOSED))
+        self._emit(events)
+
+    def record_failure(self, error: Optional[str] = None):
+        """
+        记录一次失败请求（连接失败、超时或 5xx）
+
+        Args:
+            error: 错误描述（记录在状态变化事件中）
+        """
+        events = []
+        with self._lock:
+            self.failures += 1
+            if self._probes:
+                self._probes.pop(0)
+            if self.state == STATE_HALF_OPEN:
+                # 探测失败：重新打开并加倍冷却时间
+                self.cooldown = min(self.cooldown * 2, self.max_open_seconds)
+                events.append(self._open(error))
+            elif self.state == STATE_CLOSED and self.failures >= self.failure_threshold:
+                self.cooldown = self.open_seconds
+                events.append(self._open(error))
+        self._emit(events)
+
+    def is_tripped(self) -> bool:
+        """是否处于打开或半开状态（请求会被暂停）"""
+        return self.state != STATE_CLOSED
+
+    def _open(self, error: Optional[str]) -> Dict:
+        """打开熔断器（调用方持有锁）"""
+        self.open_until = time.monotonic() + self.cooldown
+        self._probes = []
+        self.opened += 1
+        event = self._transition(STATE_OPEN)
+        event['error'] = error
+        return event
+
+    def _transition(self, state: str) -> Dict:
+        """切换状态并生成变化事件（调用方持有锁）"""
+        now = time.monotonic()
+        if self.state == STATE_CLOSED:
+            self._opened_at = now
+        elif state == STATE_CLOSED and self._opened_at is not None:
+            self.open_time += now - self._opened_at
+            self._opened_at = None
+
+        event = {
+            'host': self.host,
+            'from': self.state,
+            'to': state,
+            'failures': self.failures,
+            'open_seconds': self.cooldown if state == STATE_OPEN else None,
+            'error': None
+        }
+        self.state = state
+        return event
+
+    def _emit(self, events: List[Dict]):
+        """在锁外通知状态变化"""
+        for event in events:
+            if self.on_transition:
+                self.on_transition(event)
+
+
+class CircuitBreakers:
+    """按主机熔断器集合"""
+
+    def __init__(self, config: Optional[Dict] = None):
+        """
+        初始化熔断器集合
+
+        Args:
+            config: 熔断配置（breaker）
+        """
+        config = config or {}
+        self.enabled = config.get('enabled', True)
+        self.defaults = {
+            'failure_threshold': config.get('failure_threshold', 5),
+            'open_seconds': config.get('open_seconds', 30),
+            'max_open_seconds': config.get('max_open_seconds', 600),
+            'half_open_probes': config.get('half_open_probes', 1),
+            'probe_timeout': config.get('probe_timeout', 120),
+        }
+        self.hosts = config.get('hosts', {})
+
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._listeners: List[Callable[[Dict], None]] = []
+        self._lock = threading.Lock()
+
+        # 累计熔断暂停时间（秒，所有线程和协程之和）
+        self.total_pause = 0.0
+
+    def breaker(self, url: str) -> CircuitBreaker:
+        """获取 URL 所属主机的熔断器"""
+        host = host_of(url)
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                settings = {**self.defaults, **self.hosts.get(host, {})}
+                breaker = CircuitBreaker(host, on_transition=self._notify, **settings)
+                self._breakers[host] = breaker
+            return breaker
+
+    def add_listener(self, listener: Callable[[Dict], None]):
+        """注册状态变化监听者（参数为变化事件字典）"""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[Dict], None]):
+        """移除状态变化监听者"""
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def _notify(self, event: Dict):
+        """记录状态变化日志并通知监听者"""
+        if event['to'] == STATE_OPEN:
+            logger.warning(f"主机 {event['host']} 连续失败 {event['failures']} 次，熔断 "
+                           f"{event['open_seconds']:.0f}s（该主机的请求暂停）: {event['error']}")
+        elif event['to'] == STATE_HALF_OPEN:
+            logger.info(f"主机 {event['host']} 熔断冷却结束，发出探测请求")
+        else:
+            logger.info(f"主机 {event['host']} 已恢复，熔断关闭")
+
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.warning(f"熔断状态监听者出错: {e}")
+
+    def _reserve(self, url: str) -> float:
+        """检查熔断器，返回需要等待的秒数"""
+        if not self.enabled:
+            return 0.0
+        return self.breaker(url).reserve()
+
+    def _add_pause(self, seconds: float):
+        """累计暂停时间"""
+        with self._lock:
+            self.total_pause += seconds
+
+    def wait(self, url: str):
+        """请求前等待主机熔断结束（同步调用方）"""
+        paused = 0.0
+        next_log = PAUSE_LOG_INTERVAL
+        while True:
+            delay = self._reserve(url)
+            if delay <= 0:
+                break
+            time.sleep(delay)
+            paused += delay
+            if paused >= next_log:
+                logger.info(f"主机 {host_of(url)} 熔断中，已暂停 {paused / 60:.1f} 分钟")
+                next_log += PAUSE_LOG_INTERVAL
+        if paused:
+            self._add_pause(paused)
+
+    async def wait_async(self, url: str):
+        """请求前等待主机熔断结束（异步调用方）"""
+        paused = 0.0
+        while True:
+            delay = self._reserve(url)
+            if delay <= 0:
+                break
+            await asyncio.sleep(delay)
+            paused += delay
+        if paused:
+            self._add_pause(paused)
+
+    def record_success(self, url: str):
+        """记录主机正常响应"""
+        if self.enabled:
+            self.breaker(url).record_success()
+
+    def record_failure(self, url: str, error=None):
+        """
+        记录主机故障（连接失败、超时）
+
+        Args:
+            url: 请求 URL
+            error: 异常或错误描述
+        """
+        if self.enabled:
+            self.breaker(url).record_failure(str(error) if error is not None else None)
+
+    def record_status(self, url: str, status: int):
+        """按响应状态码记录（5xx 为故障，其余说明主机正常响应）"""
+        if is_failure_status(status):
+            self.record_failure(url, f"状态码 {status}")
+        else:
+            self.record_success(url)
+
+    def is_tripped(self, url: str) -> bool:
+        """主机是否处于熔断（打开或半开）状态"""
+        if not self.enabled:
+            return False
+        return self.breaker(url).is_tripped()
+
+    def log_stats(self):
+        """在日志中输出熔断统计"""
+        with self._lock:
+            breakers = [b for b in self._breakers.values() if b.opened]
+        for breaker in breakers:
+            logger.info(f"主机 {breaker.host} 熔断 {breaker.opened} 次，累计打开 {breaker.open_time:.0f}s，"
+                        f"当前状态 {breaker.state}")
+        if self.total_pause:
+            logger.info(f"熔断暂停: 累计等待 {self.total_pause:.0f}s")
+
+
+# 全局熔断器集合（阅读站点和图片服务器的所有请求共用）
+_breakers = None
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breakers(config_path: str = "config.yaml") -> CircuitBreakers:
+    """
+    获取全局熔断器集合
+
+    Args:
+        config_path: 配置文件路径
+
+    Returns:
+        CircuitBreakers 实例
+    """
+    global _breakers
+    with _breakers_lock:
+        if _breakers is None:
+            _breakers = CircuitBreakers(get_config(config_path).get_breaker_config())
+        return _breakers
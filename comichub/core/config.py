@@ -48,13 +48,112 @@ class Config:
                 'port': 5432,
                 'database': 'comichub',
                 'user': 'postgres',
-                'password': 'postgres'
+                'password': 'postgres',
+                'statement_timeout': 30,
+                'pool': {
+                    'min': 1,
+                    'max': 8,
+                    'ping_interval': 10
+                },
+                'write_behind': {
+                    'enabled': True,
+                    'batch_size': 500,
+                    'flush_interval': 1.0
+                }
             },
             'fetch': {
                 'concurrent_downloads': 5,
-                'delay': 1,
+                'delay': 0,
                 'retry': 3,
-                'timeout': 30
+                'timeout': 30,
+                'fsync': 'file',
+                'engine': 'threads',
+                'prefetch_chapters': 2,
+                'incremental': True,
+                'max_in_flight': 64,
+                'per_host_limit': 16,
+                'adaptive': {
+                    'enabled': False,
+                    'min': 2,
+                    'max': 20,
+                    'window': 20,
+                    'target_p95': 5.0,
+                    'max_error_rate': 0.1,
+                    'increase': 1,
+                    'decrease_factor': 0.5
+                },
+                'stall': {
+                    'min_bytes_per_second': 2048,
+                    'window': 10
+                },
+                'hedge': {
+                    'enabled': False,
+                    'percentile': 95,
+                    'max_rate': 0.1,
+                    'min_samples': 20,
+                    'window': 200
+                },
+                'queue': {
+                    'lease_seconds': 600,
+                    'max_attempts': 5,
+                    'expiry_margin': 120,
+                    'reresolve_attempts': 2
+                },
+                'mode': 'browser'
+            },
+            'hybrid': {
+                'seed_cookies': True,
+                'pool_size': 4,
+                'timeout': 10,
+                'max_failures': 3,
+                'verify_ssl': True,
+                'ciphers': ''
+            },
+            'browser': {
+                'pool_size': 1,
+                'memory_budget_mb': 2048,
+                'driver_memory_mb': 400,
+                'page_load_strategy': 'eager',
+                'page_cache_ttl': 300,
+                'page_cache_size': 32,
+                'ready_timeouts': {
+                    'search': 10,
+                    'comic': 10,
+                    'reader': 10,
+                    'next_page': 5
+                },
+                'profile': {
+                    'enabled': False,
+                    'dir': '~/.cache/comichub/chrome-profile',
+                    'disk_cache_mb': 256
+                },
+                'block_resources': {
+                    'enabled': True,
+                    'types': ['image', 'font', 'stylesheet'],
+                    'pages': ['search', 'comic', 'reader']
+                }
+            },
+            'reader': {
+                'decode_script': True,
+                'image_host': 'https://i.hamreus.com'
+            },
+            'ratelimit': {
+                'enabled': True,
+                'default': {'rate': 10, 'burst': 20},
+                'hosts': {
+                    'm.manhuagui.com': {'rate': 1, 'burst': 3},
+                    'i.hamreus.com': {'rate': 20, 'burst': 40}
+                },
+                'backoff': {'base': 1.0, 'max': 60.0, 'jitter': True}
+            },
+            'breaker': {
+                'enabled': True,
+                'failure_threshold': 5,
+                'open_seconds': 30,
+                'max_open_seconds': 600,
+                'half_open_probes': 1,
+                'probe_timeout': 120,
+                'hosts': {}
             },
             'logging': {
                 'level': 'INFO',
@@ -98,6 +197,51 @@ class Config:
         """
         return self.config.get('fetch', {})
 
+    def get_browser_config(self) -> Dict[str, Any]:
+        """
+        获取浏览器（WebDriver）配置
+
+        Returns:
+            浏览器配置字典
+        """
+        return self.config.get('browser', {})
+
+    def get_hybrid_config(self) -> Dict[str, Any]:
+        """
+        获取混合抓取（HTTP 优先）配置
+
+        Returns:
+            混合抓取配置字典
+        """
+        return self.config.get('hybrid', {})
+
+    def get_reader_config(self) -> Dict[str, Any]:
+        """
+        获取阅读页解析配置
+
+        Returns:
+            阅读页解析配置字典
+        """
+        return self.config.get('reader', {})
+
+    def get_ratelimit_config(self) -> Dict[str, Any]:
+        """
+        获取按主机限速配置
+
+        Returns:
+            限速配置字典
+        """
+        return self.config.get('ratelimit', {})
+
+    def get_breaker_config(self) -> Dict[str, Any]:
+        """
+        获取按主机熔断配置
+
+        Returns:
+            熔断配置字典
+        """
+        return self.config.get('breaker', {})
+
     def get_logging_config(self) -> Dict[str, Any]:
         """
         获取日志配置
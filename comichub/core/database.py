@@ -3,11 +3,15 @@
 """
 
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
+from psycopg2.pool import ThreadedConnectionPool
+from contextlib import contextmanager
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 import json
 import logging
+import threading
+import time
 from pathlib import Path
 
 from comichub.core.config import get_config
@@ -16,119 +20,284 @@ logger = logging.getLogger(__name__)
 
 
 class Database:
-    """数据库操作类"""
+    """数据库操作类（线程安全：每次操作从连接池取出一个连接，结束后归还）"""
 
     def __init__(self, config_path: str = "config.yaml"):
         """
-        初始化数据库连接
+        初始化数据库连接池
 
         Args:
             config_path: 配置文件路径
         """
         self.config_loader = get_config(config_path)
         self.db_config = self.config_loader.get_database_config()
-        self.conn = None
+        pool_config = self.db_config.get('pool', {})
+        self.min_connections = max(pool_config.get('min', 1), 1)
+        self.max_connections = max(pool_config.get('max', 8), self.min_connections)
+        # 空闲超过此时间（秒）的连接在取出时先探测，服务器重启后自动重连
+        self.ping_interval = pool_config.get('ping_interval', 10)
+        # 单条语句超时（秒，0 表示不限制）
+        self.statement_timeout = self.db_config.get('statement_timeout', 30)
+
+        self.pool: Optional[ThreadedConnectionPool] = None
+        # ThreadedConnectionPool 用尽时直接抛异常，用信号量让调用方排队等待
+        self._slots = threading.BoundedSemaphore(self.max_connections)
+        self._last_used: Dict[int, float] = {}
+        self._stats_lock = threading.Lock()
+
+        # 连接池统计
+        self.checkouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.reconnects = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+
         self.connect()
 
     def connect(self):
-        """建立数据库连接"""
+        """建立数据库连接池"""
+        options = None
+        if self.statement_timeout:
+            options = f"-c statement_timeout={int(self.statement_timeout * 1000)}"
         try:
-            self.conn = psycopg2.connect(
+            self.pool = ThreadedConnectionPool(
+                self.min_connections,
+                self.max_connections,
                 host=self.db_config.get('host', 'localhost'),
                 port=self.db_config.get('port', 5432),
                 database=self.db_config.get('database', 'postgres'),
                 user=self.db_config.get('user', 'postgres'),
-                password=self.db_config.get('password', 'postgres')
+                password=self.db_config.get('password', 'postgres'),
+                options=options
             )
-            logger.info("数据库连接成功")
+            logger.info(f"数据库连接成功 (连接池 {self.min_connections}~{self.max_connections})")
             self.init_tables()
         except Exception as e:
             logger.error(f"数据库连接失败: {e}")
             raise
 
     def close(self):
-        """关闭数据库连接"""
-        if self.conn:
-            self.conn.close()
+        """关闭连接池"""
+        if self.pool:
+            self.log_pool_stats()
+            self.pool.closeall()
+            self.pool = None
             logger.info("数据库连接已关闭")
 
+    @contextmanager
+    def _cursor(self, cursor_factory=None):
+        """
+        取出一个连接执行一次操作：正常结束提交，异常回滚，最后归还连接
+
+        连接已断开（如服务器重启）时直接丢弃，下次取出时新建。
+
+        Args:
+            cursor_factory: 游标类型（如 RealDictCursor）
+
+        Yields:
+            游标
+        """
+        conn = self._checkout()
+        broken = False
+        try:
+            with conn.cursor(cursor_factory=cursor_factory) as cur:
+                yield cur
+            conn.commit()
+        except BaseException:
+            if conn.closed:
+                broken = True
+            else:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    broken = True
+            raise
+        finally:
+            self._checkin(conn, broken)
+
+    def _checkout(self):
+        """从连接池取出连接（池满时等待），空闲较久的连接先探测是否可用"""
+        started = time.monotonic()
+        self._slots.acquire()
+        waited = time.monotonic() - started
+        try:
+            # 服务器重启后池中的连接都已失效，逐个丢弃直到取到可用连接或新建连接
+            while True:
+                conn = self.pool.getconn()
+                if self._usable(conn):
+                    break
+                logger.warning("数据库连接已断开，重新连接")
+                self._last_used.pop(id(conn), None)
+                self.pool.putconn(conn, close=True)
+                with self._stats_lock:
+                    self.reconnects += 1
+        except BaseException:
+            self._slots.release()
+            raise
+
+        with self._stats_lock:
+            self.checkouts += 1
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+        return conn
+
+    def _checkin(self, conn, broken: bool = False):
+        """归还连接（已断开的连接关闭后丢弃）"""
+        with self._stats_lock:
+            self.in_use -= 1
+            if broken:
+                self._last_used.pop(id(conn), None)
+            else:
+                self._last_used[id(conn)] = time.monotonic()
+        try:
+            if self.pool:
+                self.pool.putconn(conn, close=broken or bool(conn.closed))
+        finally:
+            self._slots.release()
+
+    def _usable(self, conn) -> bool:
+        """连接是否可用（新建或最近用过的连接不探测）"""
+        if conn.closed:
+            return False
+        last_used = self._last_used.get(id(conn))
+        if last_used is None or not self.ping_interval:
+            return True
+        if time.monotonic() - last_used <= self.ping_interval:
+            return True
+        return self._ping(conn)
+
+    @staticmethod
+    def _ping(conn) -> bool:
+        """探测连接是否可用"""
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def pool_stats(self) -> Dict[str, float]:
+        """
+        获取连接池统计
+
+        Returns:
+            {'size', 'in_use', 'peak_in_use', 'checkouts', 'avg_wait_ms', 'max_wait_ms', 'reconnects'}
+        """
+        with self._stats_lock:
+            return {
+                'size': self.max_connections,
+                'in_use': self.in_use,
+                'peak_in_use': self.peak_in_use,
+                'checkouts': self.checkouts,
+                'avg_wait_ms': self.wait_seconds / self.checkouts * 1000 if self.checkouts else 0.0,
+                'max_wait_ms': self.max_wait_seconds * 1000,
+                'reconnects': self.reconnects,
+            }
+
+    def log_pool_stats(self):
+        """在日志中输出连接池统计"""
+        stats = self.pool_stats()
+        if not stats['checkouts']:
+            return
+        logger.info(f"数据库连接池: 大小 {stats['size']}, 峰值占用 {stats['peak_in_use']}, "
+                    f"取出 {stats['checkouts']} 次, 平均等待 {stats['avg_wait_ms']:.1f} ms, "
+                    f"最长等待 {stats['max_wait_ms']:.1f} ms, 重连 {stats['reconnects']} 次")
+
     def init_tables(self):
         """初始化数据库表"""
-        cursor = self.conn.cursor()
-
-        # 创建漫画表
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS comics (
-                id SERIAL PRIMARY KEY,
-                name VARCHAR(500) NOT NULL UNIQUE,
-                url VARCHAR(1000) NOT NULL UNIQUE,
-                description TEXT,
-                cover_image VARCHAR(1000),
-                author VARCHAR(200),
-                status VARCHAR(50),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-        """)
-
-        # 创建章节表
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS chapters (
-                id SERIAL PRIMARY KEY,
-                comic_id INTEGER NOT NULL REFERENCES comics(id) ON DELETE CASCADE,
-                chapter_num VARCHAR(100),
-                title VARCHAR(500),
-                url VARCHAR(1000) NOT NULL UNIQUE,
-                page_count INTEGER DEFAULT 0,
-                downloaded BOOLEAN DEFAULT FALSE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(comic_id, chapter_num)
-            );
-        """)
-
-        # 创建图片表
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS images (
-                id SERIAL PRIMARY KEY,
-                chapter_id INTEGER NOT NULL REFERENCES chapters(id) ON DELETE CASCADE,
-                page_num INTEGER NOT NULL,
-                url VARCHAR(1000) NOT NULL,
-                file_path VARCHAR(1000),
-                downloaded BOOLEAN DEFAULT FALSE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(chapter_id, page_num)
-            );
-        """)
-
-        # 创建抓取历史表
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS fetch_history (
-                id SERIAL PRIMARY KEY,
-                comic_id INTEGER REFERENCES comics(id) ON DELETE SET NULL,
-                chapter_id INTEGER REFERENCES chapters(id) ON DELETE SET NULL,
-                fetch_type VARCHAR(50),
-                fetch_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                status VARCHAR(50) NOT NULL,
-                error_msg TEXT,
-                metadata JSONB
-            );
-        """)
-
-        # 创建索引以提高查询性能
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_chapters_comic_id ON chapters(comic_id);
-        """)
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_images_chapter_id ON images(chapter_id);
-        """)
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_fetch_history_comic_id ON fetch_history(comic_id);
-        """)
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_fetch_history_fetch_time ON fetch_history(fetch_time);
-        """)
-
-        self.conn.commit()
+        with self._cursor() as cursor:
+            # 创建漫画表
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS comics (
+                    id SERIAL PRIMARY KEY,
+                    name VARCHAR(500) NOT NULL UNIQUE,
+                    url VARCHAR(1000) NOT NULL UNIQUE,
+                    description TEXT,
+                    cover_image VARCHAR(1000),
+                    author VARCHAR(200),
+                    status VARCHAR(50),
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                );
+            """)
+
+            # 创建章节表
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS chapters (
+                    id SERIAL PRIMARY KEY,
+                    comic_id INTEGER NOT NULL REFERENCES comics(id) ON DELETE CASCADE,
+                    chapter_num VARCHAR(100),
+                    title VARCHAR(500),
+                    url VARCHAR(1000) NOT NULL UNIQUE,
+                    page_count INTEGER DEFAULT 0,
+                    downloaded BOOLEAN DEFAULT FALSE,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE(comic_id, chapter_num)
+                );
+            """)
+
+            # 创建图片表
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS images (
+                    id SERIAL PRIMARY KEY,
+                    chapter_id INTEGER NOT NULL REFERENCES chapters(id) ON DELETE CASCADE,
+                    page_num INTEGER NOT NULL,
+                    url VARCHAR(1000) NOT NULL,
+                    file_path VARCHAR(1000),
+                    downloaded BOOLEAN DEFAULT FALSE,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE(chapter_id, page_num)
+                );
+            """)
+
+            # 图片下载队列字段（页级任务：pending / in_flight / done / failed，带租约和尝试次数）
+            cursor.execute("ALTER TABLE images ADD COLUMN IF NOT EXISTS status VARCHAR(20) DEFAULT 'pending';")
+            cursor.execute("ALTER TABLE images ADD COLUMN IF NOT EXISTS attempts INTEGER DEFAULT 0;")
+            cursor.execute("ALTER TABLE images ADD COLUMN IF NOT EXISTS lease_until TIMESTAMP;")
+            cursor.execute("ALTER TABLE images ADD COLUMN IF NOT EXISTS lease_owner VARCHAR(200);")
+            cursor.execute("ALTER TABLE images ADD COLUMN IF NOT EXISTS last_error TEXT;")
+            # 图片 URL 的解析时间和签名过期时间（过期后重新解析章节）
+            cursor.execute("ALTER TABLE images ADD COLUMN IF NOT EXISTS resolved_at TIMESTAMP;")
+            cursor.execute("ALTER TABLE images ADD COLUMN IF NOT EXISTS expires_at TIMESTAMP;")
+            cursor.execute("""
+                UPDATE images SET status = 'done' WHERE downloaded = TRUE AND status = 'pending';
+            """)
+
+            # 创建抓取历史表
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS fetch_history (
+                    id SERIAL PRIMARY KEY,
+                    comic_id INTEGER REFERENCES comics(id) ON DELETE SET NULL,
+                    chapter_id INTEGER REFERENCES chapters(id) ON DELETE SET NULL,
+                    fetch_type VARCHAR(50),
+                    fetch_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    status VARCHAR(50) NOT NULL,
+                    error_msg TEXT,
+                    metadata JSONB
+                );
+            """)
+
+            # 创建索引以提高查询性能
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_chapters_comic_id ON chapters(comic_id);
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_images_chapter_id ON images(chapter_id);
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_images_chapter_status ON images(chapter_id, status);
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_fetch_history_comic_id ON fetch_history(comic_id);
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_fetch_history_fetch_time ON fetch_history(fetch_time);
+            """)
+
         logger.info("数据库表初始化完成")
 
     def comic_exists(self, url: str) -> Optional[int]:
@@ -141,10 +310,10 @@ class Database:
         Returns:
             漫画ID，如果不存在返回 None
         """
-        cur = self.conn.cursor()
-        cur.execute("SELECT id FROM comics WHERE url = %s", (url,))
-        result = cur.fetchone()
-        return result[0] if result else None
+        with self._cursor() as cur:
+            cur.execute("SELECT id FROM comics WHERE url = %s", (url,))
+            result = cur.fetchone()
+            return result[0] if result else None
 
     def get_comic_by_name(self, name: str) -> Optional[Dict]:
         """
@@ -156,9 +325,9 @@ class Database:
         Returns:
             漫画信息字典
         """
-        cur = self.conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute("SELECT * FROM comics WHERE name = %s", (name,))
-        return cur.fetchone()
+        with self._cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("SELECT * FROM comics WHERE name = %s", (name,))
+            return cur.fetchone()
 
     def add_comic(self, name: str, url: str, description: str = None,
                   cover_image: str = None, author: str = None, status: str = None) -> int:
@@ -176,26 +345,24 @@ class Database:
         Returns:
             漫画ID
         """
-        cur = self.conn.cursor()
         try:
-            cur.execute("""
-                INSERT INTO comics (name, url, description, cover_image, author, status)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                ON CONFLICT (url) DO UPDATE SET
-                    name = EXCLUDED.name,
-                    description = EXCLUDED.description,
-                    cover_image = EXCLUDED.cover_image,
-                    author = EXCLUDED.author,
-                    status = EXCLUDED.status,
-                    updated_at = CURRENT_TIMESTAMP
-                RETURNING id
-            """, (name, url, description, cover_image, author, status))
-            self.conn.commit()
-            comic_id = cur.fetchone()[0]
-            logger.info(f"漫画已添加/更新: {name} (ID: {comic_id})")
-            return comic_id
+            with self._cursor() as cur:
+                cur.execute("""
+                    INSERT INTO comics (name, url, description, cover_image, author, status)
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                    ON CONFLICT (url) DO UPDATE SET
+                        name = EXCLUDED.name,
+                        description = EXCLUDED.description,
+                        cover_image = EXCLUDED.cover_image,
+                        author = EXCLUDED.author,
+                        status = EXCLUDED.status,
+                        updated_at = CURRENT_TIMESTAMP
+                    RETURNING id
+                """, (name, url, description, cover_image, author, status))
+                comic_id = cur.fetchone()[0]
+                logger.info(f"漫画已添加/更新: {name} (ID: {comic_id})")
+                return comic_id
         except Exception as e:
-            self.conn.rollback()
             logger.error(f"添加漫画失败: {e}")
             raise
 
@@ -213,22 +380,20 @@ class Database:
         Returns:
             章节ID
         """
-        cur = self.conn.cursor()
         try:
-            cur.execute("""
-                INSERT INTO chapters (comic_id, chapter_num, title, url, page_count)
-                VALUES (%s, %s, %s, %s, %s)
-                ON CONFLICT (url) DO UPDATE SET
-                    chapter_num = EXCLUDED.chapter_num,
-                    title = EXCLUDED.title,
-                    page_count = EXCLUDED.page_count
-                RETURNING id
-            """, (comic_id, chapter_num, title, url, page_count))
-            self.conn.commit()
-            chapter_id = cur.fetchone()[0]
-            return chapter_id
+            with self._cursor() as cur:
+                cur.execute("""
+                    INSERT INTO chapters (comic_id, chapter_num, title, url, page_count)
+                    VALUES (%s, %s, %s, %s, %s)
+                    ON CONFLICT (url) DO UPDATE SET
+                        chapter_num = EXCLUDED.chapter_num,
+                        title = EXCLUDED.title,
+                        page_count = EXCLUDED.page_count
+                    RETURNING id
+                """, (comic_id, chapter_num, title, url, page_count))
+                chapter_id = cur.fetchone()[0]
+                return chapter_id
         except Exception as e:
-            self.conn.rollback()
             logger.error(f"添加章节失败: {e}")
             raise
 
@@ -246,20 +411,18 @@ class Database:
         Returns:
             图片ID
         """
-        cur = self.conn.cursor()
         try:
-            cur.execute("""
-                INSERT INTO images (chapter_id, page_num, url, file_path)
-                VALUES (%s, %s, %s, %s)
-                ON CONFLICT (chapter_id, page_num) DO UPDATE SET
-                    url = EXCLUDED.url,
-                    file_path = EXCLUDED.file_path
-                RETURNING id
-            """, (chapter_id, page_num, url, file_path))
-            self.conn.commit()
-            return cur.fetchone()[0]
+            with self._cursor() as cur:
+                cur.execute("""
+                    INSERT INTO images (chapter_id, page_num, url, file_path)
+                    VALUES (%s, %s, %s, %s)
+                    ON CONFLICT (chapter_id, page_num) DO UPDATE SET
+                        url = EXCLUDED.url,
+                        file_path = EXCLUDED.file_path
+                    RETURNING id
+                """, (chapter_id, page_num, url, file_path))
+                return cur.fetchone()[0]
         except Exception as e:
-            self.conn.rollback()
             logger.error(f"添加图片记录失败: {e}")
             raise
 
@@ -270,14 +433,12 @@ class Database:
         Args:
             chapter_id: 章节ID
         """
-        cur = self.conn.cursor()
         try:
-            cur.execute("""
-                UPDATE chapters SET downloaded = TRUE WHERE id = %s
-            """, (chapter_id,))
-            self.conn.commit()
+            with self._cursor() as cur:
+                cur.execute("""
+                    UPDATE chapters SET downloaded = TRUE WHERE id = %s
+                """, (chapter_id,))
         except Exception as e:
-            self.conn.rollback()
             logger.error(f"标记章节下载状态失败: {e}")
 
     def mark_image_downloaded(self, image_id: int, file_path: str):
@@ -288,16 +449,335 @@ class Database:
             image_id: 图片ID
             file_path: 文件路径
         """
-        cur = self.conn.cursor()
         try:
-            cur.execute("""
-                UPDATE images SET downloaded = TRUE, file_path = %s WHERE id = %s
-            """, (file_path, image_id))
-            self.conn.commit()
+            with self._cursor() as cur:
+                cur.execute("""
+                    UPDATE images SET downloaded = TRUE, file_path = %s WHERE id = %s
+                """, (file_path, image_id))
         except Exception as e:
-            self.conn.rollback()
             logger.error(f"标记图片下载状态失败: {e}")
 
+    def enqueue_images(self, chapter_id: int, images: List[Dict]):
+        """
+        批量登记章节图片任务（已存在的页只更新 URL 和路径，不改变状态）
+
+        URL 变化时记录新的解析时间和过期时间，URL 未变时保留原值。
+
+        Args:
+            chapter_id: 章节ID
+            images: [{'page': int, 'url': str, 'file_path': str, 'expires': float}, ...]
+                    （expires 为签名过期的 Unix 时间戳，可选）
+        """
+        if not images:
+            return
+        try:
+            with self._cursor() as cur:
+                execute_values(cur, """
+                    INSERT INTO images (chapter_id, page_num, url, file_path, resolved_at, expires_at)
+                    VALUES %s
+                    ON CONFLICT (chapter_id, page_num) DO UPDATE SET
+                        resolved_at = CASE WHEN images.url IS DISTINCT FROM EXCLUDED.url
+                                           THEN EXCLUDED.resolved_at ELSE images.resolved_at END,
+                        expires_at = CASE WHEN images.url IS DISTINCT FROM EXCLUDED.url
+                                          THEN EXCLUDED.expires_at ELSE images.expires_at END,
+                        url = EXCLUDED.url,
+                        file_path = EXCLUDED.file_path
+                """, [(chapter_id, img['page'], img['url'], img['file_path'], img.get('expires'))
+                      for img in images],
+                    template="(%s, %s, %s, %s, CURRENT_TIMESTAMP, to_timestamp(%s::double precision))")
+        except Exception as e:
+            logger.error(f"登记图片任务失败: {e}")
+            raise
+
+    def lease_images(self, chapter_id: int, owner: str, lease_seconds: int,
+                     max_attempts: int) -> List[Dict]:
+        """
+        租用章节中待下载的图片任务
+
+        可租用：pending、租约已过期的 in_flight、尝试次数未达上限的 failed。
+
+        Args:
+            chapter_id: 章节ID
+            owner: 租约持有者标识
+            lease_seconds: 租约时长（秒）
+            max_attempts: 最大尝试次数
+
+        Returns:
+            已租用的图片列表（按页码排序）
+        """
+        try:
+            with self._cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute("""
+                    UPDATE images SET
+                        status = 'in_flight',
+                        attempts = attempts + 1,
+                        lease_owner = %s,
+                        lease_until = CURRENT_TIMESTAMP + make_interval(secs => %s)
+                    WHERE id IN (
+                        SELECT id FROM images
+                        WHERE chapter_id = %s AND (
+                            status = 'pending'
+                            OR (status = 'in_flight' AND lease_until < CURRENT_TIMESTAMP)
+                            OR (status = 'failed' AND attempts < %s)
+                        )
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    RETURNING *
+                """, (owner, lease_seconds, chapter_id, max_attempts))
+                rows = cur.fetchall()
+                return sorted(rows, key=lambda row: row['page_num'])
+        except Exception as e:
+            logger.error(f"租用图片任务失败: {e}")
+            raise
+
+    def renew_leases(self, image_ids: List[int], owner: str, lease_seconds: int) -> int:
+        """
+        为仍在下载的图片任务续约（只更新本持有者的 in_flight 任务）
+
+        Args:
+            image_ids: 图片ID列表
+            owner: 租约持有者标识
+            lease_seconds: 新的租约时长（秒，从当前时刻起算）
+
+        Returns:
+            续约的任务数
+        """
+        if not image_ids:
+            return 0
+        try:
+            with self._cursor() as cur:
+                cur.execute("""
+                    UPDATE images SET lease_until = CURRENT_TIMESTAMP + make_interval(secs => %s)
+                    WHERE id = ANY(%s) AND status = 'in_flight' AND lease_owner = %s
+                """, (lease_seconds, list(image_ids), owner))
+                return cur.rowcount
+        except Exception as e:
+            logger.error(f"续约图片任务失败: {e}")
+            raise
+
+    def release_leases(self, chapter_id: int, owners: List[str]):
+        """
+        释放指定持有者的租约（持有进程已退出），任务回到 pending
+
+        Args:
+            chapter_id: 章节ID
+            owners: 租约持有者标识列表
+        """
+        if not owners:
+            return
+        try:
+            with self._cursor() as cur:
+                cur.execute("""
+                    UPDATE images SET status = 'pending', lease_until = NULL, lease_owner = NULL
+                    WHERE chapter_id = %s AND status = 'in_flight' AND lease_owner = ANY(%s)
+                """, (chapter_id, owners))
+        except Exception as e:
+            logger.error(f"释放图片租约失败: {e}")
+
+    def get_lease_owners(self, chapter_id: int) -> List[str]:
+        """
+        获取章节中未完成任务的租约持有者
+
+        Args:
+            chapter_id: 章节ID
+
+        Returns:
+            持有者标识列表
+        """
+        with self._cursor() as cur:
+            cur.execute("""
+                SELECT DISTINCT lease_owner FROM images
+                WHERE chapter_id = %s AND status = 'in_flight' AND lease_owner IS NOT NULL
+            """, (chapter_id,))
+            return [row[0] for row in cur.fetchall()]
+
+    def reset_images(self, image_ids: List[int]):
+        """
+        将图片任务重置为 pending（如已完成但本地文件丢失）
+
+        Args:
+            image_ids: 图片ID列表
+        """
+        if not image_ids:
+            return
+        try:
+            with self._cursor() as cur:
+                cur.execute("""
+                    UPDATE images SET status = 'pending', downloaded = FALSE, attempts = 0,
+                        lease_until = NULL, lease_owner = NULL
+                    WHERE id = ANY(%s)
+                """, (image_ids,))
+        except Exception as e:
+            logger.error(f"重置图片任务失败: {e}")
+
+    def complete_image(self, image_id: int):
+        """
+        标记图片任务完成
+
+        Args:
+            image_id: 图片ID
+        """
+        try:
+            with self._cursor() as cur:
+                cur.execute("""
+                    UPDATE images SET status = 'done', downloaded = TRUE, lease_until = NULL,
+                        lease_owner = NULL, last_error = NULL
+                    WHERE id = %s
+                """, (image_id,))
+        except Exception as e:
+            logger.error(f"标记图片完成失败: {e}")
+
+    def expire_image(self, image_id: int):
+        """
+        标记图片 URL 已失效（CDN 返回 403/410），任务回到 pending 并在下次运行重新解析
+
+        Args:
+            image_id: 图片ID
+        """
+        try:
+            self.write_batch(expired_images=[image_id])
+        except Exception as e:
+            logger.error(f"标记图片 URL 失效失败: {e}")
+
+    def fail_image(self, image_id: int, error_msg: str):
+        """
+        标记图片任务失败（尝试次数未达上限时下次运行会重新租用）
+
+        Args:
+            image_id: 图片ID
+            error_msg: 错误信息
+        """
+        try:
+            with self._cursor() as cur:
+                cur.execute("""
+                    UPDATE images SET status = 'failed', lease_until = NULL, lease_owner = NULL,
+                        last_error = %s
+                    WHERE id = %s
+                """, (error_msg, image_id))
+        except Exception as e:
+            logger.error(f"标记图片失败状态失败: {e}")
+
+    def write_batch(self, done_images: List[int] = None, failed_images: List[tuple] = None,
+                    downloaded_chapters: List[int] = None, fetch_history: List[Dict] = None,
+                    expired_images: List[int] = None) -> int:
+        """
+        在一个事务中批量写入下载状态（多行 execute_values，一次提交）
+
+        Args:
+            done_images: 已完成的图片ID列表
+            failed_images: [(图片ID, 错误信息), ...]
+            downloaded_chapters: 已下载的章节ID列表
+            fetch_history: add_fetch_history 参数字典列表
+            expired_images: URL 已失效（403/410）的图片ID列表
+
+        Returns:
+            写入的行数
+
+        Raises:
+            写入失败时整批回滚并抛出异常，由调用方决定是否重试
+        """
+        rows = 0
+        with self._cursor() as cur:
+            if done_images:
+                execute_values(cur, """
+                    UPDATE images SET status = 'done', downloaded = TRUE, lease_until = NULL,
+                        lease_owner = NULL, last_error = NULL
+                    FROM (VALUES %s) AS v(id)
+                    WHERE images.id = v.id
+                """, [(image_id,) for image_id in done_images])
+                rows += len(done_images)
+            if failed_images:
+                execute_values(cur, """
+                    UPDATE images SET status = 'failed', lease_until = NULL, lease_owner = NULL,
+                        last_error = v.error_msg
+                    FROM (VALUES %s) AS v(id, error_msg)
+                    WHERE images.id = v.id
+                """, failed_images)
+                rows += len(failed_images)
+            if expired_images:
+                # URL 失效不计入尝试次数，回到 pending 并标记过期，下次运行重新解析章节
+                cur.execute("""
+                    UPDATE images SET status = 'pending', attempts = GREATEST(attempts - 1, 0),
+                        lease_until = NULL, lease_owner = NULL, last_error = 'URL 已失效',
+                        expires_at = CURRENT_TIMESTAMP
+                    WHERE id = ANY(%s)
+                """, (list(expired_images),))
+                rows += len(expired_images)
+            if downloaded_chapters:
+                cur.execute("UPDATE chapters SET downloaded = TRUE WHERE id = ANY(%s)",
+                            (list(downloaded_chapters),))
+                rows += len(downloaded_chapters)
+            if fetch_history:
+                execute_values(cur, """
+                    INSERT INTO fetch_history (comic_id, chapter_id, fetch_type, status, error_msg, metadata)
+                    VALUES %s
+                """, [(
+                    entry.get('comic_id'),
+                    entry.get('chapter_id'),
+                    entry.get('fetch_type', 'comic'),
+                    entry.get('status', 'success'),
+                    entry.get('error_msg'),
+                    json.dumps(entry['metadata']) if entry.get('metadata') else None
+                ) for entry in fetch_history])
+                rows += len(fetch_history)
+        return rows
+
+    def get_downloaded_page_counts(self, chapter_urls: List[str]) -> Dict[str, int]:
+        """
+        批量获取已标记下载完成的章节页数
+
+        Args:
+            chapter_urls: 章节URL列表
+
+        Returns:
+            {章节URL: 页数}
+        """
+        if not chapter_urls:
+            return {}
+        with self._cursor() as cur:
+            cur.execute("""
+                SELECT url, page_count FROM chapters
+                WHERE url = ANY(%s) AND downloaded = TRUE AND page_count > 0
+            """, (list(chapter_urls),))
+            return {row[0]: row[1] for row in cur.fetchall()}
+
+    def get_recorded_images(self, chapter_urls: List[str], margin_seconds: float = 0) -> Dict[str, Dict]:
+        """
+        批量获取已完整登记图片 URL 的章节（登记页数等于章节页数）
+
+        未完成的页中有 URL 已过期（或将在 margin_seconds 内过期）的章节不返回，由调用方重新解析。
+
+        Args:
+            chapter_urls: 章节URL列表
+            margin_seconds: 过期余量（秒）
+
+        Returns:
+            {章节URL: {'page_count': int, 'images': [{'page': int, 'url': str}, ...]}}
+        """
+        if not chapter_urls:
+            return {}
+        with self._cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("""
+                SELECT c.url AS chapter_url, c.page_count, i.page_num, i.url
+                FROM chapters c
+                JOIN images i ON i.chapter_id = c.id
+                WHERE c.url = ANY(%s) AND c.page_count > 0
+                  AND NOT EXISTS (
+                      SELECT 1 FROM images x
+                      WHERE x.chapter_id = c.id AND x.status <> 'done'
+                        AND x.expires_at <= CURRENT_TIMESTAMP + make_interval(secs => %s)
+                  )
+                ORDER BY c.url, i.page_num
+            """, (list(chapter_urls), margin_seconds))
+
+            recorded: Dict[str, Dict] = {}
+            for row in cur.fetchall():
+                entry = recorded.setdefault(row['chapter_url'], {'page_count': row['page_count'], 'images': []})
+                entry['images'].append({'page': row['page_num'], 'url': row['url']})
+
+            return {url: entry for url, entry in recorded.items()
+                    if len(entry['images']) == entry['page_count']}
+
     def add_fetch_history(self, comic_id: int = None, chapter_id: int = None,
                           fetch_type: str = "comic", status: str = "success",
                           error_msg: str = None, metadata: Dict = None):
@@ -312,16 +792,14 @@ class Database:
             error_msg: 错误信息
             metadata: 额外元数据
         """
-        cur = self.conn.cursor()
         try:
-            metadata_json = json.dumps(metadata) if metadata else None
-            cur.execute("""
-                INSERT INTO fetch_history (comic_id, chapter_id, fetch_type, status, error_msg, metadata)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """, (comic_id, chapter_id, fetch_type, status, error_msg, metadata_json))
-            self.conn.commit()
+            with self._cursor() as cur:
+                metadata_json = json.dumps(metadata) if metadata else None
+                cur.execute("""
+                    INSERT INTO fetch_history (comic_id, chapter_id, fetch_type, status, error_msg, metadata)
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                """, (comic_id, chapter_id, fetch_type, status, error_msg, metadata_json))
         except Exception as e:
-            self.conn.rollback()
             logger.error(f"添加抓取历史失败: {e}")
 
     def get_comic(self, comic_id: int = None, name: str = None) -> Optional[Dict]:
@@ -335,14 +813,14 @@ class Database:
         Returns:
             漫画信息字典
         """
-        cur = self.conn.cursor(cursor_factory=RealDictCursor)
-        if comic_id:
-            cur.execute("SELECT * FROM comics WHERE id = %s", (comic_id,))
-        elif name:
-            cur.execute("SELECT * FROM comics WHERE name LIKE %s", (f"%{name}%",))
-        else:
-            return None
-        return cur.fetchone()
+        with self._cursor(cursor_factory=RealDictCursor) as cur:
+            if comic_id:
+                cur.execute("SELECT * FROM comics WHERE id = %s", (comic_id,))
+            elif name:
+                cur.execute("SELECT * FROM comics WHERE name LIKE %s", (f"%{name}%",))
+            else:
+                return None
+            return cur.fetchone()
 
     def list_comics(self) -> List[Dict]:
         """
@@ -351,9 +829,9 @@ class Database:
         Returns:
             漫画列表
         """
-        cur = self.conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute("SELECT * FROM comics ORDER BY created_at DESC")
-        return cur.fetchall()
+        with self._cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("SELECT * FROM comics ORDER BY created_at DESC")
+            return cur.fetchall()
 
     def get_chapters(self, comic_id: int) -> List[Dict]:
         """
@@ -365,12 +843,12 @@ class Database:
         Returns:
             章节列表
         """
-        cur = self.conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute(
-            "SELECT * FROM chapters WHERE comic_id = %s ORDER BY chapter_num",
-            (comic_id,)
-        )
-        return cur.fetchall()
+        with self._cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(
+                "SELECT * FROM chapters WHERE comic_id = %s ORDER BY chapter_num",
+                (comic_id,)
+            )
+            return cur.fetchall()
 
     def get_undownloaded_chapters(self, comic_id: int) -> List[Dict]:
         """
@@ -382,12 +860,12 @@ class Database:
         Returns:
             未下载的章节列表
         """
-        cur = self.conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute(
-            "SELECT * FROM chapters WHERE comic_id = %s AND downloaded = FALSE ORDER BY chapter_num",
-            (comic_id,)
-        )
-        return cur.fetchall()
+        with self._cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(
+                "SELECT * FROM chapters WHERE comic_id = %s AND downloaded = FALSE ORDER BY chapter_num",
+                (comic_id,)
+            )
+            return cur.fetchall()
 
     def get_chapters_by_url(self, url: str) -> List[Dict]:
         """
@@ -399,9 +877,9 @@ class Database:
         Returns:
             章节列表
         """
-        cur = self.conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute("SELECT * FROM chapters WHERE url = %s", (url,))
-        return cur.fetchall()
+        with self._cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("SELECT * FROM chapters WHERE url = %s", (url,))
+            return cur.fetchall()
 
     def get_chapter_images(self, chapter_id: int) -> List[Dict]:
         """
@@ -413,12 +891,12 @@ class Database:
         Returns:
             图片列表
         """
-        cur = self.conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute(
-            "SELECT * FROM images WHERE chapter_id = %s ORDER BY page_num",
-            (chapter_id,)
-        )
-        return cur.fetchall()
+        with self._cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(
+                "SELECT * FROM images WHERE chapter_id = %s ORDER BY page_num",
+                (chapter_id,)
+            )
+            return cur.fetchall()
 
     def get_fetched_chapters(self, comic_id: int) -> List[str]:
         """
@@ -430,12 +908,12 @@ class Database:
         Returns:
             章节号列表
         """
-        cur = self.conn.cursor()
-        cur.execute(
-            "SELECT chapter_num FROM chapters WHERE comic_id = %s",
-            (comic_id,)
-        )
-        return [row[0] for row in cur.fetchall()]
+        with self._cursor() as cur:
+            cur.execute(
+                "SELECT chapter_num FROM chapters WHERE comic_id = %s",
+                (comic_id,)
+            )
+            return [row[0] for row in cur.fetchall()]
 
     def get_comic_stats(self, comic_id: int) -> Dict:
         """
@@ -447,25 +925,25 @@ class Database:
         Returns:
             统计信息字典
         """
-        cur = self.conn.cursor()
-        cur.execute("""
-            SELECT
-                COUNT(DISTINCT c.id) as total_chapters,
-                COUNT(DISTINCT CASE WHEN c.downloaded = TRUE THEN c.id END) as downloaded_chapters,
-                COUNT(DISTINCT i.id) as total_images,
-                COUNT(DISTINCT CASE WHEN i.downloaded = TRUE THEN i.id END) as downloaded_images
-            FROM chapters c
-            LEFT JOIN images i ON i.chapter_id = c.id
-            WHERE c.comic_id = %s
-        """, (comic_id,))
-
-        result = cur.fetchone()
-        return {
-            'total_chapters': result[0],
-            'downloaded_chapters': result[1],
-            'total_images': result[2],
-            'downloaded_images': result[3]
-        }
+        with self._cursor() as cur:
+            cur.execute("""
+                SELECT
+                    COUNT(DISTINCT c.id) as total_chapters,
+                    COUNT(DISTINCT CASE WHEN c.downloaded = TRUE THEN c.id END) as downloaded_chapters,
+                    COUNT(DISTINCT i.id) as total_images,
+                    COUNT(DISTINCT CASE WHEN i.downloaded = TRUE THEN i.id END) as downloaded_images
+                FROM chapters c
+                LEFT JOIN images i ON i.chapter_id = c.id
+                WHERE c.comic_id = %s
+            """, (comic_id,))
+
+            result = cur.fetchone()
+            return {
+                'total_chapters': result[0],
+                'downloaded_chapters': result[1],
+                'total_images': result[2],
+                'downloaded_images': result[3]
+            }
 
 
 def get_database(config_path: str = "config.yaml") -> Database:
@@ -0,0 +1,114 @@
+"""
+页面内结构化提取模块
+在页面内执行小段脚本，只返回需要的字段（紧凑 JSON），
+避免每次都序列化整个 DOM (page_source) 再交给 BeautifulSoup 解析
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+from selenium.common.exceptions import WebDriverException
+
+logger = logging.getLogger(__name__)
+
+
+# 阅读页：候选图片 src、页码指示器文本、当前 URL
+READER_STATE_JS = """
+var indicator = document.querySelector('span.manga-page') || document.querySelector('#pageNo');
+var srcs = [];
+for (var i = 0; i < document.images.length; i++) {
+    var img = document.images[i];
+    var src = img.getAttribute('src') || img.getAttribute('data-src') || img.getAttribute('data-original');
+    if (src) srcs.push(src);
+}
+return {indicator: indicator ? indicator.textContent.trim() : null, srcs: srcs, url: location.href};
+"""
+
+# 漫画链接（搜索结果、章节列表）
+COMIC_LINKS_JS = """
+var links = [];
+var anchors = document.querySelectorAll('a[href*="/comic/"]');
+for (var i = 0; i < anchors.length; i++) {
+    var a = anchors[i];
+    links.push({href: a.getAttribute('href'), title: a.getAttribute('title'), text: a.textContent.trim()});
+}
+return links;
+"""
+
+# 漫画详情页：仅截取信息区域的片段（标题、简介、封面、作者/状态字段）
+COMIC_INFO_HTML_JS = """
+var parts = [];
+var selectors = 'h1, meta[name="description"], meta[property="og:image"], #bookIntro, .book-intro, '
+    + '#intro-all, .intro, .thumb img, .book-cover img, .cover img, dl';
+var nodes = document.querySelectorAll(selectors);
+for (var i = 0; i < nodes.length; i++) parts.push(nodes[i].outerHTML);
+var candidates = document.querySelectorAll('span, p, li, div');
+for (var j = 0; j < candidates.length; j++) {
+    var el = candidates[j];
+    var text = el.textContent;
+    if (el.children.length < 5 && text.length < 200 && /作者|状态/.test(text)) parts.push(el.outerHTML);
+}
+return parts.join('\\n');
+"""
+
+# 阅读页：内嵌的打包脚本（整章数据）
+PACKED_SCRIPT_JS = """
+var scripts = document.getElementsByTagName('script');
+for (var i = 0; i < scripts.length; i++) {
+    var text = scripts[i].text || '';
+    if (text.indexOf('p,a,c,k,e,d') !== -1) return text;
+}
+return null;
+"""
+
+
+def _run(driver, script: str, description: str):
+    """执行提取脚本，失败时返回 None"""
+    try:
+        return driver.execute_script(script)
+    except WebDriverException as e:
+        logger.debug(f"页面内提取{description}失败: {e}")
+        return None
+
+
+def extract_reader_state(driver) -> Dict:
+    """
+    提取阅读页当前状态
+
+    Returns:
+        {'indicator': Optional[str], 'srcs': List[str], 'url': str}
+    """
+    state = _run(driver, READER_STATE_JS, "阅读页状态")
+    if not state:
+        return {'indicator': None, 'srcs': [], 'url': ''}
+    return state
+
+
+def extract_comic_links(driver) -> List[Dict]:
+    """
+    提取页面内所有漫画链接
+
+    Returns:
+        [{'href': str, 'title': Optional[str], 'text': str}, ...]
+    """
+    return _run(driver, COMIC_LINKS_JS, "漫画链接") or []
+
+
+def extract_comic_info_html(driver) -> str:
+    """
+    提取漫画详情页信息区域的 HTML 片段
+
+    Returns:
+        HTML 片段（可直接交给 parse_comic_info 解析）
+    """
+    return _run(driver, COMIC_INFO_HTML_JS, "漫画信息") or ''
+
+
+def extract_packed_script(driver) -> Optional[str]:
+    """
+    提取阅读页内嵌的打包脚本
+
+    Returns:
+        脚本文本，未找到返回 None
+    """
+    return _run(driver, PACKED_SCRIPT_JS, "内嵌脚本")
@@ -8,6 +8,7 @@ import logging
 import traceback
 import subprocess
 import os
+from collections import OrderedDict
 from typing import List, Dict, Optional
 from urllib.parse import urljoin
 
@@ -17,6 +18,20 @@ from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.common.by import By
 from bs4 import BeautifulSoup
 
+from comichub.core.blocking import ResourceBlocker
+from comichub.core.breaker import get_circuit_breakers
+from comichub.core.config import get_config
+from comichub.core.extractor import (
+    extract_comic_info_html,
+    extract_comic_links,
+    extract_packed_script,
+    extract_reader_state,
+)
+from comichub.core.profile import acquire_profile_dir
+from comichub.core.ratelimit import get_rate_limiter
+from comichub.core.readiness import PageReadiness
+from comichub.core.unpacker import DEFAULT_IMAGE_HOST, decode_chapter_images
+
 # 设置日志
 logger = logging.getLogger(__name__)
 
@@ -24,21 +39,45 @@ logger = logging.getLogger(__name__)
 class ManhuaGuiFetcherSelenium:
     """漫画柜 Selenium 抓取器（最终修复版：指定 chromedriver 路径）"""
 
-    def __init__(self, headless: bool = True):
+    def __init__(self, headless: bool = True, config_path: str = "config.yaml"):
         """
         初始化抓取器
 
         Args:
             headless: 是否使用无头模式
+            config_path: 配置文件路径
         """
         self.base_url = "https://m.manhuagui.com"
         self.headless = headless
+        self.browser_config = get_config(config_path).get_browser_config()
+        self.reader_config = get_config(config_path).get_reader_config()
+
+        # 按主机限速（全局共用）
+        self.limiter = get_rate_limiter(config_path)
+        # 按主机熔断（全局共用）：站点宕机时暂停导航而不是逐章失败
+        self.breakers = get_circuit_breakers(config_path)
+
+        # 页面就绪判定（显式等待，替代固定 sleep）
+        self.readiness = PageReadiness(self.browser_config.get('ready_timeouts'))
+
+        # 资源拦截（CDP），只需要 HTML 的页面不下载图片/字体/样式表/广告
+        self.blocker = ResourceBlocker(self.browser_config.get('block_resources'))
+
+        # 漫画详情页短时缓存 {url: (时间戳, html)}，信息和章节列表共用一次导航
+        # 按最近使用淘汰，最多保留 page_cache_size 个页面
+        self.page_cache_ttl = self.browser_config.get('page_cache_ttl', 300)
+        self.page_cache_size = max(1, self.browser_config.get('page_cache_size', 32))
+        self._page_cache: OrderedDict = OrderedDict()
         
         # 查找本机 chromedriver
         self.chromedriver_path = self._find_chromedriver()
         
         # WebDriver
         self.driver = None
+
+        # 持久化配置目录（可选）及其文件锁
+        self.profile_dir = None
+        self._profile_lock = None
         
         # 初始化
         self._init_driver()
@@ -95,6 +134,16 @@ class ManhuaGuiFetcherSelenium:
             
             # 窗口大小
             chrome_options.add_argument('--window-size=1920,1080')
+
+            # 页面加载策略（eager：DOMContentLoaded 后即返回，不等待图片等子资源）
+            chrome_options.page_load_strategy = self.browser_config.get('page_load_strategy', 'eager')
+
+            # 持久化配置目录（磁盘缓存、Cookie 跨运行复用）
+            self._apply_profile(chrome_options)
+
+            # 资源拦截统计需要读取 performance 日志
+            if self.blocker.enabled:
+                chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
             
             # 禁用证书验证
             chrome_options.add_argument('--ignore-certificate-errors')
@@ -116,26 +165,82 @@ class ManhuaGuiFetcherSelenium:
         except Exception as e:
             logger.error(f"WebDriver 初始化失败: {e}")
             traceback.print_exc()
+            # 启动失败时释放已占用的配置目录，供后续实例使用
+            if self.driver:
+                try:
+                    self.driver.quit()
+                except Exception:
+                    pass
+                self.driver = None
+            if self._profile_lock:
+                self._profile_lock.release()
+                self._profile_lock = None
+                self.profile_dir = None
             return False
 
-    def _request(self, url: str, wait_time: int = 5):
+    def _apply_profile(self, chrome_options: Options):
+        """
+        启用持久化配置目录（browser.profile.enabled）
+
+        目录被其他进程占用时退回临时配置，不会共用同一目录。
+
+        Args:
+            chrome_options: Chrome 选项
+        """
+        profile_config = self.browser_config.get('profile', {})
+        if not profile_config.get('enabled', False):
+            return
+
+        acquired = acquire_profile_dir(profile_config.get('dir', '~/.cache/comichub/chrome-profile'))
+        if not acquired:
+            logger.warning("没有可用的持久化配置目录，使用临时配置")
+            return
+
+        self.profile_dir, self._profile_lock = acquired
+        cache_bytes = int(profile_config.get('disk_cache_mb', 256)) * 1024 * 1024
+
+        chrome_options.add_argument(f'--user-data-dir={self.profile_dir}')
+        chrome_options.add_argument(f'--disk-cache-dir={self.profile_dir / "cache"}')
+        chrome_options.add_argument(f'--disk-cache-size={cache_bytes}')
+        logger.info(f"使用持久化配置目录: {self.profile_dir}")
+
+    def _request(self, url: str, page_type: Optional[str] = None):
         """
         访问 URL 并返回 Driver
 
+        主机熔断期间暂停等待；导航失败使主机熔断时，等待恢复后重新访问而不是返回失败。
+
         Args:
             url: 请求 URL
-            wait_time: 等待时间
+            page_type: 页面类型（search / comic / reader），用于等待对应的就绪条件
         """
         logger.info(f"请求 URL: {url}")
-        
-        try:
-            # 直接访问
-            self.driver.get(url)
-            time.sleep(wait_time)
-            return self.driver
-        except Exception as e:
-            logger.error(f"请求失败: {url}, 错误: {e}")
-            return None
+
+        while True:
+            try:
+                # 按页面类型设置资源拦截规则
+                self.blocker.apply(self.driver, page_type)
+
+                # 等待主机熔断结束并按主机限速（与 HTTP 路径、图片下载共用），随后访问并等待页面就绪（超时后仍返回，由调用方按实际内容解析）
+                self.breakers.wait(url)
+                self.limiter.wait(url)
+                try:
+                    self.driver.get(url)
+                except Exception as e:
+                    self.breakers.record_failure(url, e)
+                    if self.breakers.is_tripped(url):
+                        logger.error(f"请求失败，等待主机恢复后重试: {url}, 错误: {e}")
+                        continue
+                    raise
+                self.breakers.record_success(url)
+                if page_type:
+                    self.readiness.wait_until_ready(self.driver, page_type)
+
+                self.blocker.report(self.driver, url)
+                return self.driver
+            except Exception as e:
+                logger.error(f"请求失败: {url}, 错误: {e}")
+                return None
 
     def search_comics(self, keyword: str) -> List[Dict]:
         """搜索漫画"""
@@ -145,114 +250,136 @@ class ManhuaGuiFetcherSelenium:
         search_url = urljoin(self.base_url, f"/s/{keyword}")
         
         # 请求
-        driver = self._request(search_url)
+        driver = self._request(search_url, page_type='search')
         if not driver:
             return []
         
-        # 解析页面
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-        comics = []
-        
-        # 查找漫画列表
-        comic_links = soup.select('a[href*="/comic/"]')
-        seen_ids = set()
-        
-        for link in comic_links:
-            href = link.get('href')
-            title = link.get('title') or link.text.strip()
-            
-            # 提取漫画 ID
-            match = re.search(r'/comic/(\d+)/', href)
-            if match:
-                comic_id = match.group(1)
-                
-                # 去重
-                if comic_id not in seen_ids:
-                    seen_ids.add(comic_id)
-                    comics.append({
-                        'id': comic_id,
-                        'name': title,
-                        'url': urljoin(self.base_url, href)
-                    })
+        # 页面内提取漫画链接
+        comics = build_search_results(extract_comic_links(driver), self.base_url)
         
         logger.info(f"搜索到 {len(comics)} 部漫画")
         return comics
 
+    def _get_comic_snapshot(self, comic_url: str) -> Optional[Dict]:
+        """
+        获取漫画详情页的结构化快照（短时缓存，同一 URL 只导航一次）
+
+        Args:
+            comic_url: 漫画URL
+
+        Returns:
+            {'links': List[Dict], 'info_html': str}，请求失败返回 None
+        """
+        cached = self._page_cache.get(comic_url)
+        if cached and time.monotonic() - cached[0] < self.page_cache_ttl:
+            logger.debug(f"使用缓存的漫画页面: {comic_url}")
+            self._page_cache.move_to_end(comic_url)
+            return cached[1]
+
+        # 请求
+        driver = self._request(comic_url, page_type='comic')
+        if not driver:
+            return None
+
+        # 页面内提取章节链接和信息区域片段，不序列化整个 DOM
+        snapshot = {
+            'links': extract_comic_links(driver),
+            'info_html': extract_comic_info_html(driver)
+        }
+        if self.page_cache_ttl > 0:
+            self._cache_page(comic_url, snapshot)
+        return snapshot
+
+    def _cache_page(self, comic_url: str, snapshot: Dict):
+        """
+        缓存漫画页面快照（先清除过期条目，超出容量时淘汰最久未使用的）
+
+        Args:
+            comic_url: 漫画URL
+            snapshot: _get_comic_snapshot 的结果
+        """
+        now = time.monotonic()
+        for url in [url for url, (cached_at, _) in self._page_cache.items()
+                    if now - cached_at >= self.page_cache_ttl]:
+            del self._page_cache[url]
+
+        self._page_cache[comic_url] = (now, snapshot)
+        self._page_cache.move_to_end(comic_url)
+        while len(self._page_cache) > self.page_cache_size:
+            self._page_cache.popitem(last=False)
+
+    def get_comic_page(self, comic_url: str) -> Optional[Dict]:
+        """
+        一次页面加载获取漫画信息和章节列表
+
+        Args:
+            comic_url: 漫画URL
+
+        Returns:
+            {'info': Dict, 'chapters': List[Dict]}，请求失败返回 None
+        """
+        logger.info(f"获取漫画页面: {comic_url}")
+
+        snapshot = self._get_comic_snapshot(comic_url)
+        if snapshot is None:
+            return None
+
+        chapters = build_chapters(snapshot['links'], self.base_url)
+        logger.info(f"获取到 {len(chapters)} 个章节")
+        return {
+            'info': parse_comic_info(snapshot['info_html'], comic_url),
+            'chapters': chapters
+        }
+
     def get_comic_info(self, comic_url: str) -> Optional[Dict]:
         """获取漫画信息"""
         logger.info(f"获取漫画信息: {comic_url}")
         
-        # 请求
-        driver = self._request(comic_url)
-        if not driver:
+        snapshot = self._get_comic_snapshot(comic_url)
+        if snapshot is None:
             return None
         
-        # 解析页面
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-        
-        # 查找标题
-        title = soup.select_one('h1')
-        comic_name = title.text.strip() if title else "未知"
-        
-        # 提取 ID
-        match = re.search(r'/comic/(\d+)/', comic_url)
-        comic_id = match.group(1) if match else None
-        
-        return {
-            'id': comic_id,
-            'name': comic_name,
-            'url': comic_url
-        }
+        # 解析信息区域片段
+        return parse_comic_info(snapshot['info_html'], comic_url)
 
     def get_chapters(self, comic_url: str) -> List[Dict]:
         """获取章节列表"""
         logger.info(f"获取章节列表: {comic_url}")
         
-        # 请求
-        driver = self._request(comic_url)
-        if not driver:
+        snapshot = self._get_comic_snapshot(comic_url)
+        if snapshot is None:
             return []
         
-        # 解析页面
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-        chapters = []
-        
-        # 查找章节链接
-        chapter_links = soup.select('a[href*="/comic/"]')
-        seen_chapters = set()
-        
-        for link in chapter_links:
-            href = link.get('href')
-            match = re.search(r'/(\d+)\.html?$', href)
-            if match:
-                # 从 URL 提取章节标识
-                url_id = match.group(1)
-
-                # 从标题中提取真正的章节号
-                title = link.text.strip()
-                chapter_num_match = re.search(r'第(\d+)[话章节]', title)
-
-                if chapter_num_match:
-                    chapter_num = chapter_num_match.group(1)
-                else:
-                    # 如果无法从标题提取，使用 URL 中的 ID
-                    chapter_num = url_id
-
-                # 去重
-                if chapter_num not in seen_chapters:
-                    seen_chapters.add(chapter_num)
-                    chapters.append({
-                        'chapter_num': chapter_num,
-                        'title': title,
-                        'url': urljoin(self.base_url, href)
-                    })
+        chapters = build_chapters(snapshot['links'], self.base_url)
         
         logger.info(f"获取到 {len(chapters)} 个章节")
         return chapters
 
+    def _decode_images(self, driver) -> Optional[Dict[str, any]]:
+        """
+        从阅读页内嵌脚本直接解码整章图片列表（快速路径）
+
+        Args:
+            driver: 已打开阅读页的 WebDriver
+
+        Returns:
+            与 get_images 相同格式的结果，未启用或解码失败时返回 None
+        """
+        if not self.reader_config.get('decode_script', True):
+            return None
+
+        script = extract_packed_script(driver)
+        if not script:
+            return None
+
+        result = decode_chapter_images(script, self.reader_config.get('image_host', DEFAULT_IMAGE_HOST))
+        if result:
+            logger.info(f"从内嵌脚本解码到 {len(result['images'])} 张图片，总数: {result['total_count']}")
+        return result
+
     def get_images(self, chapter_url: str) -> Dict[str, any]:
         """
-        获取章节图片列表（支持翻页）
+        获取章节图片列表（优先解码内嵌脚本，失败时逐页翻页）
 
         Args:
             chapter_url: 章节URL
@@ -266,11 +393,18 @@ class ManhuaGuiFetcherSelenium:
         logger.info(f"获取章节图片: {chapter_url}")
 
         # 请求
-        driver = self._request(chapter_url, wait_time=5)
+        driver = self._request(chapter_url, page_type='reader')
         if not driver:
             return {'images': [], 'total_count': 0}
 
+        # 快速路径：一次页面加载解码整章图片列表
+        decoded = self._decode_images(driver)
+        if decoded:
+            return decoded
+        logger.info("内嵌脚本解码失败，回退到逐页翻页")
+
         all_images = []  # List[Dict] 存储 {'url': str, 'page': int}
+        seen_urls = set()  # 已收集的图片 URL（去重）
         page_num = 0
         max_pages = 1000  # 设置一个很高的上限，实际由页面指示器控制
         total_images_from_indicator = None  # 从页面指示器获取的总图片数
@@ -282,25 +416,23 @@ class ManhuaGuiFetcherSelenium:
                     alert = self.driver.switch_to.alert
                     logger.info(f"检测到 alert: {alert.text}")
                     alert.accept()
-                    time.sleep(1)
                     break
                 except:
                     pass  # 没有 alert
 
-                # 获取当前页面的图片
-                soup = BeautifulSoup(driver.page_source, 'html.parser')
+                # 页面内提取候选图片 src、页码指示器和当前 URL
+                state = extract_reader_state(driver)
 
                 # 从当前 URL 中提取页码（如果有的话）
-                current_url = driver.current_url
-                current_page_num = self._extract_page_number_from_url(current_url)
+                current_page_num = self._extract_page_number_from_url(state['url'])
 
-                for img in soup.find_all('img'):
-                    src = img.get('src') or img.get('data-src') or img.get('data-original')
-                    if src and ('jpg' in src or 'png' in src or 'jpeg' in src or 'webp' in src):
+                for src in state['srcs']:
+                    if 'jpg' in src or 'png' in src or 'jpeg' in src or 'webp' in src:
                         # 过滤掉无关图片
                         if not any(x in src.lower() for x in ['logo', 'icon', 'banner', 'ad', 'avatar']):
                             # 检查是否已存在（去重）
-                            if not any(img_info['url'] == src for img_info in all_images):
+                            if src not in seen_urls:
+                                seen_urls.add(src)
                                 # 使用当前 URL 中的页码，如果没有则使用列表长度+1
                                 if current_page_num is not None:
                                     page_number = current_page_num
@@ -314,17 +446,9 @@ class ManhuaGuiFetcherSelenium:
 
                 logger.info(f"第 {page_num + 1} 页: 已收集 {len(all_images)} 张图片")
 
-                # 检查页面指示
-                try:
-                    # 优先使用 span.manga-page（包含完整信息如 "1/184P"）
-                    # 回退到 #pageNo（只显示当前页码 "1"）
-                    page_indicator = None
-                    try:
-                        page_indicator = driver.find_element(By.CSS_SELECTOR, 'span.manga-page')
-                    except:
-                        page_indicator = driver.find_element(By.CSS_SELECTOR, '#pageNo')
-
-                    page_text = page_indicator.text
+                # 检查页面指示（span.manga-page 如 "1/184P"，回退到 #pageNo 如 "1"）
+                page_text = state['indicator']
+                if page_text:
                     logger.info(f"页面指示: {page_text}")
 
                     # 解析 "1/184P" 格式
@@ -342,8 +466,6 @@ class ManhuaGuiFetcherSelenium:
                             if current == total:
                                 logger.info(f"已到最后一页: {page_text}")
                                 break
-                except:
-                    pass  # 没有找到页面指示器
 
                 # 尝试点击"下一页"按钮
                 try:
@@ -354,10 +476,17 @@ class ManhuaGuiFetcherSelenium:
                         logger.info("没有找到下一页按钮")
                         break
 
-                    # 点击第一个"下一页"链接
+                    # 点击第一个"下一页"链接，等待页码指示器或图片 src 变化
+                    # 每次翻页会从图片服务器加载一张图片，按图片服务器限速
+                    state = self.readiness.snapshot(driver)
                     next_link = next_links[0]
+                    image_host = self.reader_config.get('image_host', DEFAULT_IMAGE_HOST)
+                    self.breakers.wait(image_host)
+                    self.limiter.wait(image_host)
                     next_link.click()
-                    time.sleep(2.5)  # 等待下一页加载
+                    self.readiness.wait_for_page_turn(driver, state)
+                    # 翻页产生的拦截记录计入累计统计，不留到下一个页面的报告
+                    self.blocker.drain(driver)
                     page_num += 1
 
                 except Exception as e:
@@ -381,7 +510,8 @@ class ManhuaGuiFetcherSelenium:
                 'total_count': len(all_images)
             }
 
-    def _extract_page_number_from_url(self, url: str) -> Optional[int]:
+    @staticmethod
+    def _extract_page_number_from_url(url: str) -> Optional[int]:
         """
         从 URL 中提取页码
         例如: https://m.manhuagui.com/comic/1128/9771.html#p=2 -> 2
@@ -420,21 +550,23 @@ class ManhuaGuiFetcherSelenium:
         """
         logger.info(f"快速获取图片数量: {chapter_url}")
 
-        driver = self._request(chapter_url, wait_time=3)
+        driver = self._request(chapter_url, page_type='reader')
         if not driver:
             logger.warning("无法获取页面，返回0")
             return 0
 
+        decoded = self._decode_images(driver)
+        if decoded:
+            return decoded['total_count']
+
         try:
             # 优先使用 span.manga-page（包含完整信息如 "1/184P"）
             # 回退到 #pageNo（只显示当前页码 "1"）
-            page_indicator = None
-            try:
-                page_indicator = driver.find_element(By.CSS_SELECTOR, 'span.manga-page')
-            except:
-                page_indicator = driver.find_element(By.CSS_SELECTOR, '#pageNo')
+            page_text = extract_reader_state(driver)['indicator']
+            if not page_text:
+                logger.warning("未找到页面指示器")
+                return 0
 
-            page_text = page_indicator.text
             logger.info(f"页面指示: {page_text}")
 
             # 解析 "1/184P" 或 "1" 格式
@@ -462,12 +594,245 @@ class ManhuaGuiFetcherSelenium:
 
         return 0
 
+    def export_session(self) -> Dict:
+        """
+        导出浏览器会话（Cookie 和 User-Agent），用于为 HTTP 客户端播种
+
+        Returns:
+            {'cookies': List[Dict], 'user_agent': str}
+        """
+        if not self.driver:
+            return {'cookies': [], 'user_agent': ''}
+
+        # 尚未访问过站点时先打开首页，取得站点 Cookie
+        if not self.driver.current_url.startswith(self.base_url):
+            self._request(self.base_url)
+
+        return {
+            'cookies': self.driver.get_cookies(),
+            'user_agent': self.driver.execute_script('return navigator.userAgent')
+        }
+
     def close(self):
         """关闭 WebDriver"""
+        if self.blocker.enabled:
+            summary = self.blocker.summary()
+            logger.info(f"资源拦截累计: {summary['blocked_requests']} 个请求，"
+                        f"约 {summary['blocked_bytes'] / 1024 / 1024:.1f} MB（估算）")
         if self.driver:
             logger.info("关闭 WebDriver...")
             self.driver.quit()
             self.driver = None
+        if self._profile_lock:
+            self._profile_lock.release()
+            self._profile_lock = None
+
+
+def _links_from_html(html: str) -> List[Dict]:
+    """
+    从 HTML 中提取所有漫画链接（与页面内提取脚本返回的格式一致）
+
+    Args:
+        html: 页面 HTML
+
+    Returns:
+        [{'href': str, 'title': Optional[str], 'text': str}, ...]
+    """
+    soup = BeautifulSoup(html, 'lxml')
+    return [
+        {'href': link.get('href'), 'title': link.get('title'), 'text': link.text.strip()}
+        for link in soup.select('a[href*="/comic/"]')
+    ]
+
+
+def build_search_results(links: List[Dict], base_url: str) -> List[Dict]:
+    """
+    根据漫画链接构建搜索结果
+
+    Args:
+        links: 漫画链接列表
+        base_url: 站点地址
+
+    Returns:
+        漫画列表 [{'id', 'name', 'url'}, ...]
+    """
+    comics = []
+    seen_ids = set()
+    
+    for link in links:
+        href = link['href']
+        title = link.get('title') or link['text']
+        
+        # 提取漫画 ID
+        match = re.search(r'/comic/(\d+)/', href)
+        if match:
+            comic_id = match.group(1)
+            
+            # 去重
+            if comic_id not in seen_ids:
+                seen_ids.add(comic_id)
+                comics.append({
+                    'id': comic_id,
+                    'name': title,
+                    'url': urljoin(base_url, href)
+                })
+    
+    return comics
+
+
+def parse_search_results(html: str, base_url: str) -> List[Dict]:
+    """
+    解析搜索结果页
+
+    Args:
+        html: 页面 HTML
+        base_url: 站点地址
+
+    Returns:
+        漫画列表 [{'id', 'name', 'url'}, ...]
+    """
+    return build_search_results(_links_from_html(html), base_url)
+
+
+def _find_labeled_text(soup: BeautifulSoup, label: str) -> Optional[str]:
+    """
+    查找详情页中形如“作者：xxx”的字段值
+
+    Args:
+        soup: 页面解析结果
+        label: 字段名（如 作者、状态）
+
+    Returns:
+        字段值，未找到返回 None
+    """
+    # <dl><dt>作者：</dt><dd>xxx</dd></dl>
+    for dt in soup.find_all('dt'):
+        if label in dt.get_text():
+            dd = dt.find_next_sibling('dd')
+            if dd:
+                value = dd.get_text(' ', strip=True)
+                if value:
+                    return value
+
+    # <span>作者：</span><a>xxx</a> 或纯文本
+    for element in soup.find_all(string=re.compile(label)):
+        parent = element.parent
+        text = parent.get_text(' ', strip=True) if parent else str(element)
+        match = re.search(label + r'\s*[:：]\s*(.+)', text)
+        if match:
+            return match.group(1).strip()
+
+    return None
+
+
+def parse_comic_info(html: str, comic_url: str) -> Dict:
+    """
+    解析漫画详情页的基本信息
+
+    Args:
+        html: 页面 HTML
+        comic_url: 漫画URL
+
+    Returns:
+        漫画信息 {'id', 'name', 'url', 'description', 'cover_image', 'author', 'status'}
+        （未找到标题时 name 为 "未知"，其余字段未找到时为 None）
+    """
+    soup = BeautifulSoup(html, 'lxml')
+    
+    # 查找标题
+    title = soup.select_one('h1')
+    comic_name = title.text.strip() if title else "未知"
+    
+    # 提取 ID
+    match = re.search(r'/comic/(\d+)/', comic_url)
+    comic_id = match.group(1) if match else None
+
+    # 描述
+    description = None
+    intro = soup.select_one('#bookIntro, .book-intro, #intro-all, .intro')
+    if intro:
+        description = intro.get_text(' ', strip=True) or None
+    if not description:
+        meta = soup.select_one('meta[name="description"]')
+        description = meta.get('content') if meta else None
+
+    # 封面
+    cover_image = None
+    cover = soup.select_one('.thumb img, .book-cover img, .cover img')
+    if cover:
+        cover_image = cover.get('src') or cover.get('data-src')
+    if not cover_image:
+        meta = soup.select_one('meta[property="og:image"]')
+        cover_image = meta.get('content') if meta else None
+    if cover_image:
+        cover_image = urljoin(comic_url, cover_image)
+    
+    return {
+        'id': comic_id,
+        'name': comic_name,
+        'url': comic_url,
+        'description': description,
+        'cover_image': cover_image,
+        'author': _find_labeled_text(soup, '作者'),
+        'status': _find_labeled_text(soup, '状态')
+    }
+
+
+def build_chapters(links: List[Dict], base_url: str) -> List[Dict]:
+    """
+    根据漫画链接构建章节列表
+
+    Args:
+        links: 漫画链接列表
+        base_url: 站点地址
+
+    Returns:
+        章节列表 [{'chapter_num', 'title', 'url'}, ...]
+    """
+    chapters = []
+    seen_chapters = set()
+    
+    for link in links:
+        href = link['href']
+        match = re.search(r'/(\d+)\.html?$', href)
+        if match:
+            # 从 URL 提取章节标识
+            url_id = match.group(1)
+
+            # 从标题中提取真正的章节号
+            title = link['text']
+            chapter_num_match = re.search(r'第(\d+)[话章节]', title)
+
+            if chapter_num_match:
+                chapter_num = chapter_num_match.group(1)
+            else:
+                # 如果无法从标题提取，使用 URL 中的 ID
+                chapter_num = url_id
+
+            # 去重
+            if chapter_num not in seen_chapters:
+                seen_chapters.add(chapter_num)
+                chapters.append({
+                    'chapter_num': chapter_num,
+                    'title': title,
+                    'url': urljoin(base_url, href)
+                })
+    
+    return chapters
+
+
+def parse_chapters(html: str, base_url: str) -> List[Dict]:
+    """
+    解析漫画详情页的章节列表
+
+    Args:
+        html: 页面 HTML
+        base_url: 站点地址
+
+    Returns:
+        章节列表 [{'chapter_num', 'title', 'url'}, ...]
+    """
+    return build_chapters(_links_from_html(html), base_url)
 
 
 def create_fetcher_selenium(use_proxy: bool = False,
@@ -484,3 +849,35 @@ def create_fetcher_selenium(use_proxy: bool = False,
     return ManhuaGuiFetcherSelenium(
         headless=headless
     )
+
+
+def create_browser_fetcher(headless: bool = True, config_path: str = "config.yaml"):
+    """
+    根据配置创建浏览器抓取器（browser.pool_size > 1 时返回抓取器池）
+
+    Args:
+        headless: 是否使用无头模式
+        config_path: 配置文件路径
+    """
+    from comichub.core.pool import FetcherPool, resolve_pool_size
+
+    pool_size = resolve_pool_size(get_config(config_path).get_browser_config())
+    if pool_size > 1:
+        return FetcherPool(size=pool_size, headless=headless, config_path=config_path)
+    return ManhuaGuiFetcherSelenium(headless=headless, config_path=config_path)
+
+
+def create_fetcher(headless: bool = True, config_path: str = "config.yaml"):
+    """
+    根据配置创建抓取器
+
+    fetch.mode 为 hybrid 时返回 HTTP 优先的混合抓取器，否则返回浏览器抓取器。
+
+    Args:
+        headless: 是否使用无头模式
+        config_path: 配置文件路径
+    """
+    if get_config(config_path).get('fetch.mode', 'browser') == 'hybrid':
+        from comichub.core.http_fetcher import HybridFetcher
+        return HybridFetcher(headless=headless, config_path=config_path)
+    return create_browser_fetcher(headless=headless, config_path=config_path)
@@ -0,0 +1,384 @@
+"""
+HTTP 优先的混合抓取器
+元数据请求先走连接池化的 HTTP 客户端（Cookie 从一次浏览器会话播种），
+遇到拦截页或页面结构缺失时再回退到 Selenium
+"""
+
+import logging
+import ssl
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from comichub.core.breaker import get_circuit_breakers
+from comichub.core.config import get_config
+from comichub.core.ratelimit import RETRY_STATUS_CODES, get_rate_limiter, parse_retry_after
+from comichub.core.fetcher import (
+    ManhuaGuiFetcherSelenium,
+    create_browser_fetcher,
+    parse_chapters,
+    parse_comic_info,
+    parse_search_results,
+)
+from comichub.core.unpacker import DEFAULT_IMAGE_HOST, decode_chapter_images
+
+logger = logging.getLogger(__name__)
+
+
+# 拦截页/验证页特征
+BLOCK_PAGE_MARKERS = (
+    '访问过于频繁',
+    '请输入验证码',
+    '安全验证',
+    'cf-challenge',
+    'Just a moment...',
+    'Access denied',
+)
+
+# HTTP 状态码视为被拦截
+BLOCK_STATUS_CODES = (403, 429, 503)
+
+DEFAULT_USER_AGENT = ('Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 '
+                      '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+
+
+class TLSAdapter(HTTPAdapter):
+    """可配置加密套件的 HTTPAdapter（尽量贴近浏览器的 TLS 握手）"""
+
+    def __init__(self, ciphers: str = '', **kwargs):
+        self.ciphers = ciphers
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        if self.ciphers:
+            context = ssl.create_default_context()
+            context.set_ciphers(self.ciphers)
+            context.minimum_version = ssl.TLSVersion.TLSv1_2
+            kwargs['ssl_context'] = context
+        return super().init_poolmanager(*args, **kwargs)
+
+
+class HybridFetcher:
+    """HTTP 优先的混合抓取器（失败时回退到 Selenium）"""
+
+    def __init__(self, headless: bool = True, config_path: str = "config.yaml"):
+        """
+        初始化混合抓取器
+
+        Args:
+            headless: 浏览器回退时是否使用无头模式
+            config_path: 配置文件路径
+        """
+        self.base_url = "https://m.manhuagui.com"
+        self.headless = headless
+        self.config_path = config_path
+
+        config_loader = get_config(config_path)
+        self.hybrid_config = config_loader.get_hybrid_config()
+        self.reader_config = config_loader.get_reader_config()
+
+        self.timeout = self.hybrid_config.get('timeout', 10)
+        self.seed_cookies = self.hybrid_config.get('seed_cookies', True)
+        # 连续多次连接级失败（如 TLS 被拒绝）后本次运行不再尝试 HTTP
+        self.max_failures = self.hybrid_config.get('max_failures', 3)
+
+        # 按主机限速（与浏览器路径、图片下载共用）
+        self.limiter = get_rate_limiter(config_path)
+        # 按主机熔断（与浏览器路径、图片下载共用）
+        self.breakers = get_circuit_breakers(config_path)
+
+        # 浏览器抓取器（首次回退或播种 Cookie 时才启动）
+        self._browser = None
+        self._browser_lock = threading.Lock()
+        # 单个浏览器抓取器不是线程安全的（抓取器池除外），回退调用互斥
+        self._fallback_lock = threading.Lock()
+        # imap_images 同时解析的章节数（与 HTTP 连接池大小一致）
+        self.parallel = max(1, self.hybrid_config.get('pool_size', 4))
+
+        # HTTP 会话
+        self.session = self._create_session()
+        self._seeded = False
+        self._seed_lock = threading.Lock()
+        # 连续失败计数（imap_images 的并行解析线程共用）
+        self._consecutive_failures = 0
+        self._http_disabled = False
+        self._failure_lock = threading.Lock()
+
+        # 每个方法走各路径的次数
+        self.counters: Dict[str, Dict[str, int]] = {}
+        self._counter_lock = threading.Lock()
+
+        logger.info("混合抓取器已初始化 (HTTP 优先，Selenium 回退)")
+
+    def _create_session(self) -> requests.Session:
+        """创建连接池化的 HTTP 会话"""
+        pool_size = self.hybrid_config.get('pool_size', 4)
+        adapter = TLSAdapter(
+            ciphers=self.hybrid_config.get('ciphers', ''),
+            pool_connections=pool_size,
+            pool_maxsize=pool_size
+        )
+
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.verify = self.hybrid_config.get('verify_ssl', True)
+        session.headers.update({
+            'User-Agent': DEFAULT_USER_AGENT,
+            'Referer': self.base_url + '/',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'zh-CN,zh;q=0.9',
+        })
+        return session
+
+    @property
+    def browser(self):
+        """浏览器抓取器（懒加载）"""
+        with self._browser_lock:
+            if self._browser is None:
+                logger.info("启动浏览器抓取器（Selenium 回退）")
+                self._browser = create_browser_fetcher(headless=self.headless,
+                                                       config_path=self.config_path)
+            return self._browser
+
+    def _call_browser(self, method: str, *args):
+        """
+        调用浏览器抓取器的方法
+
+        抓取器池自身线程安全，直接调用；单个抓取器按调用互斥，
+        流水线线程的章节解析与主线程的元数据请求不会同时操作同一个 WebDriver。
+        """
+        browser = self.browser
+        if hasattr(browser, 'imap_images'):
+            return getattr(browser, method)(*args)
+        with self._fallback_lock:
+            return getattr(browser, method)(*args)
+
+    def _seed_session(self):
+        """从一次浏览器会话复制 Cookie 和 User-Agent 到 HTTP 会话"""
+        if self._seeded or not self.seed_cookies:
+            return
+
+        with self._seed_lock:
+            if self._seeded:
+                return
+            self._seeded = True
+            try:
+                exported = self._call_browser('export_session')
+                for cookie in exported.get('cookies', []):
+                    self.session.cookies.set(cookie['name'], cookie['value'],
+                                             domain=cookie.get('domain'),
+                                             path=cookie.get('path', '/'))
+                if exported.get('user_agent'):
+                    self.session.headers['User-Agent'] = exported['user_agent']
+                logger.info(f"已从浏览器会话播种 {len(exported.get('cookies', []))} 个 Cookie")
+            except Exception as e:
+                logger.warning(f"从浏览器会话播种 Cookie 失败: {e}")
+
+    def _count(self, method: str, path: str):
+        """记录方法走的路径（http / browser）"""
+        with self._counter_lock:
+            counter = self.counters.setdefault(method, {'http': 0, 'browser': 0})
+            counter[path] += 1
+
+    def _is_block_page(self, html: str) -> bool:
+        """判断是否为拦截页/验证页"""
+        head = html[:5000]
+        return any(marker in head for marker in BLOCK_PAGE_MARKERS)
+
+    def _http_get(self, url: str) -> Optional[str]:
+        """
+        通过 HTTP 获取页面
+
+        Returns:
+            页面 HTML，被拦截或请求失败时返回 None
+        """
+        if self._http_disabled:
+            return None
+
+        self._seed_session()
+
+        self.breakers.wait(url)
+        self.limiter.wait(url)
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+        except requests.RequestException as e:
+            self.breakers.record_failure(url, e)
+            logger.debug(f"HTTP 请求失败: {url}, 错误: {e}")
+            with self._failure_lock:
+                self._consecutive_failures += 1
+                if self._consecutive_failures >= self.max_failures and not self._http_disabled:
+                    self._http_disabled = True
+                    logger.warning(f"HTTP 连续失败 {self._consecutive_failures} 次，本次运行改用 Selenium")
+            return None
+
+        with self._failure_lock:
+            self._consecutive_failures = 0
+        self.breakers.record_status(url, response.status_code)
+
+        if response.status_code in RETRY_STATUS_CODES:
+            # 暂停该主机，浏览器回退请求同样会等待到暂停结束
+            self.limiter.penalize(url, 0, parse_retry_after(response.headers.get('Retry-After')))
+        if response.status_code in BLOCK_STATUS_CODES:
+            logger.info(f"HTTP 请求被拦截 (状态码 {response.status_code})，回退到 Selenium: {url}")
+            return None
+        if response.status_code != 200:
+            logger.debug(f"HTTP 状态码 {response.status_code}: {url}")
+            return None
+
+        if response.encoding is None or response.encoding.lower() == 'iso-8859-1':
+            response.encoding = 'utf-8'
+        html = response.text
+
+        if self._is_block_page(html):
+            logger.info(f"检测到拦截页，回退到 Selenium: {url}")
+            return None
+
+        return html
+
+    def search_comics(self, keyword: str) -> List[Dict]:
+        """搜索漫画"""
+        html = self._http_get(urljoin(self.base_url, f"/s/{keyword}"))
+        if html:
+            comics = parse_search_results(html, self.base_url)
+            if comics:
+                self._count('search_comics', 'http')
+                logger.info(f"搜索到 {len(comics)} 部漫画 (HTTP)")
+                return comics
+
+        self._count('search_comics', 'browser')
+        return self._call_browser('search_comics', keyword)
+
+    def get_comic_page(self, comic_url: str) -> Optional[Dict]:
+        """一次页面加载获取漫画信息和章节列表"""
+        html = self._http_get(comic_url)
+        if html:
+            info = parse_comic_info(html, comic_url)
+            chapters = parse_chapters(html, self.base_url)
+            if info['name'] != "未知" and chapters:
+                self._count('get_comic_page', 'http')
+                logger.info(f"获取到 {len(chapters)} 个章节 (HTTP)")
+                return {'info': info, 'chapters': chapters}
+
+        self._count('get_comic_page', 'browser')
+        return self._call_browser('get_comic_page', comic_url)
+
+    def get_comic_info(self, comic_url: str) -> Optional[Dict]:
+        """获取漫画信息"""
+        html = self._http_get(comic_url)
+        if html:
+            info = parse_comic_info(html, comic_url)
+            if info['name'] != "未知":
+                self._count('get_comic_info', 'http')
+                return info
+
+        self._count('get_comic_info', 'browser')
+        return self._call_browser('get_comic_info', comic_url)
+
+    def get_chapters(self, comic_url: str) -> List[Dict]:
+        """获取章节列表"""
+        html = self._http_get(comic_url)
+        if html:
+            chapters = parse_chapters(html, self.base_url)
+            if chapters:
+                self._count('get_chapters', 'http')
+                logger.info(f"获取到 {len(chapters)} 个章节 (HTTP)")
+                return chapters
+
+        self._count('get_chapters', 'browser')
+        return self._call_browser('get_chapters', comic_url)
+
+    def _decode_chapter(self, chapter_url: str) -> Optional[Dict]:
+        """通过 HTTP 获取阅读页并解码内嵌脚本"""
+        if not self.reader_config.get('decode_script', True):
+            return None
+        html = self._http_get(chapter_url)
+        if not html:
+            return None
+        return decode_chapter_images(html, self.reader_config.get('image_host', DEFAULT_IMAGE_HOST))
+
+    def get_images(self, chapter_url: str) -> Dict[str, any]:
+        """获取章节图片列表"""
+        decoded = self._decode_chapter(chapter_url)
+        if decoded:
+            self._count('get_images', 'http')
+            logger.info(f"从内嵌脚本解码到 {len(decoded['images'])} 张图片 (HTTP)")
+            return decoded
+
+        self._count('get_images', 'browser')
+        return self._call_browser('get_images', chapter_url)
+
+    def _get_images_task(self, chapter_url: str) -> Dict[str, any]:
+        """解析单个章节（异常时返回空结果）"""
+        try:
+            return self.get_images(chapter_url)
+        except Exception as e:
+            logger.error(f"解析章节图片失败: {chapter_url}, 错误: {e}")
+            return {'images': [], 'total_count': 0}
+
+    def imap_images(self, chapter_urls: Iterable[str]) -> Iterator[Dict[str, any]]:
+        """
+        并行解析多个章节的图片列表，按输入顺序逐个返回
+
+        每个章节先走 HTTP 解码，失败的章节回退到浏览器（抓取器池时同样并行）。
+        最多同时解析 hybrid.pool_size 个章节。
+
+        Args:
+            chapter_urls: 章节URL序列
+
+        Yields:
+            与 get_images 相同格式的结果
+        """
+        urls = iter(chapter_urls)
+        with ThreadPoolExecutor(max_workers=self.parallel, thread_name_prefix='comichub-hybrid') as executor:
+            pending = deque()
+            for url in urls:
+                pending.append(executor.submit(self._get_images_task, url))
+                if len(pending) >= self.parallel:
+                    break
+
+            while pending:
+                result = pending.popleft().result()
+                next_url = next(urls, None)
+                if next_url is not None:
+                    pending.append(executor.submit(self._get_images_task, next_url))
+                yield result
+
+    def get_image_count(self, chapter_url: str) -> int:
+        """快速获取章节图片数量"""
+        decoded = self._decode_chapter(chapter_url)
+        if decoded:
+            self._count('get_image_count', 'http')
+            return decoded['total_count']
+
+        self._count('get_image_count', 'browser')
+        return self._call_browser('get_image_count', chapter_url)
+
+    def _extract_page_number_from_url(self, url: str) -> Optional[int]:
+        """从 URL 中提取页码"""
+        return ManhuaGuiFetcherSelenium._extract_page_number_from_url(url)
+
+    def get_path_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        获取各方法走 HTTP / 浏览器路径的次数
+
+        Returns:
+            {method: {'http': int, 'browser': int}}
+        """
+        with self._counter_lock:
+            return {method: dict(counter) for method, counter in self.counters.items()}
+
+    def close(self):
+        """关闭 HTTP 会话和浏览器"""
+        for method, counter in self.get_path_stats().items():
+            logger.info(f"抓取路径统计 {method}: HTTP {counter['http']} 次, 浏览器 {counter['browser']} 次")
+
+        self.session.close()
+        if self._browser is not None:
+            self._browser.close()
+            self._browser = None
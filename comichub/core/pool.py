@@ -0,0 +1,223 @@
+"""
+WebDriver 池模块
+维护多个 Chrome 实例，并行解析章节图片列表
+"""
+
+import logging
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from comichub.core.config import get_config
+from comichub.core.fetcher import ManhuaGuiFetcherSelenium
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_pool_size(browser_config: Dict) -> int:
+    """
+    根据配置计算 WebDriver 池大小（受内存预算约束）
+
+    Args:
+        browser_config: 浏览器配置字典
+
+    Returns:
+        池大小（至少为 1）
+    """
+    size = max(1, int(browser_config.get('pool_size', 1)))
+    budget_mb = browser_config.get('memory_budget_mb')
+    driver_mb = browser_config.get('driver_memory_mb', 400)
+
+    if budget_mb and driver_mb:
+        max_by_memory = max(1, int(budget_mb) // int(driver_mb))
+        if size > max_by_memory:
+            logger.warning(f"WebDriver 池大小 {size} 超出内存预算 {budget_mb}MB，"
+                           f"限制为 {max_by_memory}")
+            size = max_by_memory
+
+    return size
+
+
+class FetcherPool:
+    """漫画柜抓取器池（多个 WebDriver，按章节顺序返回结果）"""
+
+    def __init__(self, size: Optional[int] = None, headless: bool = True,
+                 config_path: str = "config.yaml"):
+        """
+        初始化抓取器池
+
+        Args:
+            size: 池大小（默认从 config.yaml 的 browser 配置读取）
+            headless: 是否使用无头模式
+            config_path: 配置文件路径
+        """
+        browser_config = get_config(config_path).get_browser_config()
+        self.size = size if size is not None else resolve_pool_size(browser_config)
+        self.headless = headless
+        self.config_path = config_path
+
+        # 空闲抓取器队列，按需启动新的 WebDriver，直到达到池大小
+        self._free = queue.Queue()
+        self._fetchers: List[ManhuaGuiFetcherSelenium] = []
+        # 已启动和正在启动的实例数（启动 Chrome 前先占位，并发借用时不会超出池大小）
+        self._spawned = 1
+        self._lock = threading.Lock()
+
+        # 先启动一个实例，元数据请求无需等待整个池启动
+        self._free.put(self._spawn())
+
+        logger.info(f"抓取器池已初始化 (大小: {self.size})")
+
+    def _spawn(self) -> ManhuaGuiFetcherSelenium:
+        """启动一个新的抓取器并登记到池中（调用方已占用 _spawned 名额，启动失败时释放）"""
+        try:
+            fetcher = ManhuaGuiFetcherSelenium(headless=self.headless, config_path=self.config_path)
+        except BaseException:
+            with self._lock:
+                self._spawned -= 1
+            raise
+        with self._lock:
+            self._fetchers.append(fetcher)
+        logger.info(f"WebDriver 池: 已启动 {len(self._fetchers)}/{self.size} 个实例")
+        return fetcher
+
+    def _acquire(self) -> ManhuaGuiFetcherSelenium:
+        """获取一个空闲抓取器（全部繁忙且未满时启动新实例）"""
+        try:
+            return self._free.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_spawn = self._spawned < self.size
+            if can_spawn:
+                self._spawned += 1
+        if can_spawn:
+            return self._spawn()
+
+        return self._free.get()
+
+    def _release(self, fetcher: ManhuaGuiFetcherSelenium):
+        """归还抓取器"""
+        self._free.put(fetcher)
+
+    @contextmanager
+    def borrow(self) -> Iterator[ManhuaGuiFetcherSelenium]:
+        """借用一个抓取器（用完自动归还）"""
+        fetcher = self._acquire()
+        try:
+            yield fetcher
+        finally:
+            self._release(fetcher)
+
+    def _get_images_task(self, chapter_url: str) -> Dict[str, any]:
+        """在空闲抓取器上解析单个章节（异常时返回空结果）"""
+        try:
+            with self.borrow() as fetcher:
+                return fetcher.get_images(chapter_url)
+        except Exception as e:
+            logger.error(f"解析章节图片失败: {chapter_url}, 错误: {e}")
+            return {'images': [], 'total_count': 0}
+
+    def imap_images(self, chapter_urls: Iterable[str]) -> Iterator[Dict[str, any]]:
+        """
+        并行解析多个章节的图片列表，按输入顺序逐个返回
+
+        最多同时预取 池大小 个章节，避免解析结果堆积。
+
+        Args:
+            chapter_urls: 章节URL序列
+
+        Yields:
+            与 get_images 相同格式的结果
+        """
+        urls = iter(chapter_urls)
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            pending = deque()
+            for url in urls:
+                pending.append(executor.submit(self._get_images_task, url))
+                if len(pending) >= self.size:
+                    break
+
+            while pending:
+                result = pending.popleft().result()
+                next_url = next(urls, None)
+                if next_url is not None:
+                    pending.append(executor.submit(self._get_images_task, next_url))
+                yield result
+
+    def get_images_batch(self, chapter_urls: Iterable[str]) -> List[Dict[str, any]]:
+        """
+        并行解析多个章节的图片列表
+
+        Args:
+            chapter_urls: 章节URL序列
+
+        Returns:
+            结果列表（与输入顺序一致）
+        """
+        return list(self.imap_images(chapter_urls))
+
+    def search_comics(self, keyword: str) -> List[Dict]:
+        """搜索漫画"""
+        with self.borrow() as fetcher:
+            return fetcher.search_comics(keyword)
+
+    def get_comic_page(self, comic_url: str) -> Optional[Dict]:
+        """一次页面加载获取漫画信息和章节列表"""
+        with self.borrow() as fetcher:
+            return fetcher.get_comic_page(comic_url)
+
+    def get_comic_info(self, comic_url: str) -> Optional[Dict]:
+        """获取漫画信息"""
+        with self.borrow() as fetcher:
+            return fetcher.get_comic_info(comic_url)
+
+    def get_chapters(self, comic_url: str) -> List[Dict]:
+        """获取章节列表"""
+        with self.borrow() as fetcher:
+            return fetcher.get_chapters(comic_url)
+
+    def get_images(self, chapter_url: str) -> Dict[str, any]:
+        """获取章节图片列表"""
+        with self.borrow() as fetcher:
+            return fetcher.get_images(chapter_url)
+
+    def get_image_count(self, chapter_url: str) -> int:
+        """快速获取章节图片数量"""
+        with self.borrow() as fetcher:
+            return fetcher.get_image_count(chapter_url)
+
+    def export_session(self) -> Dict:
+        """导出浏览器会话（Cookie 和 User-Agent）"""
+        with self.borrow() as fetcher:
+            return fetcher.export_session()
+
+    def _extract_page_number_from_url(self, url: str) -> Optional[int]:
+        """从 URL 中提取页码"""
+        return ManhuaGuiFetcherSelenium._extract_page_number_from_url(url)
+
+    def close(self):
+        """关闭池中所有 WebDriver"""
+        with self._lock:
+            fetchers, self._fetchers = self._fetchers, []
+        for fetcher in fetchers:
+            try:
+                fetcher.close()
+            except Exception as e:
+                logger.warning(f"关闭 WebDriver 失败: {e}")
+        logger.info(f"抓取器池已关闭 ({len(fetchers)} 个实例)")
+
+
+def create_fetcher_pool(headless: bool = True, config_path: str = "config.yaml") -> FetcherPool:
+    """
+    创建抓取器池实例
+
+    Args:
+        headless: 是否使用无头模式
+        config_path: 配置文件路径
+    """
+    return FetcherPool(headless=headless, config_path=config_path)
@@ -0,0 +1,147 @@
+"""
+持久化浏览器配置目录模块
+为 Chrome 提供可复用的 user-data-dir（磁盘缓存、Cookie），
+每个目录用文件锁保护，避免多个进程同时使用同一目录导致损坏
+"""
+
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows 无 fcntl，改用 msvcrt 字节锁
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+logger = logging.getLogger(__name__)
+
+LOCK_FILENAME = '.comichub.lock'
+
+# 单个基础目录下最多的配置目录数（抓取器池中每个 WebDriver 占用一个）
+MAX_PROFILE_SLOTS = 16
+
+
+class ProfileLock:
+    """配置目录文件锁（非阻塞，进程退出时由系统自动释放）"""
+
+    def __init__(self, profile_dir: Path):
+        """
+        初始化文件锁
+
+        Args:
+            profile_dir: 配置目录
+        """
+        self.profile_dir = profile_dir
+        self.lock_path = profile_dir / LOCK_FILENAME
+        self._fd = None
+
+    def acquire(self) -> bool:
+        """
+        尝试获取锁
+
+        Returns:
+            是否获取成功（目录被其他进程占用或平台不支持文件锁时返回 False）
+        """
+        if fcntl is None and msvcrt is None:
+            logger.warning("当前平台不支持文件锁，不使用持久化配置目录")
+            return False
+
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                # 锁定文件首字节（允许超出文件末尾）
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        except OSError:
+            os.close(fd)
+            return False
+
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+
+    def release(self):
+        """释放锁"""
+        if self._fd is None:
+            return
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        os.close(self._fd)
+        self._fd = None
+
+
+def acquire_profile_dir(base_dir: str) -> Optional[Tuple[Path, ProfileLock]]:
+    """
+    获取一个未被占用的配置目录
+
+    依次尝试 base_dir/slot-0、slot-1 ...，返回第一个成功加锁的目录。
+
+    Args:
+        base_dir: 配置基础目录（支持 ~ 展开）
+
+    Returns:
+        (配置目录, 锁)，全部被占用时返回 None
+    """
+    base = Path(base_dir).expanduser()
+    for slot in range(MAX_PROFILE_SLOTS):
+        profile_dir = base / f"slot-{slot}"
+        lock = ProfileLock(profile_dir)
+        if lock.acquire():
+            return profile_dir, lock
+
+    logger.warning(f"配置目录全部被占用: {base}")
+    return None
+
+
+def clear_profiles(base_dir: str) -> Tuple[int, int]:
+    """
+    清除所有未被占用的配置目录
+
+    Args:
+        base_dir: 配置基础目录（支持 ~ 展开）
+
+    Returns:
+        (已清除目录数, 被占用而跳过的目录数)
+    """
+    base = Path(base_dir).expanduser()
+    if not base.exists():
+        return 0, 0
+
+    cleared = 0
+    skipped = 0
+    for profile_dir in sorted(base.glob('slot-*')):
+        lock = ProfileLock(profile_dir)
+        if not lock.acquire():
+            logger.warning(f"配置目录正在使用，跳过: {profile_dir}")
+            skipped += 1
+            continue
+
+        try:
+            for child in profile_dir.iterdir():
+                if child.name == LOCK_FILENAME:
+                    continue
+                if child.is_dir() and not child.is_symlink():
+                    shutil.rmtree(child)
+                else:
+                    child.unlink()
+            cleared += 1
+            logger.info(f"已清除配置目录: {profile_dir}")
+        finally:
+            lock.release()
+
+    return cleared, skipped
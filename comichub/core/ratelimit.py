@@ -0,0 +1,229 @@
+"""
+按主机限速模块
+每个主机一个令牌桶（requests/s + burst），阅读站点和图片服务器共用同一个限速器；
+429/503 时按 Retry-After 或指数退避（带抖动）暂停该主机。
+令牌按“预约”方式发放：锁只在计算等待时间时持有，
+同步调用方 time.sleep、异步调用方 asyncio.sleep，线程与协程可以混用
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from comichub.core.config import get_config
+
+logger = logging.getLogger(__name__)
+
+# 需要退避重试的状态码
+RETRY_STATUS_CODES = (429, 503)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    解析 Retry-After 响应头（秒数或 HTTP 日期）
+
+    Args:
+        value: 响应头的值
+
+    Returns:
+        需要等待的秒数，无法解析时返回 None
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """令牌桶（线程安全）"""
+
+    def __init__(self, rate: float, burst: int):
+        """
+        初始化令牌桶
+
+        Args:
+            rate: 每秒补充的令牌数（0 表示不限速）
+            burst: 桶容量（允许的突发请求数）
+        """
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        # 429/503 后暂停到此时刻
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        预约一个令牌
+
+        Returns:
+            需要等待的秒数（0 表示立即可用）
+        """
+        with self._lock:
+            now = time.monotonic()
+            pause = max(self.paused_until - now, 0.0)
+            if self.rate <= 0:
+                return pause
+
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, pause)
+
+    def try_take(self) -> bool:
+        """
+        立即可用时取走一个令牌（不预约、不等待）
+
+        Returns:
+            是否取到令牌（主机暂停中或令牌不足时返回 False）
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self.paused_until > now:
+                return False
+            if self.rate <= 0:
+                return True
+
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+    def pause(self, seconds: float):
+        """暂停该桶 seconds 秒（取已有暂停与新暂停的较晚者）"""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class RateLimiter:
+    """按主机限速器"""
+
+    def __init__(self, config: Optional[Dict] = None):
+        """
+        初始化限速器
+
+        Args:
+            config: 限速配置（ratelimit）
+        """
+        config = config or {}
+        self.enabled = config.get('enabled', True)
+        self.default = config.get('default', {'rate': 10, 'burst': 20})
+        self.hosts = config.get('hosts', {})
+
+        backoff = config.get('backoff', {})
+        self.backoff_base = backoff.get('base', 1.0)
+        self.backoff_max = backoff.get('max', 60.0)
+        self.jitter = backoff.get('jitter', True)
+
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+        # 累计限速等待时间（秒）
+        self.total_wait = 0.0
+
+    def _bucket(self, url: str) -> TokenBucket:
+        """获取 URL 所属主机的令牌桶"""
+        host = urlsplit(url).hostname or url
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                settings = self.hosts.get(host, self.default)
+                # 关闭限速时不限制速率，但仍遵守 429/503 后的暂停
+                rate = settings.get('rate', 0) if self.enabled else 0
+                bucket = TokenBucket(rate, settings.get('burst', 1))
+                self._buckets[host] = bucket
+            return bucket
+
+    def _reserve(self, url: str) -> float:
+        """预约令牌，返回需要等待的秒数"""
+        delay = self._bucket(url).reserve()
+        with self._lock:
+            self.total_wait += delay
+        return delay
+
+    def wait(self, url: str):
+        """请求前等待（同步调用方）"""
+        delay = self._reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def wait_async(self, url: str):
+        """请求前等待（异步调用方）"""
+        delay = self._reserve(url)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def try_acquire(self, url: str) -> bool:
+        """不等待地取一个令牌（用于可以放弃的额外请求，如对冲请求）"""
+        return self._bucket(url).try_take()
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        计算第 attempt 次失败后的退避时间
+
+        Args:
+            attempt: 已失败次数（从 0 开始）
+            retry_after: 服务器给出的 Retry-After 秒数（优先采用）
+
+        Returns:
+            退避秒数
+        """
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        return delay
+
+    def penalize(self, url: str, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        收到 429/503 后暂停该主机（所有线程和协程都会等待）
+
+        Args:
+            url: 请求 URL
+            attempt: 已失败次数
+            retry_after: Retry-After 秒数
+
+        Returns:
+            暂停秒数
+        """
+        delay = self.backoff_delay(attempt, retry_after)
+        self._bucket(url).pause(delay)
+        logger.info(f"主机限流，暂停 {delay:.1f}s: {urlsplit(url).hostname}")
+        return delay
+
+
+# 全局限速器实例（阅读站点和图片服务器的所有请求共用）
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter(config_path: str = "config.yaml") -> RateLimiter:
+    """
+    获取全局限速器实例
+
+    Args:
+        config_path: 配置文件路径
+
+    Returns:
+        RateLimiter 实例
+    """
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter(get_config(config_path).get_ratelimit_config())
+        return _limiter
@@ -0,0 +1,115 @@
+"""
+页面就绪判定模块
+基于 Selenium 显式等待判断页面是否可读，替代固定时长的 sleep
+"""
+
+import logging
+from typing import Dict, Optional, Tuple
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+from comichub.core.extractor import extract_reader_state
+
+logger = logging.getLogger(__name__)
+
+
+# 各类页面的就绪条件（CSS 选择器）
+READY_SELECTORS = {
+    'search': 'a[href*="/comic/"]',
+    'comic': 'a[href*="/comic/"][href$=".html"]',
+    'reader': 'span.manga-page, #pageNo',
+}
+
+class PageReadiness:
+    """页面就绪判定器（每类页面单独的超时时间）"""
+
+    DEFAULT_TIMEOUTS = {
+        'search': 10,
+        'comic': 10,
+        'reader': 10,
+        'next_page': 5,
+    }
+
+    def __init__(self, timeouts: Optional[Dict[str, float]] = None, poll_interval: float = 0.1):
+        """
+        初始化就绪判定器
+
+        Args:
+            timeouts: 各类页面的超时时间（秒），未配置的使用默认值
+            poll_interval: 轮询间隔（秒）
+        """
+        self.timeouts = dict(self.DEFAULT_TIMEOUTS)
+        if timeouts:
+            self.timeouts.update(timeouts)
+        self.poll_interval = poll_interval
+
+    def timeout_for(self, page_type: str) -> float:
+        """获取页面类型对应的超时时间"""
+        return self.timeouts.get(page_type, 10)
+
+    def _wait(self, driver, page_type: str, condition, description: str) -> bool:
+        """执行显式等待，超时返回 False 而不抛出异常"""
+        try:
+            WebDriverWait(driver, self.timeout_for(page_type),
+                          poll_frequency=self.poll_interval).until(condition)
+            return True
+        except TimeoutException:
+            logger.warning(f"等待{description}超时 ({self.timeout_for(page_type)}s)")
+            return False
+
+    def wait_until_ready(self, driver, page_type: str) -> bool:
+        """
+        等待页面就绪
+
+        Args:
+            driver: WebDriver
+            page_type: 页面类型（search / comic / reader）
+
+        Returns:
+            是否在超时前就绪
+        """
+        selector = READY_SELECTORS.get(page_type)
+        if not selector:
+            return True
+
+        def ready(d):
+            try:
+                return len(d.find_elements(By.CSS_SELECTOR, selector)) > 0
+            except WebDriverException:
+                return False
+
+        return self._wait(driver, page_type, ready, f"页面就绪 [{page_type}]")
+
+    @staticmethod
+    def snapshot(driver) -> Tuple[Optional[str], Tuple[str, ...]]:
+        """
+        获取阅读页当前状态快照
+
+        Returns:
+            (页码指示器文本, 图片 src 元组)
+        """
+        state = extract_reader_state(driver)
+        return state['indicator'], tuple(state['srcs'])
+
+    def wait_for_page_turn(self, driver, previous: Tuple[Optional[str], Tuple[str, ...]]) -> bool:
+        """
+        等待阅读页翻页完成（页码指示器变化或出现新的图片 src）
+
+        Args:
+            driver: WebDriver
+            previous: 翻页前的状态快照
+
+        Returns:
+            是否在超时前完成翻页
+        """
+        prev_indicator, prev_srcs = previous
+
+        def turned(d):
+            indicator, srcs = self.snapshot(d)
+            if indicator is not None and indicator != prev_indicator:
+                return True
+            return any(src and src not in prev_srcs for src in srcs)
+
+        return self._wait(driver, 'next_page', turned, "翻页")
@@ -0,0 +1,254 @@
+"""
+阅读页内嵌脚本解码模块
+漫画柜阅读页把整章的文件列表、页数和签名参数打包在内联脚本中
+（p,a,c,k,e,d 打包 + LZString Base64 压缩的关键字表），
+在 Python 端解码即可一次性得到整章图片 URL，无需逐页点击“下一页”
+"""
+
+import json
+import logging
+import re
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, quote, urlsplit
+
+logger = logging.getLogger(__name__)
+
+# 默认图片服务器
+DEFAULT_IMAGE_HOST = "https://i.hamreus.com"
+
+_BASE64_ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/="
+_BASE64_VALUES = {ch: i for i, ch in enumerate(_BASE64_ALPHABET)}
+_BASE36_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+# }('p',a,c,'k'['\x73\x70\x6c\x69\x63']('\x7c'),0,{}))
+_PACKED_ARGS_RE = re.compile(
+    r"\}\('(?P<p>.*?)',(?P<a>\d+),(?P<c>\d+),'(?P<k>[A-Za-z0-9+/=]+)'\[",
+    re.S
+)
+_PAYLOAD_RE = re.compile(r"\((\{.*\})\)", re.S)
+# 打包模板中的标识符（与 JS 的 \w 一致只匹配 ASCII，中文标题等不会被当作关键字）
+_TOKEN_RE = re.compile(r"\b\w+\b", re.ASCII)
+
+
+def lzstring_decompress_from_base64(data: str) -> Optional[str]:
+    """
+    LZString.decompressFromBase64 的 Python 实现
+
+    Args:
+        data: Base64 压缩字符串
+
+    Returns:
+        解压后的字符串，数据损坏时返回 None
+    """
+    if not data:
+        return ""
+
+    length = len(data)
+    reset_value = 32
+    state = {'val': _BASE64_VALUES[data[0]], 'position': reset_value, 'index': 1}
+
+    def read_bits(count: int) -> int:
+        bits = 0
+        power = 1
+        maxpower = 1 << count
+        while power != maxpower:
+            resb = state['val'] & state['position']
+            state['position'] >>= 1
+            if state['position'] == 0:
+                state['position'] = reset_value
+                index = state['index']
+                state['val'] = _BASE64_VALUES[data[index]] if index < length else 0
+                state['index'] += 1
+            if resb > 0:
+                bits |= power
+            power <<= 1
+        return bits
+
+    dictionary: List = [0, 1, 2]
+    enlarge_in = 4
+    num_bits = 3
+
+    first = read_bits(2)
+    if first == 0:
+        c = chr(read_bits(8))
+    elif first == 1:
+        c = chr(read_bits(16))
+    else:
+        return ""
+
+    dictionary.append(c)
+    w = c
+    result = [c]
+
+    while True:
+        if state['index'] > length:
+            return ""
+
+        c = read_bits(num_bits)
+        if c == 0 or c == 1:
+            dictionary.append(chr(read_bits(8 if c == 0 else 16)))
+            c = len(dictionary) - 1
+            enlarge_in -= 1
+        elif c == 2:
+            return "".join(result)
+
+        if enlarge_in == 0:
+            enlarge_in = 1 << num_bits
+            num_bits += 1
+
+        if c < len(dictionary):
+            entry = dictionary[c]
+        elif c == len(dictionary):
+            entry = w + w[0]
+        else:
+            return None
+
+        result.append(entry)
+        dictionary.append(w + entry[0])
+        enlarge_in -= 1
+        w = entry
+
+        if enlarge_in == 0:
+            enlarge_in = 1 << num_bits
+            num_bits += 1
+
+
+def _encode_base(c: int, a: int) -> str:
+    """打包器的变量名编码函数 e(c)"""
+    prefix = "" if c < a else _encode_base(c // a, a)
+    c = c % a
+    return prefix + (chr(c + 29) if c > 35 else _BASE36_DIGITS[c])
+
+
+def unpack_packed_script(p: str, a: int, c: int, keywords: List[str]) -> str:
+    """
+    还原 p,a,c,k,e,d 打包的脚本
+
+    Args:
+        p: 打包后的脚本模板
+        a: 进制
+        c: 关键字数量
+        keywords: 关键字表
+
+    Returns:
+        还原后的脚本
+    """
+    mapping = {}
+    for i in range(c):
+        token = _encode_base(i, a)
+        mapping[token] = keywords[i] if i < len(keywords) and keywords[i] else token
+
+    return _TOKEN_RE.sub(lambda m: mapping.get(m.group(0), m.group(0)), p)
+
+
+def extract_chapter_data(html: str) -> Optional[Dict]:
+    """
+    从阅读页 HTML 中解码整章数据
+
+    Args:
+        html: 阅读页 HTML
+
+    Returns:
+        章节数据字典（包含 files / path / sl / len 等字段），无法解码时返回 None
+    """
+    match = _PACKED_ARGS_RE.search(html)
+    if not match:
+        return None
+
+    try:
+        p = match.group('p').replace("\\'", "'").replace("\\\\", "\\")
+        a = int(match.group('a'))
+        c = int(match.group('c'))
+        keywords_raw = lzstring_decompress_from_base64(match.group('k'))
+        if not keywords_raw:
+            logger.debug("内嵌脚本关键字表解压失败")
+            return None
+
+        script = unpack_packed_script(p, a, c, keywords_raw.split('|'))
+        payload = _PAYLOAD_RE.search(script)
+        if not payload:
+            logger.debug("内嵌脚本中未找到章节数据")
+            return None
+
+        return json.loads(payload.group(1))
+    except Exception as e:
+        logger.debug(f"解码内嵌脚本失败: {e}")
+        return None
+
+
+def signed_url_expiry(url: str) -> Optional[float]:
+    """
+    从图片 URL 的签名参数中取出过期时间
+
+    Args:
+        url: 图片 URL（签名参数 e 为过期的 Unix 时间戳）
+
+    Returns:
+        过期时间（Unix 时间戳，秒），URL 未签名时返回 None
+    """
+    values = parse_qs(urlsplit(url).query).get('e')
+    if not values:
+        return None
+    try:
+        expires = float(values[0])
+    except ValueError:
+        return None
+    # 兼容毫秒时间戳
+    return expires / 1000 if expires > 1e12 else expires
+
+
+def build_image_list(chapter_data: Dict, image_host: str = DEFAULT_IMAGE_HOST) -> Optional[Dict]:
+    """
+    根据章节数据构建完整的图片列表
+
+    Args:
+        chapter_data: extract_chapter_data 返回的章节数据
+        image_host: 图片服务器地址
+
+    Returns:
+        {'images': [{'url': str, 'page': int}, ...], 'total_count': int}，数据不完整时返回 None
+    """
+    files = chapter_data.get('files')
+    path = chapter_data.get('path', '')
+    if not files:
+        # 部分页面直接给出完整路径列表
+        files = chapter_data.get('images')
+        path = ''
+    if not files:
+        return None
+
+    query = ''
+    signing = chapter_data.get('sl') or {}
+    if signing:
+        query = '?' + '&'.join(f"{key}={value}" for key, value in signing.items())
+
+    host = image_host.rstrip('/')
+    images = []
+    for page, filename in enumerate(files, 1):
+        images.append({
+            'url': f"{host}{quote(path + filename, safe='/%')}{query}",
+            'page': page
+        })
+
+    total = chapter_data.get('len') or chapter_data.get('count') or len(images)
+    return {
+        'images': images,
+        'total_count': int(total)
+    }
+
+
+def decode_chapter_images(html: str, image_host: str = DEFAULT_IMAGE_HOST) -> Optional[Dict]:
+    """
+    从阅读页 HTML 一次性解析整章图片列表
+
+    Args:
+        html: 阅读页 HTML
+        image_host: 图片服务器地址
+
+    Returns:
+        与 get_images 相同格式的结果，解码失败时返回 None
+    """
+    chapter_data = extract_chapter_data(html)
+    if not chapter_data:
+        return None
+    return build_image_list(chapter_data, image_host)
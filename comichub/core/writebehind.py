@@ -0,0 +1,197 @@
+"""
+数据库写缓冲模块（write-behind）
+下载过程中的状态更新（图片完成 / 失败 / URL 失效、章节已下载、抓取历史）先写入内存缓冲，
+由后台线程按条数或时间批量写入（一次事务、多行 execute_values），
+章节结束和关闭时同步刷新；调用方只追加缓冲，从不等待数据库
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+from comichub.core.database import Database
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehind:
+    """后台批量写入数据库的缓冲区（线程安全）"""
+
+    def __init__(self, db: Database, batch_size: int = 500, flush_interval: float = 1.0,
+                 max_pending: int = 100000):
+        """
+        初始化写缓冲并启动后台刷新线程
+
+        Args:
+            db: 数据库连接
+            batch_size: 缓冲行数达到此值时立即刷新
+            flush_interval: 最长刷新间隔（秒）
+            max_pending: 缓冲上限（数据库长时间不可用时丢弃最早的行，避免内存无限增长）
+        """
+        self.db = db
+        self.batch_size = max(batch_size, 1)
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self._done_images: List[int] = []
+        self._failed_images: List[tuple] = []
+        self._downloaded_chapters: List[int] = []
+        self._fetch_history: List[Dict] = []
+        self._expired_images: List[int] = []
+        self._pending = 0
+
+        # 统计
+        self.rows_written = 0
+        self.rows_dropped = 0
+        self.flushes = 0
+        self.flush_seconds = 0.0
+        self._started_at: Optional[float] = None
+
+        self._cond = threading.Condition()
+        # 同一时刻只有一次刷新（后台线程与同步 flush 互斥）
+        self._flush_lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='comichub-write-behind', daemon=True)
+        self._thread.start()
+
+    def complete_image(self, image_id: int):
+        """缓冲：标记图片任务完成"""
+        self._append(self._done_images, image_id)
+
+    def fail_image(self, image_id: int, error_msg: str):
+        """缓冲：标记图片任务失败"""
+        self._append(self._failed_images, (image_id, error_msg))
+
+    def expire_image(self, image_id: int):
+        """缓冲：标记图片 URL 已失效"""
+        self._append(self._expired_images, image_id)
+
+    def mark_chapter_downloaded(self, chapter_id: int):
+        """缓冲：标记章节为已下载"""
+        self._append(self._downloaded_chapters, chapter_id)
+
+    def add_fetch_history(self, comic_id: int = None, chapter_id: int = None,
+                          fetch_type: str = "comic", status: str = "success",
+                          error_msg: str = None, metadata: Dict = None):
+        """缓冲：添加抓取历史记录（参数与 Database.add_fetch_history 相同）"""
+        self._append(self._fetch_history, {
+            'comic_id': comic_id,
+            'chapter_id': chapter_id,
+            'fetch_type': fetch_type,
+            'status': status,
+            'error_msg': error_msg,
+            'metadata': metadata
+        })
+
+    def _append(self, buffer: list, item):
+        """追加一行到缓冲，达到批量大小时唤醒后台线程"""
+        with self._cond:
+            if self._started_at is None:
+                self._started_at = time.monotonic()
+            buffer.append(item)
+            self._pending += 1
+            if self._pending > self.max_pending:
+                self._drop_oldest()
+            if self._pending >= self.batch_size:
+                self._cond.notify()
+
+    def _drop_oldest(self):
+        """丢弃最早的一行（调用方持有锁）"""
+        for buffer in (self._fetch_history, self._done_images, self._failed_images,
+                       self._expired_images, self._downloaded_chapters):
+            if buffer:
+                buffer.pop(0)
+                self._pending -= 1
+                self.rows_dropped += 1
+                if self.rows_dropped == 1:
+                    logger.warning(f"数据库写缓冲已满（{self.max_pending} 行），开始丢弃最早的更新")
+                return
+
+    def _run(self):
+        """后台刷新循环：缓冲满或超时即刷新"""
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._closed or self._pending >= self.batch_size,
+                                    timeout=self.flush_interval)
+                if self._closed:
+                    return
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        同步写入当前缓冲的全部更新
+
+        写入失败时缓冲保留到下次刷新重试。
+
+        Returns:
+            本次写入的行数
+        """
+        with self._flush_lock:
+            with self._cond:
+                if not self._pending:
+                    return 0
+                batch = (self._done_images, self._failed_images,
+                         self._downloaded_chapters, self._fetch_history, self._expired_images)
+                self._done_images, self._failed_images = [], []
+                self._downloaded_chapters, self._fetch_history = [], []
+                self._expired_images = []
+                pending, self._pending = self._pending, 0
+
+            started = time.monotonic()
+            try:
+                rows = self.db.write_batch(*batch)
+            except Exception as e:
+                logger.warning(f"批量写入数据库失败，{pending} 行留待下次刷新: {e}")
+                with self._cond:
+                    self._done_images[:0] = batch[0]
+                    self._failed_images[:0] = batch[1]
+                    self._downloaded_chapters[:0] = batch[2]
+                    self._fetch_history[:0] = batch[3]
+                    self._expired_images[:0] = batch[4]
+                    self._pending += pending
+                return 0
+
+            self.flush_seconds += time.monotonic() - started
+            self.flushes += 1
+            self.rows_written += rows
+            return rows
+
+    def stats(self) -> Dict[str, float]:
+        """
+        获取写入统计
+
+        Returns:
+            {'rows', 'flushes', 'dropped', 'pending', 'elapsed', 'rows_per_second', 'avg_flush_ms'}
+        """
+        elapsed = time.monotonic() - self._started_at if self._started_at else 0.0
+        return {
+            'rows': self.rows_written,
+            'flushes': self.flushes,
+            'dropped': self.rows_dropped,
+            'pending': self._pending,
+            'elapsed': elapsed,
+            'rows_per_second': self.rows_written / elapsed if elapsed else 0.0,
+            'avg_flush_ms': self.flush_seconds / self.flushes * 1000 if self.flushes else 0.0,
+        }
+
+    def log_stats(self):
+        """在日志中输出写入统计"""
+        stats = self.stats()
+        if not stats['rows'] and not stats['pending']:
+            return
+        logger.info(f"数据库批量写入: {stats['rows']} 行 / {stats['flushes']} 次提交, "
+                    f"{stats['rows_per_second']:.1f} 行/s, 平均每次 {stats['avg_flush_ms']:.1f} ms"
+                    + (f", 丢弃 {stats['dropped']} 行" if stats['dropped'] else "")
+                    + (f", 未写入 {stats['pending']} 行" if stats['pending'] else ""))
+
+    def close(self):
+        """停止后台线程并同步写入剩余缓冲"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        self.flush()
+        self.log_stats()
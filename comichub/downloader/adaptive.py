@@ -0,0 +1,131 @@
+"""
+自适应下载并发模块（AIMD）
+按窗口统计每次请求的耗时和结果：p95 延迟与错误率正常时并发加一，
+出现超时 / 429 / 503 或延迟、错误率超标时按比例下调，
+并发始终处于配置的上下限之间，每次调整写入日志
+"""
+
+import logging
+import math
+import threading
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# 请求结果
+OUTCOME_OK = 'ok'
+OUTCOME_ERROR = 'error'
+# 超时和 429/503：说明对端已过载，立即下调
+OUTCOME_THROTTLED = 'throttled'
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """计算百分位数（最近秩法）"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(math.ceil(pct / 100 * len(ordered)) - 1, 0)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+class AdaptiveConcurrency:
+    """AIMD 并发控制器（线程安全；异步调用方使用 try_acquire）"""
+
+    def __init__(self, config: Optional[Dict] = None, initial: int = 5):
+        """
+        初始化并发控制器
+
+        Args:
+            config: 自适应配置（fetch.adaptive）
+            initial: 初始并发（缺省取 fetch.concurrent_downloads）
+        """
+        config = config or {}
+        self.enabled = config.get('enabled', False)
+        self.min_limit = max(config.get('min', 2), 1)
+        self.max_limit = max(config.get('max', 20), self.min_limit)
+        self.window = config.get('window', 20)
+        self.target_p95 = config.get('target_p95', 5.0)
+        self.max_error_rate = config.get('max_error_rate', 0.1)
+        self.increase = config.get('increase', 1)
+        self.decrease_factor = config.get('decrease_factor', 0.5)
+
+        self.limit = min(max(config.get('initial', initial), self.min_limit), self.max_limit)
+        self.in_use = 0
+
+        self._latencies: List[float] = []
+        self._errors = 0
+        # 上次下调的时刻：在此之前发出的请求再被限流不重复下调（每轮只降一次）
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+        # 调整记录 [(原并发, 新并发, 原因), ...]
+        self.history: List[tuple] = []
+
+    def acquire(self):
+        """占用一个并发名额（名额不足时阻塞）"""
+        with self._cond:
+            self._cond.wait_for(lambda: self.in_use < self.limit)
+            self.in_use += 1
+
+    def try_acquire(self) -> bool:
+        """尝试占用一个并发名额（不阻塞）"""
+        with self._cond:
+            if self.in_use < self.limit:
+                self.in_use += 1
+                return True
+            return False
+
+    def release(self):
+        """释放并发名额"""
+        with self._cond:
+            self.in_use -= 1
+            self._cond.notify_all()
+
+    def record(self, latency: float, outcome: str = OUTCOME_OK):
+        """
+        记录一次请求结果，窗口满或被限流时调整并发
+
+        Args:
+            latency: 请求耗时（秒）
+            outcome: ok / error / throttled
+        """
+        with self._cond:
+            if outcome == OUTCOME_THROTTLED:
+                if time.monotonic() - latency >= self._last_decrease:
+                    self._decrease("超时或被限流")
+                return
+
+            self._latencies.append(latency)
+            if outcome == OUTCOME_ERROR:
+                self._errors += 1
+            if len(self._latencies) < self.window:
+                return
+
+            p95 = percentile(self._latencies, 95)
+            error_rate = self._errors / len(self._latencies)
+            if error_rate > self.max_error_rate:
+                self._decrease(f"错误率 {error_rate:.0%}")
+            elif p95 > self.target_p95:
+                self._decrease(f"p95 延迟 {p95:.2f}s")
+            else:
+                self._set_limit(self.limit + self.increase, f"p95 {p95:.2f}s, 错误率 {error_rate:.0%}")
+
+    def _decrease(self, reason: str):
+        """乘性下调（调用方持有锁）"""
+        self._last_decrease = time.monotonic()
+        self._set_limit(int(self.limit * self.decrease_factor), reason)
+
+    def _set_limit(self, new_limit: int, reason: str):
+        """设置并发并开始新窗口（调用方持有锁）"""
+        new_limit = min(max(new_limit, self.min_limit), self.max_limit)
+        self._latencies = []
+        self._errors = 0
+        if new_limit == self.limit:
+            return
+
+        self.history.append((self.limit, new_limit, reason))
+        logger.info(f"下载并发 {self.limit} -> {new_limit} ({reason})")
+        self.limit = new_limit
+        self._cond.notify_all()
@@ -0,0 +1,430 @@
+"""
+asyncio 图片下载引擎
+在一个后台线程的事件循环中用 aiohttp 下载图片：
+全局在途请求预算跨章节、跨漫画共用，另按主机限制并发，
+单线程即可维持数百个并发传输，并统计 images/s 与 bytes/s
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+try:
+    import aiohttp
+except ImportError:  # 可选依赖，未安装时 BatchDownloader 回退到线程池
+    aiohttp = None
+
+from comichub.core.breaker import CircuitBreakers
+from comichub.core.ratelimit import RETRY_STATUS_CODES, RateLimiter, parse_retry_after
+from comichub.downloader.adaptive import (
+    OUTCOME_ERROR,
+    OUTCOME_OK,
+    OUTCOME_THROTTLED,
+    AdaptiveConcurrency,
+)
+from comichub.downloader.hedging import StalledTransferError, TailLatency
+from comichub.downloader.session import DEFAULT_HEADERS, EXPIRED_STATUS_CODES, UrlExpiredError
+from comichub.downloader.storage import (
+    DEFAULT_CHUNK_SIZE,
+    commit_part,
+    discard_part,
+    hedge_path,
+    normalize_fsync,
+    open_part,
+    release_part,
+    resume_request_headers,
+    verify_length,
+)
+
+logger = logging.getLogger(__name__)
+
+# 收到的数据累积到此大小后写入一次临时文件（每次写入都要切换到线程池）
+WRITE_BUFFER_SIZE = 256 * 1024
+
+
+def _abort_part(f, pending: bytes, save_path: Path):
+    """传输中断：写入已收到但未落盘的数据后关闭临时文件（可续传时保留，否则删除）"""
+    try:
+        if pending and not f.closed:
+            f.write(pending)
+    finally:
+        f.close()
+        release_part(save_path)
+
+
+def _discard_hedge(target: Path):
+    """删除落败的对冲请求留下的文件"""
+    discard_part(target)
+    try:
+        target.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def is_available() -> bool:
+    """aiohttp 是否可用"""
+    return aiohttp is not None
+
+
+class AsyncDownloadEngine:
+    """基于 asyncio + aiohttp 的图片下载引擎（线程安全的提交接口）"""
+
+    def __init__(self, max_in_flight: int = 64, per_host_limit: int = 16,
+                 timeout: float = 30, retry: int = 3, fsync: str = 'file',
+                 verify_ssl: bool = False, limiter: Optional[RateLimiter] = None,
+                 breakers: Optional[CircuitBreakers] = None,
+                 adaptive: Optional[AdaptiveConcurrency] = None,
+                 tail: Optional[TailLatency] = None):
+        """
+        初始化下载引擎并启动后台事件循环
+
+        Args:
+            max_in_flight: 全局在途请求上限（跨章节、跨漫画共用）
+            per_host_limit: 单个主机的并发上限
+            timeout: 单张图片的超时时间（秒）
+            retry: 重试次数
+            fsync: fsync 策略（none / file / full）
+            verify_ssl: 是否校验 SSL 证书
+            limiter: 按主机限速器（可选，缺省时不限速，仍遵守 429/503 暂停和指数退避）
+            breakers: 按主机熔断器（可选，缺省时不熔断）
+            adaptive: 自适应并发控制器（可选，在全局预算内进一步限制并发）
+            tail: 尾延迟控制（可选，停滞检测和对冲请求；缺省时使用默认停滞检测、不对冲）
+        """
+        if aiohttp is None:
+            raise ImportError("异步下载引擎需要 aiohttp：pip install aiohttp")
+
+        self.max_in_flight = max_in_flight
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.retry = retry
+        self.fsync = normalize_fsync(fsync)
+        self.verify_ssl = verify_ssl
+        self.limiter = limiter or RateLimiter({'enabled': False})
+        self.breakers = breakers or CircuitBreakers({'enabled': False})
+        self.adaptive = adaptive
+        self.tail = tail or TailLatency()
+
+        # 统计
+        self.images_downloaded = 0
+        self.images_failed = 0
+        self.bytes_downloaded = 0
+        self.bytes_resumed = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._started_at: Optional[float] = None
+
+        # 以下对象只在事件循环线程中访问
+        self._session = None
+        self._global_limit: Optional[asyncio.Semaphore] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._adaptive_cond: Optional[asyncio.Condition] = None
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever,
+                                        name='comichub-async-download', daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._open(), self._loop).result()
+
+        logger.info(f"异步下载引擎已启动 (全局并发 {max_in_flight}, 单主机并发 {per_host_limit})")
+
+    async def _open(self):
+        """在事件循环中创建 aiohttp 会话"""
+        connector = aiohttp.TCPConnector(limit=self.max_in_flight,
+                                         limit_per_host=self.per_host_limit,
+                                         ssl=None if self.verify_ssl else False)
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            headers=DEFAULT_HEADERS,
+            # 读超时取停滞检测窗口：连接完全无数据时不必等满整个超时
+            timeout=aiohttp.ClientTimeout(total=self.timeout,
+                                          sock_read=self.tail.read_timeout(self.timeout))
+        )
+        self._global_limit = asyncio.Semaphore(self.max_in_flight)
+        self._adaptive_cond = asyncio.Condition()
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        """获取主机对应的并发限制"""
+        host = urlsplit(url).netloc
+        limit = self._host_limits.get(host)
+        if limit is None:
+            limit = self._host_limits[host] = asyncio.Semaphore(self.per_host_limit)
+        return limit
+
+    def submit(self, url: str, save_path: Path, expires: Optional[float] = None) -> Future:
+        """
+        提交一张图片的下载任务（可在任意线程调用）
+
+        Args:
+            url: 图片 URL
+            save_path: 保存路径
+            expires: URL 签名过期时间（Unix 时间戳，可选；过期后不再发出请求）
+
+        Returns:
+            concurrent.futures.Future，结果为是否成功（URL 失效时抛出 UrlExpiredError）
+        """
+        return asyncio.run_coroutine_threadsafe(self._download(url, save_path, expires), self._loop)
+
+    async def _download(self, url: str, save_path: Path, expires: Optional[float] = None) -> bool:
+        """下载单张图片（带重试）"""
+        # 检查文件是否已存在且有内容（避免重复下载）
+        if save_path.exists() and save_path.stat().st_size > 0:
+            logger.debug(f"文件已存在，跳过下载: {save_path.name}")
+            return True
+
+        attempt = 0
+        while attempt < self.retry:
+            # 熔断暂停、限速等待和退避期间不占用并发名额
+            await self.breakers.wait_async(url)
+            await self.limiter.wait_async(url)
+            # 排队期间签名已过期的 URL 必然被拒绝，不再发出请求
+            if expires and time.time() >= expires:
+                raise UrlExpiredError("签名已过期")
+            await self._acquire_adaptive()
+            started = time.monotonic()
+            outcome = OUTCOME_ERROR
+            error = None
+            try:
+                async with self._global_limit, self._host_limit(url):
+                    written, outcome = await self._fetch_hedged(url, save_path, attempt)
+                if written is not None:
+                    self.tail.record(time.monotonic() - started)
+                    self.images_downloaded += 1
+                    self.bytes_downloaded += written
+                    return True
+            except UrlExpiredError:
+                # 重试同一 URL 无效，交给调用方重新解析
+                outcome = OUTCOME_OK
+                raise
+            except (asyncio.TimeoutError, StalledTransferError) as e:
+                # 停滞中断保留 .part，下次重试用 Range 续传
+                if isinstance(e, StalledTransferError):
+                    self.tail.record_stall()
+                outcome = OUTCOME_THROTTLED
+                error = e
+            except Exception as e:
+                error = e
+            finally:
+                await self._release_adaptive(time.monotonic() - started, outcome)
+
+            # 主机熔断时的失败不消耗重试次数，下一轮在 wait_async 中等待主机恢复
+            if outcome != OUTCOME_OK and self.breakers.is_tripped(url):
+                continue
+
+            attempt += 1
+            if error is not None:
+                if attempt < self.retry:
+                    await asyncio.sleep(self.limiter.backoff_delay(attempt - 1))
+                    continue
+                logger.debug(f"下载图片失败 {url}: {error}")
+
+        self.images_failed += 1
+        return False
+
+    async def _acquire_adaptive(self):
+        """等待自适应并发名额"""
+        if self.adaptive is None:
+            return
+        async with self._adaptive_cond:
+            await self._adaptive_cond.wait_for(self.adaptive.try_acquire)
+
+    async def _release_adaptive(self, latency: float, outcome: str):
+        """记录请求结果并释放自适应并发名额（并发上调后唤醒等待者）"""
+        if self.adaptive is None:
+            return
+        self.adaptive.record(latency, outcome)
+        self.adaptive.release()
+        async with self._adaptive_cond:
+            self._adaptive_cond.notify_all()
+
+    async def _fetch_hedged(self, url: str, save_path: Path, attempt: int) -> Tuple[Optional[int], str]:
+        """
+        执行一次请求，超过近期延迟百分位仍未完成时发出对冲请求
+
+        对冲请求写入独立路径，先成功者胜出（对冲胜出时重命名为最终文件），另一方被取消。
+        """
+        delay = self.tail.hedge_delay()
+        if delay is None:
+            return await self._tracked_fetch(url, save_path, attempt)
+
+        primary = asyncio.ensure_future(self._tracked_fetch(url, save_path, attempt))
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        # 全局或主机并发名额已满时不对冲（对冲请求与主请求一样占用名额，排队等待没有意义）
+        if done or self._global_limit.locked() or self._host_limit(url).locked():
+            return await primary
+        if not self.tail.admit_hedge(url, self.limiter, self.breakers, self.adaptive):
+            return await primary
+
+        target = hedge_path(save_path)
+        secondary = asyncio.ensure_future(self._hedge_fetch(url, target, attempt))
+        logger.debug(f"请求超过 {delay:.2f}s 未完成，发出对冲请求: {save_path.name}")
+
+        pending = {primary, secondary}
+        winner = None
+        result = None
+        error = None
+        while pending and winner is None:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                try:
+                    written, outcome = task.result()
+                except Exception as e:
+                    error = error or e
+                    continue
+                result = (written, outcome)
+                if written is not None:
+                    winner = task
+                    break
+
+        # 取消落败方并清理其文件（都失败时保留主请求的 .part 以便续传）
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        if winner is secondary:
+            await self._run_io(discard_part, save_path)
+            await self._run_io(os.replace, target, save_path)
+            self.tail.record_hedge_win()
+        else:
+            await self._run_io(_discard_hedge, target)
+        if result is None:
+            raise error
+        return result
+
+    async def _hedge_fetch(self, url: str, target: Path, attempt: int) -> Tuple[Optional[int], str]:
+        """执行对冲请求（占用全局和主机并发名额），结束（含被取消）后归还自适应并发名额"""
+        try:
+            async with self._global_limit, self._host_limit(url):
+                return await self._tracked_fetch(url, target, attempt)
+        finally:
+            if self.adaptive:
+                self.adaptive.release()
+                async with self._adaptive_cond:
+                    self._adaptive_cond.notify_all()
+
+    async def _run_io(self, func, *args):
+        """在线程池中执行阻塞的文件操作"""
+        return await self._loop.run_in_executor(None, func, *args)
+
+    async def _tracked_fetch(self, url: str, save_path: Path, attempt: int) -> Tuple[Optional[int], str]:
+        """执行一次请求并统计在途数量"""
+        self.tail.record_request()
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        if self._started_at is None:
+            self._started_at = time.monotonic()
+        try:
+            return await self._fetch(url, save_path, attempt)
+        finally:
+            self.in_flight -= 1
+
+    async def _fetch(self, url: str, save_path: Path, attempt: int) -> Tuple[Optional[int], str]:
+        """
+        流式下载到临时文件并原子重命名
+
+        Returns:
+            (写入的字节数, 请求结果)，状态码非 200 时字节数为 None
+        """
+        # 上次中断保留的 .part 文件用 Range 续传
+        headers, offset = await self._run_io(resume_request_headers, save_path)
+        try:
+            response = await self._session.get(url, headers=headers)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            # 连接失败或等待响应头超时计入主机熔断
+            self.breakers.record_failure(url, e)
+            raise
+        self.breakers.record_status(url, response.status)
+        async with response:
+            if response.status == 416:
+                # 已有字节数超出文件长度，删除后从头下载
+                await self._run_io(discard_part, save_path)
+                return None, OUTCOME_ERROR
+            if response.status in RETRY_STATUS_CODES:
+                # 暂停该主机，下一次 wait_async 会等待到暂停结束
+                self.limiter.penalize(url, attempt, parse_retry_after(response.headers.get('Retry-After')))
+                return None, OUTCOME_THROTTLED
+            if response.status in EXPIRED_STATUS_CODES:
+                raise UrlExpiredError(f"状态码 {response.status}")
+            if response.status not in (200, 206):
+                logger.warning(f"下载失败 {url}: 状态码 {response.status}")
+                return None, OUTCOME_ERROR
+
+            written = 0
+            monitor = self.tail.monitor()
+            # 文件读写（打开、续传元数据、写入、fsync 和重命名）都可能阻塞，放到线程池中执行，不占用事件循环；
+            # 收到的数据先在内存中累积，每 WRITE_BUFFER_SIZE 字节写入一次
+            f, start = await self._run_io(open_part, save_path, response.status, response.headers, offset)
+            buffer = bytearray()
+            try:
+                async for chunk in response.content.iter_chunked(DEFAULT_CHUNK_SIZE):
+                    buffer += chunk
+                    written += len(chunk)
+                    monitor(len(chunk))
+                    if len(buffer) >= WRITE_BUFFER_SIZE:
+                        data, buffer = bytes(buffer), bytearray()
+                        await self._run_io(f.write, data)
+
+                verify_length(response.headers, written, save_path)
+                if buffer:
+                    data, buffer = bytes(buffer), bytearray()
+                    await self._run_io(f.write, data)
+                await self._run_io(commit_part, f, save_path, self.fsync)
+            except BaseException:
+                # 已收到的数据仍写入临时文件，可续传时下次从断点继续
+                await self._run_io(_abort_part, f, bytes(buffer), save_path)
+                raise
+
+            self.bytes_resumed += start
+            return written, OUTCOME_OK
+
+    def stats(self) -> Dict[str, float]:
+        """
+        获取下载统计
+
+        Returns:
+            {'images', 'failed', 'bytes', 'bytes_resumed', 'elapsed', 'images_per_second',
+             'bytes_per_second', 'peak_in_flight'}
+        """
+        elapsed = time.monotonic() - self._started_at if self._started_at else 0.0
+        return {
+            'images': self.images_downloaded,
+            'failed': self.images_failed,
+            'bytes': self.bytes_downloaded,
+            'bytes_resumed': self.bytes_resumed,
+            'elapsed': elapsed,
+            'images_per_second': self.images_downloaded / elapsed if elapsed else 0.0,
+            'bytes_per_second': self.bytes_downloaded / elapsed if elapsed else 0.0,
+            'peak_in_flight': self.peak_in_flight,
+        }
+
+    def log_stats(self):
+        """在日志中输出下载吞吐量"""
+        stats = self.stats()
+        if not stats['images'] and not stats['failed']:
+            return
+        logger.info(f"异步下载统计: 成功 {stats['images']} 张, 失败 {stats['failed']} 张, "
+                    f"{stats['bytes'] / 1024 / 1024:.1f} MB / {stats['elapsed']:.1f}s, "
+                    f"{stats['images_per_second']:.1f} 张/s, "
+                    f"{stats['bytes_per_second'] / 1024 / 1024:.2f} MB/s, "
+                    f"峰值并发 {stats['peak_in_flight']}, "
+                    f"断点续传复用 {stats['bytes_resumed'] / 1024 / 1024:.2f} MB")
+
+    async def _close(self):
+        """在事件循环中关闭 aiohttp 会话"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def close(self):
+        """关闭会话并停止后台事件循环"""
+        if not self._loop.is_running():
+            return
+        self.log_stats()
+        asyncio.run_coroutine_threadsafe(self._close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
@@ -4,16 +4,46 @@
 """
 
 import logging
+import os
+import threading
 import time
 import requests
 from pathlib import Path
-from typing import List, Dict, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Optional, Iterator, Tuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from tqdm import tqdm
 
+from comichub.core.breaker import CircuitBreakers, get_circuit_breakers
 from comichub.core.config import get_config
 from comichub.core.database import Database
-from comichub.core.fetcher import ManhuaGuiFetcherSelenium
+from comichub.core.fetcher import create_fetcher
+from comichub.core.writebehind import WriteBehind
+from comichub.core.ratelimit import RETRY_STATUS_CODES, RateLimiter, get_rate_limiter, parse_retry_after
+from comichub.core.unpacker import signed_url_expiry
+from comichub.downloader import async_engine
+from comichub.downloader.adaptive import (
+    OUTCOME_ERROR,
+    OUTCOME_OK,
+    OUTCOME_THROTTLED,
+    AdaptiveConcurrency,
+)
+from comichub.downloader.hedging import StalledTransferError, TailLatency
+from comichub.downloader.jobqueue import ImageJobQueue
+from comichub.downloader.pipeline import prefetch
+from comichub.downloader.session import (
+    EXPIRED_STATUS_CODES,
+    UrlExpiredError,
+    create_download_session,
+    log_connection_stats,
+)
+from comichub.downloader.storage import (
+    discard_part,
+    hedge_path,
+    is_partial_file,
+    resume_request_headers,
+    save_response,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -21,36 +51,155 @@ logger = logging.getLogger(__name__)
 class BatchDownloader:
     """批量下载器"""
 
-    def __init__(self, config_path: str = "config.yaml"):
+    def __init__(self, config_path: str = "config.yaml", fetcher=None,
+                 db: Optional[Database] = None, use_database: bool = True,
+                 fetch_config: Optional[Dict] = None,
+                 limiter: Optional[RateLimiter] = None,
+                 breakers: Optional[CircuitBreakers] = None):
         """
         初始化批量下载器
 
+        传入的抓取器和数据库由调用方负责关闭，多部漫画可共用同一个浏览器和连接。
+        抓取器在首次解析页面时才创建，只下载已解析的章节（如离线测试）时不启动浏览器。
+
         Args:
             config_path: 配置文件路径
+            fetcher: 已有的抓取器（可选，缺省时在首次使用时自行创建）
+            db: 已有的数据库连接（可选，缺省时自行创建）
+            use_database: 是否使用数据库（False 时不连接，也不启用下载队列和写缓冲）
+            fetch_config: 抓取配置（可选，缺省时读取配置文件的 fetch 节）
+            limiter: 按主机限速器（可选，缺省时使用全局实例）
+            breakers: 按主机熔断器（可选，缺省时使用全局实例）
         """
+        self.config_path = config_path
         self.config_loader = get_config(config_path)
-        self.fetch_config = self.config_loader.get_fetch_config()
+        self.fetch_config = fetch_config if fetch_config is not None else self.config_loader.get_fetch_config()
         self.save_path = self.config_loader.get_save_path()
 
         # 抓取配置
         self.concurrent_downloads = self.fetch_config.get('concurrent_downloads', 5)
-        self.delay = self.fetch_config.get('delay', 1)
+        self.delay = self.fetch_config.get('delay', 0)
         self.retry = self.fetch_config.get('retry', 3)
         self.timeout = self.fetch_config.get('timeout', 30)
+        self.fsync = self.fetch_config.get('fsync', 'file')
+        # 提前解析的章节数（0 表示解析与下载串行）
+        self.prefetch_chapters = self.fetch_config.get('prefetch_chapters', 2)
+        # 增量模式：数据库标记已下载且目录中文件数达到页数的章节不再解析
+        self.incremental = self.fetch_config.get('incremental', True)
+
+        # 按主机限速（与抓取器共用同一个实例）
+        self.limiter = limiter or get_rate_limiter(config_path)
+        # 按主机熔断（与抓取器共用）：主机故障时暂停下载，状态变化写入 fetch_history
+        self.breakers = breakers or get_circuit_breakers(config_path)
+
+        # 自适应并发（fetch.adaptive.enabled，AIMD：延迟和错误率正常时加一，限流时减半）
+        adaptive_config = self.fetch_config.get('adaptive', {})
+        self.adaptive = None
+        if adaptive_config.get('enabled', False):
+            self.adaptive = AdaptiveConcurrency(adaptive_config, initial=self.concurrent_downloads)
+        # 线程池与连接池按并发上限创建，实际并发由控制器限制
+        self.max_workers = self.adaptive.max_limit if self.adaptive else self.concurrent_downloads
+
+        # 单个抓取器不是线程安全的：流水线线程解析后续章节时，重新解析当前章节需互斥
+        self._fetcher_lock = threading.Lock()
+        # 近期下载速度（张/秒），用于判断章节能否在签名过期前下载完
+        self._throughput = 0.0
+
+        # 尾延迟控制：停滞检测（fetch.stall）与可选的对冲请求（fetch.hedge）
+        self.tail = TailLatency(self.fetch_config.get('stall', {}), self.fetch_config.get('hedge', {}))
+
+        # 断点续传复用的字节数（线程池模式）
+        self.bytes_resumed = 0
+        self._stats_lock = threading.Lock()
+
+        # 图片下载会话（所有章节共用，连接池大小与并发数一致；对冲请求最多使并发翻倍）
+        self.session = create_download_session(
+            self.max_workers * 2 if self.tail.hedge_enabled else self.max_workers)
+
+        # 异步下载引擎（fetch.engine = async 时启用，全局并发预算跨章节共用）
+        self.engine = self._create_engine()
+
+        # 线程池模式的对冲请求在独立线程中执行（主请求与对冲请求各占一个线程）
+        self._hedge_pool = None
+        if self.tail.hedge_enabled and not self.engine:
+            self._hedge_pool = ThreadPoolExecutor(max_workers=self.max_workers * 2,
+                                                  thread_name_prefix='comichub-hedge')
 
         # 初始化数据库
-        try:
-            self.db = Database(config_path)
-            logger.info("数据库初始化成功")
-        except Exception as e:
-            logger.warning(f"数据库初始化失败: {e}")
+        self._owns_db = db is None
+        if db is not None:
+            self.db = db
+        elif not use_database:
             self.db = None
+        else:
+            try:
+                self.db = Database(config_path)
+                logger.info("数据库初始化成功")
+            except Exception as e:
+                logger.warning(f"数据库初始化失败: {e}")
+                self.db = None
+
+        # 下载状态写缓冲（database.write_behind，后台批量提交，章节结束时同步刷新）
+        self.writer = None
+        write_config = self.config_loader.get_database_config().get('write_behind', {})
+        if self.db and write_config.get('enabled', True):
+            self.writer = WriteBehind(self.db,
+                                      batch_size=write_config.get('batch_size', 500),
+                                      flush_interval=write_config.get('flush_interval', 1.0))
+
+        # 页级下载队列（需要数据库；重启后从中断处继续，已登记的章节不再重新解析）
+        self.queue = None
+        queue_config = self.fetch_config.get('queue', {})
+        # 签名 URL 过期后本次运行内重新解析章节的次数
+        self.reresolve_attempts = queue_config.get('reresolve_attempts', 2)
+        self.expiry_margin = queue_config.get('expiry_margin', 120)
+        if self.db:
+            self.queue = ImageJobQueue(self.db,
+                                       lease_seconds=queue_config.get('lease_seconds', 600),
+                                       max_attempts=queue_config.get('max_attempts', 5),
+                                       writer=self.writer,
+                                       expiry_margin=self.expiry_margin)
+
+        # 熔断状态变化可能发生在异步引擎的事件循环线程中：无写缓冲时交给单独线程写入，不阻塞事件循环
+        self._history_pool = None
+        if self.db:
+            if not self.writer:
+                self._history_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='comichub-history')
+            self.breakers.add_listener(self._record_breaker_transition)
 
-        # 初始化抓取器
-        self.fetcher = ManhuaGuiFetcherSelenium(headless=True)
+        # 抓取器（browser.pool_size > 1 时为抓取器池；未传入时懒加载）
+        self._owns_fetcher = fetcher is None
+        self._fetcher = fetcher
 
         logger.info("批量下载器初始化成功")
 
+    @property
+    def fetcher(self):
+        """抓取器（未传入时首次访问才启动浏览器）"""
+        if self._fetcher is None:
+            self._fetcher = create_fetcher(headless=True, config_path=self.config_path)
+        return self._fetcher
+
+    def _create_engine(self) -> Optional['async_engine.AsyncDownloadEngine']:
+        """按配置创建异步下载引擎，未启用或缺少 aiohttp 时返回 None（使用线程池）"""
+        if self.fetch_config.get('engine', 'threads') != 'async':
+            return None
+        if not async_engine.is_available():
+            logger.warning("未安装 aiohttp，回退到线程池下载")
+            return None
+
+        return async_engine.AsyncDownloadEngine(
+            max_in_flight=self.fetch_config.get('max_in_flight', 64),
+            per_host_limit=self.fetch_config.get('per_host_limit', 16),
+            timeout=self.timeout,
+            retry=self.retry,
+            fsync=self.fsync,
+            limiter=self.limiter,
+            breakers=self.breakers,
+            adaptive=self.adaptive,
+            tail=self.tail
+        )
+
     def download_comic(self, comic_url: str, start_chapter: Optional[int] = None,
                        end_chapter: Optional[int] = None, reverse_chapters: bool = False) -> Dict:
         """
@@ -73,16 +222,20 @@ class BatchDownloader:
             'downloaded_chapters': 0,
             'total_images': 0,
             'downloaded_images': 0,
-            'failed_images': 0
+            'failed_images': 0,
+            'skipped_chapters': 0
         }
 
         try:
-            # 获取漫画信息
-            comic_info = self.fetcher.get_comic_info(comic_url)
-            if not comic_info:
+            # 获取漫画信息和章节列表（一次页面加载）
+            comic_page = self.fetcher.get_comic_page(comic_url)
+            if not comic_page:
                 logger.error(f"无法获取漫画信息: {comic_url}")
                 return stats
 
+            comic_info = comic_page['info']
+            chapters = comic_page['chapters']
+
             stats['comic_name'] = comic_info['name']
             comic_name = comic_info['name']
 
@@ -99,15 +252,15 @@ class BatchDownloader:
                         name=comic_name,
                         url=comic_url,
                         description=comic_info.get('description'),
-                        cover_image=comic_info.get('cover_image')
+                        cover_image=comic_info.get('cover_image'),
+                        author=comic_info.get('author'),
+                        status=comic_info.get('status')
                     )
                     self.db.add_fetch_history(comic_id=comic_id, fetch_type='comic',
                                             status='success', metadata={'url': comic_url})
                 except Exception as e:
                     logger.warning(f"保存漫画信息到数据库失败: {e}")
 
-            # 获取章节列表
-            chapters = self.fetcher.get_chapters(comic_url)
             if not chapters:
                 logger.error(f"无法获取章节列表: {comic_url}")
                 return stats
@@ -124,37 +277,81 @@ class BatchDownloader:
                 chapters = self._filter_chapters(chapters, start_chapter, end_chapter)
                 logger.info(f"过滤后章节数: {len(chapters)}")
 
-            # 下载章节
-            for i, chapter in enumerate(chapters, 1):
-                chapter_num = chapter['chapter_num']
-                chapter_title = chapter['title']
-                chapter_url = chapter['url']
-
-                logger.info(f"下载章节 [{i}/{len(chapters)}]: {chapter_title}")
-
-                chapter_stats = self.download_chapter(
-                    comic_id=comic_id,
-                    chapter_url=chapter_url,
-                    chapter_num=chapter_num,
-                    chapter_title=chapter_title,
-                    comic_dir=comic_dir
-                )
-
+            # 增量模式：跳过已完整下载的章节（不经过抓取器）
+            chapters_in_range = chapters
+            if self.incremental:
+                complete = self._complete_chapters(chapters, comic_dir)
+                if complete:
+                    chapters = [chapter for chapter in chapters if chapter['url'] not in complete]
+                    stats['skipped_chapters'] = len(complete)
+                    logger.info(f"增量模式: 跳过 {len(complete)} 个已完整下载的章节，"
+                                f"待处理 {len(chapters)} 个")
+
+            # 下载章节：后台线程提前解析后续章节的图片列表（有界队列），
+            # 浏览器解析与图片下载同时进行；抓取器池还会并行解析多个章节。
+            # 异步引擎模式下章节解析完即提交，不等上一章下载完，章节之间在途请求不归零
+            resolved_iter = prefetch(self._resolve_chapter_images(chapters), self.prefetch_chapters)
+            resolve_wait = 0.0
+            download_time = 0.0
+            started = time.monotonic()
+            active: List[Dict] = []
+
+            def add_stats(chapter_stats: Dict):
                 stats['downloaded_chapters'] += chapter_stats['success']
                 stats['total_images'] += chapter_stats['total_images']
                 stats['downloaded_images'] += chapter_stats['downloaded_images']
                 stats['failed_images'] += chapter_stats['failed_images']
 
-                # 延迟
-                time.sleep(self.delay)
+            try:
+                for i, chapter in enumerate(chapters, 1):
+                    waited_at = time.monotonic()
+                    resolved = next(resolved_iter)
+                    resolve_wait += time.monotonic() - waited_at
+
+                    logger.info(f"下载章节 [{i}/{len(chapters)}]: {chapter['title']}")
+
+                    download_started = time.monotonic()
+                    if self.engine:
+                        # 在途图片达到全局预算时先等待，期间收尾已下载完的章节
+                        for chapter_stats in self._drain_chapters(active, self.engine.max_in_flight):
+                            add_stats(chapter_stats)
+                        active.append(self._start_chapter(comic_id, chapter['url'], chapter['chapter_num'],
+                                                          chapter['title'], comic_dir, resolved))
+                    else:
+                        add_stats(self.download_chapter(
+                            comic_id=comic_id,
+                            chapter_url=chapter['url'],
+                            chapter_num=chapter['chapter_num'],
+                            chapter_title=chapter['title'],
+                            comic_dir=comic_dir,
+                            resolved=resolved
+                        ))
+                    download_time += time.monotonic() - download_started
+
+                    # 固定延迟（已由按主机限速取代，默认 0）
+                    if self.delay:
+                        time.sleep(self.delay)
+
+            finally:
+                resolved_iter.close()
+                # 等待已提交的章节下载完并收尾（出错中断时同样记录结果）
+                download_started = time.monotonic()
+                for chapter_stats in self._drain_chapters(active, 0):
+                    add_stats(chapter_stats)
+                download_time += time.monotonic() - download_started
+
+            logger.info(f"章节流水线: 总耗时 {time.monotonic() - started:.1f}s, "
+                        f"下载 {download_time:.1f}s, 等待图片列表解析 {resolve_wait:.1f}s")
 
             # 生成 info.txt
             if self.db and comic_id:
-                self._generate_info_txt(comic_id, comic_dir, comic_info, chapters)
+                self._generate_info_txt(comic_id, comic_dir, comic_info, chapters_in_range)
 
             logger.info(f"漫画下载完成: {comic_name}")
             logger.info(f"  总章节: {stats['total_chapters']}")
             logger.info(f"  已下载: {stats['downloaded_chapters']}")
+            if stats['skipped_chapters']:
+                logger.info(f"  已跳过（此前已完整下载）: {stats['skipped_chapters']}")
             logger.info(f"  总图片: {stats['total_images']}")
             logger.info(f"  成功: {stats['downloaded_images']}")
             logger.info(f"  失败: {stats['failed_images']}")
@@ -166,9 +363,94 @@ class BatchDownloader:
 
         return stats
 
+    def _complete_chapters(self, chapters: List[Dict], comic_dir: Path) -> set:
+        """
+        找出已完整下载的章节
+
+        数据库中标记已下载、且章节目录中非空图片文件数达到页数的章节视为完整，
+        每个章节只扫描一次目录。
+
+        Args:
+            chapters: 章节列表
+            comic_dir: 漫画目录
+
+        Returns:
+            完整章节的 URL 集合
+        """
+        if not self.db:
+            return set()
+        try:
+            page_counts = self.db.get_downloaded_page_counts([chapter['url'] for chapter in chapters])
+        except Exception as e:
+            logger.warning(f"读取章节下载状态失败，不跳过任何章节: {e}")
+            return set()
+
+        complete = set()
+        for chapter in chapters:
+            page_count = page_counts.get(chapter['url'])
+            if not page_count:
+                continue
+            chapter_dir = comic_dir / self._sanitize_filename(chapter['title'])
+            if self._count_files(chapter_dir) >= page_count:
+                complete.add(chapter['url'])
+        return complete
+
+    @staticmethod
+    def _count_files(directory: Path) -> int:
+        """统计目录中非空的已完成文件数（忽略下载中的临时文件）"""
+        try:
+            with os.scandir(directory) as entries:
+                return sum(1 for entry in entries
+                           if entry.is_file() and not is_partial_file(Path(entry.name))
+                           and entry.stat().st_size > 0)
+        except OSError:
+            return 0
+
+    def _resolve_chapter_images(self, chapters: List[Dict]) -> Iterator[Dict]:
+        """
+        按章节顺序解析图片列表
+
+        下载队列中已登记全部图片 URL 的章节直接复用，其余章节由抓取器解析：
+        抓取器池或混合抓取器提供 imap_images 时并行解析，否则逐章调用 get_images。
+
+        Args:
+            chapters: 章节列表
+
+        Yields:
+            与 get_images 相同格式的结果
+        """
+        chapter_urls = [chapter['url'] for chapter in chapters]
+        recorded = self.queue.recorded_chapters(chapter_urls) if self.queue else {}
+        if recorded:
+            logger.info(f"{len(recorded)} 个章节已登记图片列表，跳过解析")
+
+        to_resolve = [url for url in chapter_urls if url not in recorded]
+        resolved_iter = self._resolve_with_fetcher(to_resolve)
+        try:
+            for chapter_url in chapter_urls:
+                if chapter_url in recorded:
+                    yield recorded[chapter_url]
+                else:
+                    yield next(resolved_iter)
+        finally:
+            resolved_iter.close()
+
+    def _resolve_with_fetcher(self, chapter_urls: List[str]) -> Iterator[Dict]:
+        """通过抓取器按顺序解析章节图片列表"""
+        if hasattr(self.fetcher, 'imap_images'):
+            yield from self.fetcher.imap_images(chapter_urls)
+        else:
+            for chapter_url in chapter_urls:
+                try:
+                    yield self._get_images(chapter_url)
+                except Exception as e:
+                    # 解析在流水线线程中进行，失败时交给 download_chapter 按空列表处理
+                    logger.error(f"解析图片列表失败: {chapter_url}, 错误: {e}")
+                    yield {'images': [], 'total_count': 0}
+
     def download_chapter(self, comic_id: Optional[int], chapter_url: str,
                         chapter_num: str, chapter_title: str,
-                        comic_dir: Path) -> Dict:
+                        comic_dir: Path, resolved: Optional[Dict] = None) -> Dict:
         """
         下载单个章节
 
@@ -178,28 +460,54 @@ class BatchDownloader:
             chapter_num: 章节号
             chapter_title: 章节标题
             comic_dir: 漫画目录
+            resolved: 已解析的图片列表（可选，缺省时调用 get_images）
 
         Returns:
             章节下载统计
         """
-        stats = {
-            'success': False,
-            'total_images': 0,
-            'downloaded_images': 0,
-            'failed_images': 0
+        task = self._start_chapter(comic_id, chapter_url, chapter_num, chapter_title, comic_dir, resolved)
+        return self._finish_chapter(task)
+
+    def _start_chapter(self, comic_id: Optional[int], chapter_url: str,
+                       chapter_num: str, chapter_title: str,
+                       comic_dir: Path, resolved: Optional[Dict] = None) -> Dict:
+        """
+        准备章节（目录、数据库、下载队列）并提交图片下载任务，不等待下载完成
+
+        Args:
+            同 download_chapter
+
+        Returns:
+            章节任务（交给 _finish_chapter 收尾；无需下载时 futures 为空）
+        """
+        task = {
+            'comic_id': comic_id,
+            'chapter_url': chapter_url,
+            'chapter_title': chapter_title,
+            'chapter_id': None,
+            'stats': {
+                'success': False,
+                'total_images': 0,
+                'downloaded_images': 0,
+                'failed_images': 0
+            },
+            'futures': {},
+            'executor': None,
+            'started': False,
+            'queued': False
         }
 
         try:
             # 获取图片列表和总数
-            result = self.fetcher.get_images(chapter_url)
+            result = resolved if resolved is not None else self._get_images(chapter_url)
             images = result['images']
             total_count = result['total_count']
 
             if not images:
                 logger.warning(f"无法获取图片列表: {chapter_url}")
-                return stats
+                return task
 
-            stats['total_images'] = total_count
+            task['stats']['total_images'] = total_count
 
             # 创建章节目录（使用章节标题）
             chapter_dir_name = self._sanitize_filename(chapter_title)
@@ -219,6 +527,7 @@ class BatchDownloader:
                     )
                 except Exception as e:
                     logger.warning(f"保存章节信息到数据库失败: {e}")
+            task['chapter_id'] = chapter_id
 
             # 下载图片
             downloaded_count = 0
@@ -227,43 +536,139 @@ class BatchDownloader:
             # 计算补零位数（基于总页数）
             zero_pad_width = len(str(total_count))
 
-            with ThreadPoolExecutor(max_workers=self.concurrent_downloads) as executor:
-                futures = {}
-                for img_info in images:
-                    # img_info 现在是字典格式 {'url': str, 'page': int}
-                    img_url = img_info['url']
-                    page_num = img_info['page']
-
-                    # 使用页码作为文件名，根据总页数补零
-                    filename = f"{page_num:0{zero_pad_width}d}.jpg"
-                    save_path = chapter_dir / filename
-
-                    future = executor.submit(self._download_image, img_url, save_path)
-                    futures[future] = (page_num, filename)
-
-                # 等待完成
-                for future in tqdm(as_completed(futures), total=len(futures),
-                                 desc=f"下载 {chapter_dir_name}", unit="张"):
-                    page_num, filename = futures[future]
-                    try:
-                        success = future.result()
-                        if success:
-                            downloaded_count += 1
-                        else:
-                            failed_count += 1
-                    except Exception as e:
-                        logger.error(f"下载图片异常 {filename}: {e}")
-                        failed_count += 1
+            # 使用页码作为文件名，根据总页数补零
+            jobs = [{
+                'id': None,
+                'page': img_info['page'],
+                'url': img_info['url'],
+                'file_path': str(chapter_dir / f"{img_info['page']:0{zero_pad_width}d}.jpg"),
+                'expires': signed_url_expiry(img_info['url'])
+            } for img_info in images]
+
+            # 登记到下载队列并只下载领取到的任务（已完成、已达尝试上限或被其他进程领取的跳过）
+            # 失败数只统计本进程领取的页，章节是否完成收尾时按 images 表判断
+            leased = self.queue.prepare(chapter_id, jobs) if self.queue and chapter_id else None
+            if leased is not None:
+                task['queued'] = True
+                leased_pages = {row['page_num'] for row in leased}
+                skipped_count = 0
+                for job in jobs:
+                    if job['page'] in leased_pages:
+                        continue
+                    if Path(job['file_path']).exists():
+                        downloaded_count += 1
+                    else:
+                        skipped_count += 1
+                jobs = [{'id': row['id'], 'page': row['page_num'], 'url': row['url'],
+                         'file_path': row['file_path'], 'expires': signed_url_expiry(row['url'])}
+                        for row in leased]
+                if downloaded_count or skipped_count:
+                    logger.info(f"下载队列: 领取 {len(jobs)} 张, 已完成 {downloaded_count} 张, "
+                                f"跳过 {skipped_count} 张（已达尝试上限或由其他进程下载）")
+
+            # 复用的旧 URL 剩余签名时间不足以下载完本章时，先重新解析整章
+            if resolved is not None and resolved.get('recorded') and not self._fits_signing_window(jobs):
+                logger.info(f"已登记的图片 URL 即将过期，重新解析章节: {chapter_title}")
+                refreshed = {job['page']: job for job in self._refresh_urls(chapter_url, chapter_id, jobs)}
+                jobs = [refreshed.get(job['page'], job) for job in jobs]
+
+            # 异步引擎共用全局并发预算；线程池模式每章创建一个线程池
+            if not self.engine:
+                task['executor'] = ThreadPoolExecutor(max_workers=self.max_workers)
+            task.update({
+                'images': len(images),
+                'desc': f"下载 {chapter_dir_name}",
+                'downloaded': downloaded_count,
+                'failed': failed_count,
+                'download_started': time.monotonic(),
+                'futures': self._submit_jobs(jobs, task['executor']),
+                'started': True
+            })
+
+        except Exception as e:
+            if task['executor']:
+                task['executor'].shutdown(wait=False, cancel_futures=True)
+            self._record_chapter_error(task, e)
+
+        return task
+
+    def _finish_chapter(self, task: Dict) -> Dict:
+        """
+        等待章节的图片下载完成并收尾（重新解析过期 URL、更新下载状态）
+
+        Args:
+            task: _start_chapter 返回的章节任务
+
+        Returns:
+            章节下载统计
+        """
+        stats = task['stats']
+        if not task['started']:
+            return stats
+
+        chapter_url = task['chapter_url']
+        chapter_title = task['chapter_title']
+        chapter_id = task['chapter_id']
+        comic_id = task['comic_id']
+        executor = task['executor']
+        desc = task['desc']
+
+        try:
+            downloaded_count = task['downloaded']
+            failed_count = task['failed']
+            try:
+                downloaded, failed, expired = self._collect_jobs(task['futures'], desc)
+                downloaded_count += downloaded
+                failed_count += failed
+
+                # 签名过期的页：只重新解析本章，按页码合并新 URL 后继续下载
+                for _ in range(self.reresolve_attempts):
+                    if not expired:
+                        break
+                    logger.info(f"{len(expired)} 张图片 URL 已过期，重新解析章节: {chapter_title}")
+                    refreshed = self._refresh_urls(chapter_url, chapter_id, expired)
+                    if not refreshed:
+                        break
+                    refreshed_pages = {job['page'] for job in refreshed}
+                    unchanged = [job for job in expired if job['page'] not in refreshed_pages]
+                    downloaded, failed, expired = self._collect_jobs(
+                        self._submit_jobs(refreshed, executor), desc)
+                    downloaded_count += downloaded
+                    failed_count += failed
+                    expired += unchanged
+            finally:
+                if executor:
+                    executor.shutdown(wait=True)
+
+            # 仍然失效的页回到 pending（不计入尝试次数），下次运行重新解析
+            for job in expired:
+                failed_count += 1
+                if job['id'] is not None:
+                    self.queue.expire(job['id'])
+            if expired:
+                logger.warning(f"{len(expired)} 张图片 URL 重新解析后仍失效: {chapter_title}")
+
+            self._update_throughput(downloaded_count, time.monotonic() - task['download_started'])
 
             stats['downloaded_images'] = downloaded_count
             stats['failed_images'] = failed_count
             stats['success'] = downloaded_count > 0
 
-            # 标记章节已下载
+            # 全部页面成功才标记章节已下载（增量模式据此跳过章节），经写缓冲，章节结束时同步刷新
             if self.db and chapter_id:
+                writes = self.writer or self.db
                 try:
-                    self.db.mark_chapter_downloaded(chapter_id)
-                    self.db.add_fetch_history(
+                    if task['queued']:
+                        # 其他进程领取的页可能仍在下载：先写入本进程的结果，再按 images 表判断，
+                        # 由最后完成的进程标记章节
+                        if self.writer:
+                            self.writer.flush()
+                        complete = self.queue.chapter_complete(chapter_id)
+                    else:
+                        complete = failed_count == 0
+                    if complete:
+                        writes.mark_chapter_downloaded(chapter_id)
+                    writes.add_fetch_history(
                         comic_id=comic_id,
                         chapter_id=chapter_id,
                         fetch_type='chapter',
@@ -275,64 +680,401 @@ class BatchDownloader:
                     )
                 except Exception as e:
                     logger.warning(f"更新章节状态失败: {e}")
+            if self.writer:
+                self.writer.flush()
 
-            logger.info(f"章节下载完成: {chapter_title} ({downloaded_count}/{len(images)})")
+            logger.info(f"章节下载完成: {chapter_title} ({downloaded_count}/{task['images']})")
 
         except Exception as e:
-            logger.error(f"下载章节失败: {chapter_url}, 错误: {e}")
-            if self.db and comic_id:
-                try:
-                    self.db.add_fetch_history(
-                        comic_id=comic_id,
-                        fetch_type='chapter',
-                        status='failed',
-                        error_msg=str(e),
-                        metadata={'chapter_url': chapter_url}
-                    )
-                except:
-                    pass
+            self._record_chapter_error(task, e)
 
         return stats
 
-    def _download_image(self, url: str, save_path: Path) -> bool:
+    def _record_chapter_error(self, task: Dict, error: Exception):
+        """记录章节下载失败"""
+        logger.error(f"下载章节失败: {task['chapter_url']}, 错误: {error}")
+        if self.db and task['comic_id']:
+            try:
+                self.db.add_fetch_history(
+                    comic_id=task['comic_id'],
+                    fetch_type='chapter',
+                    status='failed',
+                    error_msg=str(error),
+                    metadata={'chapter_url': task['chapter_url']}
+                )
+            except:
+                pass
+
+    def _drain_chapters(self, active: List[Dict], limit: int) -> List[Dict]:
+        """
+        收尾已下载完的章节，在途图片数不少于 limit 时等待任一图片完成
+
+        Args:
+            active: 已提交、尚未收尾的章节任务（收尾后移除）
+            limit: 在途图片数低于此值时返回（0 表示等待全部章节收尾）
+
+        Returns:
+            收尾章节的下载统计
+        """
+        finished = []
+        while active:
+            done = [task for task in active if all(future.done() for future in task['futures'])]
+            for task in done:
+                active.remove(task)
+                finished.append(self._finish_chapter(task))
+            if done:
+                continue
+
+            pending = [future for task in active for future in task['futures'] if not future.done()]
+            if len(pending) < limit:
+                break
+            wait(pending, timeout=self._renew_interval(), return_when=FIRST_COMPLETED)
+            self._renew_leases()
+        return finished
+
+    def _renew_interval(self) -> Optional[float]:
+        """等待图片完成时的最长阻塞时间（有下载队列时按续约间隔醒来）"""
+        return self.queue.renew_interval if self.queue else None
+
+    def _renew_leases(self):
+        """为仍在下载的图片任务续约（慢章节或熔断暂停期间租约不会过期被其他进程领走）"""
+        if self.queue:
+            self.queue.renew()
+
+    def _submit_jobs(self, jobs: List[Dict], executor: Optional[ThreadPoolExecutor]) -> Dict:
+        """
+        提交一批图片任务
+
+        Args:
+            jobs: [{'id', 'page', 'url', 'file_path', 'expires'}, ...]
+            executor: 线程池（使用异步引擎时为 None）
+
+        Returns:
+            {future: job}
+        """
+        futures = {}
+        for job in jobs:
+            save_path = Path(job['file_path'])
+            if self.engine:
+                future = self.engine.submit(job['url'], save_path, job.get('expires'))
+            else:
+                future = executor.submit(self._download_image, job['url'], save_path, job.get('expires'))
+            futures[future] = job
+        return futures
+
+    def _collect_jobs(self, futures: Dict, desc: str) -> Tuple[int, int, List[Dict]]:
+        """
+        等待一批图片任务完成并更新下载队列
+
+        Args:
+            futures: _submit_jobs 的返回值
+            desc: 进度条描述
+
+        Returns:
+            (成功数, 失败数, URL 已过期或失效的任务列表)
+        """
+        downloaded = 0
+        failed = 0
+        expired = []
+
+        # 等待完成（有下载队列时定期醒来续约）
+        with tqdm(total=len(futures), desc=desc, unit="张") as progress:
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, timeout=self._renew_interval(), return_when=FIRST_COMPLETED)
+                self._renew_leases()
+                for future in done:
+                    progress.update(1)
+                    result = self._collect_job(future, futures[future])
+                    if result == 'expired':
+                        expired.append(futures[future])
+                    elif result == 'ok':
+                        downloaded += 1
+                    else:
+                        failed += 1
+
+        return downloaded, failed, expired
+
+    def _collect_job(self, future, job: Dict) -> str:
+        """
+        读取单个图片任务的结果并更新下载队列
+
+        Returns:
+            'ok'、'failed' 或 'expired'
+        """
+        error = None
+        try:
+            if not future.result():
+                error = "重试后仍下载失败"
+        except UrlExpiredError as e:
+            # 交给调用方重新解析章节，不计入失败
+            logger.debug(f"图片 URL 已失效 {Path(job['file_path']).name}: {e}")
+            return 'expired'
+        except Exception as e:
+            logger.error(f"下载图片异常 {Path(job['file_path']).name}: {e}")
+            error = str(e)
+
+        if job['id'] is not None:
+            if error is None:
+                self.queue.complete(job['id'])
+            else:
+                self.queue.fail(job['id'], error)
+        return 'ok' if error is None else 'failed'
+
+    def _get_images(self, chapter_url: str) -> Dict:
+        """解析章节图片列表（单个浏览器抓取器不是线程安全的，与流水线线程互斥；池和混合抓取器自身线程安全）"""
+        if hasattr(self.fetcher, 'imap_images'):
+            return self.fetcher.get_images(chapter_url)
+        with self._fetcher_lock:
+            return self.fetcher.get_images(chapter_url)
+
+    def _refresh_urls(self, chapter_url: str, chapter_id: Optional[int], jobs: List[Dict]) -> List[Dict]:
+        """
+        重新解析章节，按页码为指定任务换上新的图片 URL
+
+        Args:
+            chapter_url: 章节URL
+            chapter_id: 章节ID（有下载队列时同步更新登记的 URL 和过期时间）
+            jobs: 需要更新 URL 的任务
+
+        Returns:
+            URL 已更新的任务列表
+        """
+        try:
+            result = self._get_images(chapter_url)
+        except Exception as e:
+            logger.error(f"重新解析章节失败: {chapter_url}, 错误: {e}")
+            return []
+
+        urls = {img['page']: img['url'] for img in result.get('images', [])}
+        refreshed = []
+        for job in jobs:
+            url = urls.get(job['page'])
+            if url and url != job['url']:
+                refreshed.append(dict(job, url=url, expires=signed_url_expiry(url)))
+
+        if refreshed and self.queue and chapter_id:
+            self.queue.refresh(chapter_id, refreshed)
+        logger.info(f"重新解析章节: 更新 {len(refreshed)}/{len(jobs)} 张图片 URL")
+        return refreshed
+
+    def _fits_signing_window(self, jobs: List[Dict]) -> bool:
+        """按近期下载速度估算，本章能否在 URL 签名过期前（留出余量）下载完"""
+        expiries = [job['expires'] for job in jobs if job.get('expires')]
+        if not expiries:
+            return True
+        estimate = len(jobs) / self._throughput if self._throughput else 0.0
+        return min(expiries) - time.time() > estimate + self.expiry_margin
+
+    def _update_throughput(self, images: int, elapsed: float):
+        """更新下载速度估计（张/秒，指数滑动平均）"""
+        if images <= 0 or elapsed <= 0:
+            return
+        rate = images / elapsed
+        self._throughput = rate if not self._throughput else 0.7 * self._throughput + 0.3 * rate
+
+    def _download_image(self, url: str, save_path: Path, expires: Optional[float] = None) -> bool:
         """
         下载单张图片
 
         Args:
             url: 图片URL
             save_path: 保存路径
+            expires: URL 签名过期时间（Unix 时间戳，可选；过期后不再发出请求）
 
         Returns:
             是否成功
+
+        Raises:
+            UrlExpiredError: URL 签名已过期，或 CDN 返回 403/410
         """
-        # 检查文件是否已存在且有内容（避免重复下载）
+        # 检查文件是否已存在且有内容（避免重复下载；最终文件只在完整写入后才会出现）
         if save_path.exists() and save_path.stat().st_size > 0:
             logger.debug(f"文件已存在，跳过下载: {save_path.name}")
             return True
 
-        for attempt in range(self.retry):
+        attempt = 0
+        while attempt < self.retry:
+            # 主机熔断期间暂停，恢复（或半开探测放行）后继续
+            self.breakers.wait(url)
+            self.limiter.wait(url)
+            # 排队期间签名已过期的 URL 必然被拒绝，不再发出请求
+            if expires and time.time() >= expires:
+                raise UrlExpiredError("签名已过期")
+            if self.adaptive:
+                self.adaptive.acquire()
+            started = time.monotonic()
+            outcome = OUTCOME_ERROR
+            error = None
             try:
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
-                    'Referer': 'https://m.manhuagui.com/'
-                }
-
-                response = requests.get(url, headers=headers, timeout=self.timeout, verify=False)
-                if response.status_code == 200:
-                    with open(save_path, 'wb') as f:
-                        f.write(response.content)
+                outcome = self._fetch_hedged(url, save_path, attempt)
+                if outcome == OUTCOME_OK:
+                    self.tail.record(time.monotonic() - started)
                     return True
-                else:
-                    logger.warning(f"下载失败 {url}: 状态码 {response.status_code}")
-
+            except UrlExpiredError:
+                # 重试同一 URL 无效，交给调用方重新解析（对端响应正常，不影响并发调整）
+                outcome = OUTCOME_OK
+                raise
+            except (requests.Timeout, StalledTransferError) as e:
+                # 停滞中断保留 .part，下次重试用 Range 续传
+                if isinstance(e, StalledTransferError):
+                    self.tail.record_stall()
+                outcome = OUTCOME_THROTTLED
+                error = e
             except Exception as e:
-                if attempt < self.retry - 1:
-                    time.sleep(1)
+                error = e
+            finally:
+                if self.adaptive:
+                    self.adaptive.record(time.monotonic() - started, outcome)
+                    self.adaptive.release()
+
+            # 主机熔断时的失败不消耗重试次数，下一轮在 breakers.wait 中等待主机恢复
+            if outcome != OUTCOME_OK and self.breakers.is_tripped(url):
+                continue
+
+            # 退避期间不占用并发名额
+            attempt += 1
+            if error is not None:
+                if attempt < self.retry:
+                    time.sleep(self.limiter.backoff_delay(attempt - 1))
                     continue
-                logger.debug(f"下载图片失败 {url}: {e}")
+                logger.debug(f"下载图片失败 {url}: {error}")
 
         return False
 
+    def _fetch_hedged(self, url: str, save_path: Path, attempt: int) -> str:
+        """
+        执行一次图片请求，超过近期延迟百分位仍未完成时发出对冲请求
+
+        对冲请求写入独立路径，先成功者胜出（对冲胜出时重命名为最终文件），另一方被取消。
+
+        Returns:
+            请求结果（ok / error / throttled）
+        """
+        delay = self.tail.hedge_delay() if self._hedge_pool else None
+        if delay is None:
+            return self._fetch_image(url, save_path, attempt)
+
+        primary_cancel = threading.Event()
+        primary = self._hedge_pool.submit(self._fetch_image, url, save_path, attempt, primary_cancel)
+        try:
+            return primary.result(timeout=delay)
+        except FutureTimeoutError:
+            pass
+        if not self.tail.admit_hedge(url, self.limiter, self.breakers, self.adaptive):
+            return primary.result()
+
+        target = hedge_path(save_path)
+        hedge_cancel = threading.Event()
+        secondary = self._hedge_pool.submit(self._fetch_image, url, target, attempt, hedge_cancel)
+        if self.adaptive:
+            # 对冲请求占用的并发名额在其结束（含被取消）后归还
+            secondary.add_done_callback(lambda _: self.adaptive.release())
+        logger.debug(f"请求超过 {delay:.2f}s 未完成，发出对冲请求: {save_path.name}")
+
+        contenders = {primary: primary_cancel, secondary: hedge_cancel}
+        pending = set(contenders)
+        winner = None
+        outcome = None
+        error = None
+        while pending and winner is None:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    error = error or e
+                    continue
+                if result == OUTCOME_OK:
+                    winner = future
+                    break
+                outcome = result
+
+        # 取消落败方并在其结束后清理文件（都失败时保留主请求的 .part 以便续传）
+        for future, cancel in contenders.items():
+            if future is winner:
+                continue
+            cancel.set()
+            if future is secondary:
+                future.add_done_callback(lambda _: self._discard_hedge(target))
+            elif winner is not None:
+                future.add_done_callback(lambda _: discard_part(save_path))
+
+        if winner is secondary:
+            os.replace(target, save_path)
+            self.tail.record_hedge_win()
+        if winner is not None:
+            return OUTCOME_OK
+        if outcome is None:
+            raise error
+        return outcome
+
+    @staticmethod
+    def _discard_hedge(target: Path):
+        """删除落败的对冲请求留下的文件"""
+        discard_part(target)
+        try:
+            target.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _fetch_image(self, url: str, save_path: Path, attempt: int,
+                     cancel: Optional[threading.Event] = None) -> str:
+        """
+        执行一次图片请求
+
+        Args:
+            url: 图片URL
+            save_path: 保存路径
+            attempt: 第几次尝试（用于退避）
+            cancel: 取消事件（对冲请求中落败时置位）
+
+        Returns:
+            请求结果（ok / error / throttled）
+
+        Raises:
+            StalledTransferError: 传输速度低于 fetch.stall 下限
+        """
+        self.tail.record_request()
+        # 上次中断保留的 .part 文件用 Range 续传
+        headers, offset = resume_request_headers(save_path)
+        # 读超时取停滞检测窗口：连接完全无数据时不必等满整个超时
+        timeout = (self.timeout, self.tail.read_timeout(self.timeout))
+        try:
+            response = self.session.get(url, headers=headers, timeout=timeout, stream=True)
+        except requests.RequestException as e:
+            # 连接失败或等待响应头超时计入主机熔断
+            self.breakers.record_failure(url, e)
+            raise
+        self.breakers.record_status(url, response.status_code)
+        with response:
+            if response.status_code in (200, 206):
+                try:
+                    _, resumed = save_response(response, save_path, offset=offset, fsync=self.fsync,
+                                               on_chunk=self.tail.monitor(cancel))
+                except requests.ConnectionError as e:
+                    # 流式读取中的读超时以 ConnectionError 抛出
+                    if 'timed out' in str(e):
+                        raise StalledTransferError(f"读取超时: {e}") from e
+                    raise
+                if resumed:
+                    with self._stats_lock:
+                        self.bytes_resumed += resumed
+                return OUTCOME_OK
+            if response.status_code == 416:
+                # 已有字节数超出文件长度，删除后从头下载
+                discard_part(save_path)
+                return OUTCOME_ERROR
+            if response.status_code in RETRY_STATUS_CODES:
+                # 暂停该主机，下一次 limiter.wait 会等待到暂停结束
+                self.limiter.penalize(url, attempt, parse_retry_after(response.headers.get('Retry-After')))
+                return OUTCOME_THROTTLED
+            if response.status_code in EXPIRED_STATUS_CODES:
+                raise UrlExpiredError(f"状态码 {response.status_code}")
+
+            logger.warning(f"下载失败 {url}: 状态码 {response.status_code}")
+            return OUTCOME_ERROR
+
     def _filter_chapters(self, chapters: List[Dict], start: Optional[int],
                         end: Optional[int]) -> List[Dict]:
         """过滤章节范围"""
@@ -399,11 +1141,42 @@ URL：{comic_info.get('url', 'N/A')}
         except Exception as e:
             logger.warning(f"生成 info.txt 失败: {e}")
 
+    def _record_breaker_transition(self, event: Dict):
+        """把主机熔断状态变化写入抓取历史（经写缓冲或历史写入线程，不在调用线程中访问数据库）"""
+        if self.writer:
+            self._write_breaker_history(self.writer, event)
+        else:
+            self._history_pool.submit(self._write_breaker_history, self.db, event)
+
+    @staticmethod
+    def _write_breaker_history(history, event: Dict):
+        """写入一条熔断状态变化记录"""
+        try:
+            history.add_fetch_history(fetch_type='breaker', status=event['to'],
+                                      error_msg=event.get('error'), metadata=event)
+        except Exception as e:
+            logger.warning(f"记录熔断状态变化失败: {e}")
+
     def close(self):
-        """关闭下载器"""
-        if self.fetcher:
-            self.fetcher.close()
-        if self.db:
+        """关闭下载器（只关闭自行创建的抓取器和数据库）"""
+        self.breakers.remove_listener(self._record_breaker_transition)
+        self.breakers.log_stats()
+        if self.engine:
+            self.engine.close()
+        if self._hedge_pool:
+            self._hedge_pool.shutdown(wait=True, cancel_futures=True)
+        self.tail.log_stats()
+        if self._history_pool:
+            self._history_pool.shutdown(wait=True)
+        if self.writer:
+            self.writer.close()
+        if self.bytes_resumed:
+            logger.info(f"断点续传: 复用 {self.bytes_resumed / 1024 / 1024:.2f} MB 已下载数据")
+        log_connection_stats(self.session)
+        self.session.close()
+        if self._fetcher and self._owns_fetcher:
+            self._fetcher.close()
+        if self.db and self._owns_db:
             self.db.close()
 
 
@@ -0,0 +1,209 @@
+"""
+尾延迟控制模块
+停滞检测：单次传输在检测窗口内的平均速度低于下限时立即中断（保留 .part 续传），
+不再等满整个超时；对冲请求（可选）：请求耗时超过近期延迟的指定百分位时
+再发出一个相同请求，先完成者胜出、另一个取消。
+统计 p50 / p99 延迟、对冲率和停滞次数，便于调整参数
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from comichub.downloader.adaptive import percentile
+
+logger = logging.getLogger(__name__)
+
+
+class StalledTransferError(IOError):
+    """传输速度低于下限（连接停滞）"""
+
+
+class TransferCancelled(Exception):
+    """传输被取消（对冲请求中落败的一方）"""
+
+
+class StallMonitor:
+    """单次传输的停滞检测器（作为 save_response 的 on_chunk 回调）"""
+
+    def __init__(self, min_rate: float, window: float, cancel: Optional[threading.Event] = None):
+        """
+        初始化停滞检测器
+
+        Args:
+            min_rate: 最低速度（字节/秒，0 表示不检测）
+            window: 检测窗口（秒）
+            cancel: 取消事件（置位后下一块数据到达时中断传输）
+        """
+        self.min_rate = min_rate
+        self.window = window
+        self.cancel = cancel
+        self._window_start = time.monotonic()
+        self._window_bytes = 0
+
+    def __call__(self, nbytes: int):
+        """记录收到的字节数，取消或停滞时抛出异常"""
+        if self.cancel is not None and self.cancel.is_set():
+            raise TransferCancelled("对冲请求已由另一方完成")
+        if not self.min_rate:
+            return
+
+        self._window_bytes += nbytes
+        elapsed = time.monotonic() - self._window_start
+        if elapsed < self.window:
+            return
+        rate = self._window_bytes / elapsed
+        if rate < self.min_rate:
+            raise StalledTransferError(f"传输停滞: {rate:.0f} B/s 低于下限 {self.min_rate:.0f} B/s")
+        self._window_start = time.monotonic()
+        self._window_bytes = 0
+
+
+class TailLatency:
+    """请求延迟统计与对冲决策（线程安全）"""
+
+    def __init__(self, stall_config: Optional[Dict] = None, hedge_config: Optional[Dict] = None):
+        """
+        初始化尾延迟控制
+
+        Args:
+            stall_config: 停滞检测配置（fetch.stall）
+            hedge_config: 对冲请求配置（fetch.hedge）
+        """
+        stall_config = stall_config or {}
+        hedge_config = hedge_config or {}
+        self.min_rate = stall_config.get('min_bytes_per_second', 2048)
+        self.stall_window = stall_config.get('window', 10)
+
+        self.hedge_enabled = hedge_config.get('enabled', False)
+        self.hedge_percentile = hedge_config.get('percentile', 95)
+        # 对冲请求占全部请求的上限，避免在整体变慢时成倍放大负载
+        self.hedge_max_rate = hedge_config.get('max_rate', 0.1)
+        self.min_samples = hedge_config.get('min_samples', 20)
+
+        self._latencies = deque(maxlen=hedge_config.get('window', 200))
+        self._lock = threading.Lock()
+
+        # 统计
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.stalls = 0
+
+    def monitor(self, cancel: Optional[threading.Event] = None) -> StallMonitor:
+        """创建一次传输的停滞检测器"""
+        return StallMonitor(self.min_rate, self.stall_window, cancel)
+
+    def read_timeout(self, timeout: float) -> float:
+        """单次读取的超时：连接完全无数据时在检测窗口内中断"""
+        if not self.min_rate:
+            return timeout
+        return min(timeout, self.stall_window)
+
+    def record(self, latency: float):
+        """记录一次成功请求的耗时"""
+        with self._lock:
+            self._latencies.append(latency)
+
+    def record_request(self):
+        """记录发出一次请求（对冲率的分母）"""
+        with self._lock:
+            self.requests += 1
+
+    def record_stall(self):
+        """记录一次停滞中断"""
+        with self._lock:
+            self.stalls += 1
+
+    def record_hedge_win(self):
+        """记录对冲请求胜出"""
+        with self._lock:
+            self.hedge_wins += 1
+
+    def hedge_delay(self) -> Optional[float]:
+        """
+        获取发出对冲请求前的等待时间
+
+        Returns:
+            近期延迟的指定百分位（秒），未启用或样本不足时返回 None
+        """
+        if not self.hedge_enabled:
+            return None
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            return percentile(list(self._latencies), self.hedge_percentile)
+
+    def try_hedge(self) -> bool:
+        """对冲预算允许时登记一次对冲请求"""
+        with self._lock:
+            if self.hedges + 1 > self.hedge_max_rate * max(self.requests, 1):
+                return False
+            self.hedges += 1
+            return True
+
+    def cancel_hedge(self):
+        """撤销 try_hedge 登记的对冲请求（限速或并发名额不足、最终未发出时）"""
+        with self._lock:
+            self.hedges -= 1
+
+    def admit_hedge(self, url: str, limiter, breakers, adaptive=None) -> bool:
+        """
+        判断能否发出对冲请求，可以时占用相应的名额
+
+        主机熔断、自适应并发已满、对冲预算用尽或限速需要等待时放弃对冲，
+        对冲请求与主请求一样计入按主机限速和自适应并发。
+
+        Args:
+            url: 请求 URL
+            limiter: 按主机限速器（RateLimiter）
+            breakers: 按主机熔断器（CircuitBreakers）
+            adaptive: 自适应并发控制器（可选）
+
+        Returns:
+            是否发出对冲请求（True 时已占用一个自适应并发名额，由调用方在对冲请求结束后归还）
+        """
+        if breakers.is_tripped(url):
+            return False
+        if adaptive and not adaptive.try_acquire():
+            return False
+        if not self.try_hedge():
+            if adaptive:
+                adaptive.release()
+            return False
+        if not limiter.try_acquire(url):
+            self.cancel_hedge()
+            if adaptive:
+                adaptive.release()
+            return False
+        return True
+
+    def stats(self) -> Dict[str, float]:
+        """
+        获取统计
+
+        Returns:
+            {'requests', 'p50', 'p99', 'hedges', 'hedge_rate', 'hedge_wins', 'stalls'}
+        """
+        with self._lock:
+            latencies = list(self._latencies)
+            return {
+                'requests': self.requests,
+                'p50': percentile(latencies, 50),
+                'p99': percentile(latencies, 99),
+                'hedges': self.hedges,
+                'hedge_rate': self.hedges / self.requests if self.requests else 0.0,
+                'hedge_wins': self.hedge_wins,
+                'stalls': self.stalls,
+            }
+
+    def log_stats(self):
+        """在日志中输出延迟和对冲统计"""
+        stats = self.stats()
+        if not stats['requests']:
+            return
+        logger.info(f"图片请求延迟: p50 {stats['p50']:.2f}s, p99 {stats['p99']:.2f}s, "
+                    f"对冲 {stats['hedges']} 次 ({stats['hedge_rate']:.1%}), "
+                    f"对冲胜出 {stats['hedge_wins']} 次, 停滞中断 {stats['stalls']} 次")
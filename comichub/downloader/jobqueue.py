@@ -0,0 +1,218 @@
+"""
+页级下载队列模块
+以 images 表为持久化队列：每张图片一条任务（pending / in_flight / done / failed），
+领取时加租约并累计尝试次数，下载期间定期续约，进程崩溃后租约由重启的运行回收，
+已登记全部图片 URL 的章节重启时直接复用，不再经浏览器重新解析
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from comichub.core.database import Database
+from comichub.core.writebehind import WriteBehind
+
+logger = logging.getLogger(__name__)
+
+
+# 任务状态
+STATUS_PENDING = 'pending'
+STATUS_IN_FLIGHT = 'in_flight'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+
+def _pid_alive(pid: int) -> bool:
+    """本机进程是否仍在运行"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class ImageJobQueue:
+    """基于数据库的图片下载队列"""
+
+    def __init__(self, db: Database, lease_seconds: int = 600, max_attempts: int = 5,
+                 writer: Optional[WriteBehind] = None, expiry_margin: float = 120):
+        """
+        初始化下载队列
+
+        Args:
+            db: 数据库连接
+            lease_seconds: 租约时长（秒）
+            max_attempts: 单张图片跨运行的最大尝试次数
+            writer: 写缓冲（可选，缺省时完成 / 失败状态逐条直接写入）
+            expiry_margin: 已登记 URL 距过期不足此时间（秒）时重新解析章节
+        """
+        self.db = db
+        # 任务完成 / 失败的写入目标（写缓冲与 Database 方法签名相同）
+        self.writes = writer or db
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.expiry_margin = expiry_margin
+        self.hostname = socket.gethostname()
+        # 租约持有者：主机名:进程号，用于识别已退出进程留下的租约
+        self.owner = f"{self.hostname}:{os.getpid()}"
+
+        # 本进程持有、尚未结束的任务（图片ID），下载期间每 renew_interval 秒续约一次，
+        # 慢章节或熔断暂停超过租约时长时，其他进程不会重新领取同一页
+        self.renew_interval = max(lease_seconds / 3, 1)
+        self._held = set()
+        self._renewed_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def recorded_chapters(self, chapter_urls: List[str]) -> Dict[str, Dict]:
+        """
+        获取已完整登记且 URL 未过期的图片列表
+
+        Args:
+            chapter_urls: 章节URL列表
+
+        Returns:
+            {章节URL: 与 get_images 相同格式的结果}
+        """
+        try:
+            recorded = self.db.get_recorded_images(chapter_urls, self.expiry_margin)
+        except Exception as e:
+            logger.warning(f"读取已登记图片列表失败: {e}")
+            return {}
+
+        # recorded 标记结果来自数据库（URL 可能已接近过期），而不是刚解析的
+        return {url: {'images': entry['images'], 'total_count': entry['page_count'], 'recorded': True}
+                for url, entry in recorded.items()}
+
+    def prepare(self, chapter_id: int, images: List[Dict]) -> Optional[List[Dict]]:
+        """
+        登记章节图片并领取待下载任务
+
+        已完成但本地文件缺失的任务重新排队；已退出进程持有的租约立即回收。
+
+        Args:
+            chapter_id: 章节ID
+            images: [{'page': int, 'url': str, 'file_path': str}, ...]
+
+        Returns:
+            已领取的任务列表（images 表的行），数据库不可用时返回 None
+        """
+        try:
+            self.db.enqueue_images(chapter_id, images)
+            self.db.release_leases(chapter_id, self._stale_owners(chapter_id))
+
+            missing = [row['id'] for row in self.db.get_chapter_images(chapter_id)
+                       if row['status'] == STATUS_DONE and not self._file_complete(row['file_path'])]
+            if missing:
+                logger.info(f"{len(missing)} 张已完成图片的本地文件缺失，重新下载")
+                self.db.reset_images(missing)
+
+            leased = self.db.lease_images(chapter_id, self.owner, self.lease_seconds, self.max_attempts)
+            with self._lock:
+                self._held.update(row['id'] for row in leased)
+            return leased
+        except Exception as e:
+            logger.warning(f"下载队列不可用，按本地文件判断是否下载: {e}")
+            return None
+
+    def refresh(self, chapter_id: int, images: List[Dict]):
+        """
+        更新重新解析后的图片 URL 和过期时间（任务状态和租约不变）
+
+        Args:
+            chapter_id: 章节ID
+            images: [{'page': int, 'url': str, 'file_path': str, 'expires': float}, ...]
+        """
+        try:
+            self.db.enqueue_images(chapter_id, images)
+        except Exception as e:
+            logger.warning(f"更新图片 URL 失败: {e}")
+
+    def complete(self, image_id: int):
+        """标记任务完成"""
+        self._release(image_id)
+        self.writes.complete_image(image_id)
+
+    def fail(self, image_id: int, error_msg: str):
+        """标记任务失败"""
+        self._release(image_id)
+        self.writes.fail_image(image_id, error_msg)
+
+    def expire(self, image_id: int):
+        """标记任务的 URL 已失效（不计入尝试次数，下次运行重新解析章节）"""
+        self._release(image_id)
+        self.writes.expire_image(image_id)
+
+    def chapter_complete(self, chapter_id: int) -> bool:
+        """
+        章节的全部图片是否都已完成且本地文件存在（包括其他进程下载的页）
+
+        Args:
+            chapter_id: 章节ID
+
+        Returns:
+            是否完成，数据库不可用时返回 False
+        """
+        try:
+            rows = self.db.get_chapter_images(chapter_id)
+        except Exception as e:
+            logger.warning(f"读取章节图片状态失败: {e}")
+            return False
+        return bool(rows) and all(row['status'] == STATUS_DONE and self._file_complete(row['file_path'])
+                                  for row in rows)
+
+    def _release(self, image_id: int):
+        """任务结束，不再续约"""
+        with self._lock:
+            self._held.discard(image_id)
+
+    def renew(self) -> int:
+        """
+        为本进程仍持有的任务续约（距上次续约不足 renew_interval 时跳过，可频繁调用）
+
+        Returns:
+            续约的任务数
+        """
+        with self._lock:
+            if time.monotonic() - self._renewed_at < self.renew_interval:
+                return 0
+            self._renewed_at = time.monotonic()
+            held = list(self._held)
+        if not held:
+            return 0
+
+        try:
+            renewed = self.db.renew_leases(held, self.owner, self.lease_seconds)
+        except Exception as e:
+            logger.warning(f"续约图片任务失败: {e}")
+            return 0
+        logger.debug(f"续约 {renewed}/{len(held)} 张图片任务")
+        return renewed
+
+    def _stale_owners(self, chapter_id: int) -> List[str]:
+        """找出本机已退出进程持有的租约"""
+        stale = []
+        for owner in self.db.get_lease_owners(chapter_id):
+            hostname, _, pid = owner.rpartition(':')
+            if owner == self.owner or hostname != self.hostname or not pid.isdigit():
+                continue
+            if not _pid_alive(int(pid)):
+                stale.append(owner)
+        if stale:
+            logger.info(f"回收已退出进程的租约: {', '.join(stale)}")
+        return stale
+
+    @staticmethod
+    def _file_complete(file_path: Optional[str]) -> bool:
+        """最终文件是否存在且非空"""
+        if not file_path:
+            return False
+        try:
+            return Path(file_path).stat().st_size > 0
+        except OSError:
+            return False
@@ -0,0 +1,88 @@
+"""
+章节流水线模块
+生产者线程提前解析后续章节的图片列表，放入有界队列，
+下载阶段按顺序取出：浏览器解析与图片下载同时进行，
+队列满时生产者阻塞（背压），不会无限制地提前解析
+"""
+
+import logging
+import queue
+import threading
+from typing import Iterable, Iterator, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+# 队列结束标记
+_DONE = object()
+
+
+class _ProducerError:
+    """生产者异常（转交给消费者重新抛出）"""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def prefetch(source: Iterable[T], depth: int, name: str = 'comichub-prefetch') -> Iterator[T]:
+    """
+    在后台线程中迭代 source，最多提前 depth 个结果
+
+    消费者提前停止迭代（break 或异常）时，生产者会在当前元素完成后退出。
+
+    Args:
+        source: 结果序列（在生产者线程中迭代）
+        depth: 队列容量（提前量）
+        name: 生产者线程名
+
+    Yields:
+        source 中的元素（顺序不变）
+    """
+    if depth <= 0:
+        yield from source
+        return
+
+    items: queue.Queue = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        """放入队列；消费者已停止时放弃"""
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        iterator = iter(source)
+        try:
+            for item in iterator:
+                if not put(item):
+                    return
+        except BaseException as e:
+            put(_ProducerError(e))
+            return
+        finally:
+            # 提前停止时关闭生成器，释放其中的资源（如抓取器池的线程池）
+            close = getattr(iterator, 'close', None)
+            if close:
+                close()
+        put(_DONE)
+
+    producer = threading.Thread(target=produce, name=name, daemon=True)
+    producer.start()
+
+    try:
+        while True:
+            item = items.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _ProducerError):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+        producer.join()
@@ -0,0 +1,87 @@
+"""
+图片下载会话模块
+所有图片请求共用一个连接池化的 requests.Session（keep-alive），
+跨章节复用到图片服务器的 TCP/TLS 连接，并统计每个主机的连接复用情况
+"""
+
+import logging
+from typing import Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# 图片请求默认请求头
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
+    'Referer': 'https://m.manhuagui.com/'
+}
+
+
+# 签名 URL 过期或失效时 CDN 返回的状态码（重试同一 URL 无效，需要重新解析章节）
+EXPIRED_STATUS_CODES = (403, 410)
+
+
+class UrlExpiredError(Exception):
+    """图片 URL 已失效（CDN 返回 403/410）"""
+
+
+def create_download_session(pool_size: int, verify: bool = False) -> requests.Session:
+    """
+    创建图片下载会话
+
+    Args:
+        pool_size: 每个主机的连接池大小（与并发下载数一致，避免连接被丢弃重建）
+        verify: 是否校验 SSL 证书
+
+    Returns:
+        requests.Session
+    """
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.verify = verify
+    session.headers.update(DEFAULT_HEADERS)
+    return session
+
+
+def connection_stats(session: requests.Session) -> Dict[str, Dict[str, int]]:
+    """
+    统计每个主机的连接复用情况（读取 urllib3 连接池计数）
+
+    Args:
+        session: 下载会话
+
+    Returns:
+        {host: {'requests': int, 'connections': int, 'reused': int}}
+    """
+    stats = {}
+    seen = set()
+    for adapter in session.adapters.values():
+        if id(adapter) in seen:
+            continue
+        seen.add(id(adapter))
+
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            host = f"{pool.scheme}://{pool.host}"
+            entry = stats.setdefault(host, {'requests': 0, 'connections': 0, 'reused': 0})
+            entry['requests'] += pool.num_requests
+            entry['connections'] += pool.num_connections
+
+    for entry in stats.values():
+        entry['reused'] = max(entry['requests'] - entry['connections'], 0)
+    return stats
+
+
+def log_connection_stats(session: requests.Session):
+    """在日志中输出每个主机的连接复用统计"""
+    for host, entry in connection_stats(session).items():
+        logger.info(f"连接复用 {host}: 请求 {entry['requests']} 次, "
+                    f"新建连接 {entry['connections']} 个, 复用 {entry['reused']} 次")
@@ -0,0 +1,308 @@
+"""
+图片落盘模块
+响应体分块流式写入章节目录下的临时文件（.part），
+校验 Content-Length 后按配置 fsync，再原子重命名为最终文件名，
+进程被中断时不会留下被误判为完整的半截图片。
+服务器支持 Range 且提供 ETag / Last-Modified 时，中断的 .part 文件连同
+旁路元数据（.part.json）一起保留，重试或下次运行时用 Range + If-Range 续传
+"""
+
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 下载中的临时文件后缀
+PART_SUFFIX = '.part'
+# 断点续传元数据后缀（期望长度和校验器）
+RESUME_SUFFIX = '.part.json'
+# 对冲请求的独立保存路径后缀（胜出后重命名为最终文件）
+HEDGE_SUFFIX = '.hedge'
+
+# 每次从响应读取的块大小
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# fsync 策略
+#   none: 不调用 fsync（最快，断电时可能丢失最近写入的图片）
+#   file: 重命名前 fsync 文件内容
+#   full: 额外 fsync 章节目录，确保重命名本身落盘
+FSYNC_POLICIES = ('none', 'file', 'full')
+
+
+class IncompleteDownloadError(IOError):
+    """实际接收的字节数与 Content-Length 不一致"""
+
+
+_CONTENT_RANGE_RE = re.compile(r'bytes (\d+)-(\d+)/(\d+|\*)')
+
+
+def part_path(save_path: Path) -> Path:
+    """获取最终文件对应的临时文件路径"""
+    return save_path.with_name(save_path.name + PART_SUFFIX)
+
+
+def resume_meta_path(save_path: Path) -> Path:
+    """获取最终文件对应的续传元数据路径"""
+    return save_path.with_name(save_path.name + RESUME_SUFFIX)
+
+
+def hedge_path(save_path: Path) -> Path:
+    """获取对冲请求使用的保存路径（与主请求的临时文件互不干扰）"""
+    return save_path.with_name(save_path.name + HEDGE_SUFFIX)
+
+
+def is_partial_file(path: Path) -> bool:
+    """判断是否为下载中的临时文件、续传元数据或对冲请求的文件"""
+    return path.name.endswith((PART_SUFFIX, RESUME_SUFFIX, HEDGE_SUFFIX))
+
+
+def _fsync_dir(directory: Path):
+    """fsync 目录（Windows 不支持打开目录，直接跳过）"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _unlink(path: Path):
+    """删除文件（忽略不存在的情况）"""
+    try:
+        path.unlink()
+    except OSError:
+        pass
+
+
+def resume_request_headers(save_path: Path) -> Tuple[Dict[str, str], int]:
+    """
+    根据保留的 .part 文件生成续传请求头
+
+    Args:
+        save_path: 最终保存路径
+
+    Returns:
+        (请求头, 已有字节数)；无可续传的数据时返回 ({}, 0)，并清理残留的临时文件
+    """
+    tmp_path = part_path(save_path)
+    meta_path = resume_meta_path(save_path)
+    try:
+        offset = tmp_path.stat().st_size
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        discard_part(save_path)
+        return {}, 0
+
+    validator = meta.get('etag') or meta.get('last_modified')
+    expected = meta.get('length')
+    if not offset or not validator or (expected and offset >= expected):
+        discard_part(save_path)
+        return {}, 0
+
+    # If-Range：文件已变化时服务器返回完整的 200 响应
+    return {'Range': f'bytes={offset}-', 'If-Range': validator}, offset
+
+
+def _resume_meta(status: int, headers) -> Optional[Dict]:
+    """从响应头提取续传元数据，不支持续传时返回 None"""
+    if headers.get('Content-Encoding'):
+        return None
+    if status != 206 and headers.get('Accept-Ranges', '').lower() != 'bytes':
+        return None
+
+    etag = headers.get('ETag')
+    if etag and etag.startswith('W/'):
+        # 弱校验器不能用于 If-Range
+        etag = None
+    last_modified = headers.get('Last-Modified')
+    if not etag and not last_modified:
+        return None
+
+    length = None
+    match = _CONTENT_RANGE_RE.match(headers.get('Content-Range', ''))
+    if match and match.group(3) != '*':
+        length = int(match.group(3))
+    elif status == 200 and headers.get('Content-Length'):
+        length = int(headers['Content-Length'])
+
+    return {'etag': etag, 'last_modified': last_modified, 'length': length}
+
+
+def open_part(save_path: Path, status: int, headers, offset: int):
+    """
+    打开临时文件准备写入
+
+    206 且 Content-Range 起点与已有字节数一致时追加写入，否则（服务器忽略 Range
+    或文件已变化）从头写入。支持续传时同时写入元数据，供中断后续传。
+
+    Args:
+        save_path: 最终保存路径
+        status: 响应状态码（200 / 206）
+        headers: 响应头
+        offset: 请求时的已有字节数
+
+    Returns:
+        (文件对象, 续传起点字节数)
+
+    Raises:
+        IncompleteDownloadError: 206 响应的起点与已有字节数不一致（临时文件已删除）
+    """
+    tmp_path = part_path(save_path)
+    start = 0
+    if status == 206:
+        match = _CONTENT_RANGE_RE.match(headers.get('Content-Range', ''))
+        if not match or int(match.group(1)) != offset:
+            discard_part(save_path)
+            raise IncompleteDownloadError(f"{save_path.name}: Content-Range 与已有字节数 {offset} 不一致")
+        start = offset
+
+    meta = _resume_meta(status, headers)
+    meta_path = resume_meta_path(save_path)
+    if meta:
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+    else:
+        _unlink(meta_path)
+
+    return open(tmp_path, 'ab' if start else 'wb'), start
+
+
+def verify_length(headers, written: int, save_path: Path):
+    """
+    校验接收字节数与 Content-Length 是否一致（206 响应的 Content-Length 为本段长度）
+
+    响应经过压缩时 Content-Length 是压缩后的长度，无法与解压后的字节数比较，跳过校验。
+
+    Raises:
+        IncompleteDownloadError: 字节数不一致
+    """
+    expected = headers.get('Content-Length')
+    if expected and not headers.get('Content-Encoding') and int(expected) != written:
+        raise IncompleteDownloadError(f"{save_path.name}: 期望 {expected} 字节，实际 {written} 字节")
+
+
+def normalize_fsync(fsync: str) -> str:
+    """校验 fsync 策略，未知值退回 file"""
+    if fsync not in FSYNC_POLICIES:
+        logger.warning(f"未知的 fsync 策略 {fsync}，使用 file")
+        return 'file'
+    return fsync
+
+
+def commit_part(f, save_path: Path, fsync: str):
+    """
+    按策略 fsync 临时文件并原子重命名为最终文件
+
+    Args:
+        f: 已写完的临时文件对象（由本函数关闭）
+        save_path: 最终保存路径
+        fsync: fsync 策略
+    """
+    with f:
+        if fsync != 'none':
+            f.flush()
+            os.fsync(f.fileno())
+
+    os.replace(part_path(save_path), save_path)
+    _unlink(resume_meta_path(save_path))
+    if fsync == 'full':
+        _fsync_dir(save_path.parent)
+
+
+def discard_part(save_path: Path):
+    """删除临时文件和续传元数据"""
+    _unlink(part_path(save_path))
+    _unlink(resume_meta_path(save_path))
+
+
+def release_part(save_path: Path):
+    """传输失败后处理临时文件：可续传时保留，否则删除"""
+    if not resume_meta_path(save_path).exists():
+        discard_part(save_path)
+
+
+def iter_available(response, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    逐块读取响应体，数据一到达即返回而不等凑满一块
+
+    缓慢到达的数据（每次只有几十字节）也能及时交给停滞检测和取消判断；
+    requests 以 decode_content=False 打开 raw，这里显式要求按 Content-Encoding 解码。
+    urllib3 不支持 read1 时退回 iter_content。
+
+    Args:
+        response: 以 stream=True 发起的 requests 响应
+        chunk_size: 单块上限
+
+    Yields:
+        响应体数据块（已按 Content-Encoding 解码）
+    """
+    read1 = getattr(response.raw, 'read1', None)
+    if read1 is None:
+        yield from response.iter_content(chunk_size=chunk_size)
+        return
+
+    # 与 iter_content 一致地转换为 requests 异常（requests 仅在下载时才需要导入）
+    from requests.exceptions import ChunkedEncodingError, ConnectionError, ContentDecodingError
+    from urllib3.exceptions import DecodeError, ProtocolError, ReadTimeoutError
+    while True:
+        try:
+            chunk = read1(chunk_size, decode_content=True)
+        except ReadTimeoutError as e:
+            raise ConnectionError(e) from e
+        except ProtocolError as e:
+            raise ChunkedEncodingError(e) from e
+        except DecodeError as e:
+            raise ContentDecodingError(e) from e
+        if not chunk:
+            return
+        yield chunk
+
+
+def save_response(response, save_path: Path, offset: int = 0, fsync: str = 'file',
+                  chunk_size: int = DEFAULT_CHUNK_SIZE,
+                  on_chunk: Optional[Callable[[int], None]] = None) -> Tuple[int, int]:
+    """
+    流式保存响应体到文件（原子替换）
+
+    Args:
+        response: 以 stream=True 发起的 requests 响应（200 或 206）
+        save_path: 最终保存路径
+        offset: 请求时的已有字节数（resume_request_headers 返回值）
+        fsync: fsync 策略（none / file / full）
+        chunk_size: 分块大小
+        on_chunk: 每收到一块数据时的回调（参数为字节数，抛出异常即中断传输，如停滞检测）
+
+    Returns:
+        (本次写入的字节数, 续传复用的字节数)
+
+    Raises:
+        IncompleteDownloadError: 接收字节数与 Content-Length 不一致（可续传时保留临时文件）
+    """
+    fsync = normalize_fsync(fsync)
+    written = 0
+
+    f, start = open_part(save_path, response.status_code, response.headers, offset)
+    chunks = iter_available(response, chunk_size) if on_chunk else response.iter_content(chunk_size=chunk_size)
+    try:
+        for chunk in chunks:
+            if chunk:
+                f.write(chunk)
+                written += len(chunk)
+                if on_chunk:
+                    on_chunk(len(chunk))
+
+        verify_length(response.headers, written, save_path)
+        commit_part(f, save_path, fsync)
+    except BaseException:
+        f.close()
+        release_part(save_path)
+        raise
+
+    return written, start
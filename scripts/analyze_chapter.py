@@ -68,7 +68,7 @@ class ChapterAnalyzer:
             page_source = self.driver.page_source
             logger.info(f"页面长度: {len(page_source)} 字符")
             
-            soup = BeautifulSoup(page_source, 'html.parser')
+            soup = BeautifulSoup(page_source, 'lxml')
             images = []
             
             logger.info("方法 1: 查找 img 标签...")
@@ -131,7 +131,7 @@ class ChapterAnalyzer:
     def get_image_count_from_page(self):
         """从页面显示的图片数量"""
         try:
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
+            soup = BeautifulSoup(self.driver.page_source, 'lxml')
             
             # 查找页面显示的图片数量
             for element in soup.find_all(text=re.compile(r'\d+张|页|P')):
@@ -0,0 +1,37 @@
+"""
+测试公共夹具
+本地 HTTP 服务器（替代真实站点和图片服务器）
+"""
+
+import sys
+import threading
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def http_server():
+    """
+    启动本地 HTTP 服务器
+
+    用法: base_url = http_server(Handler)，Handler 为 BaseHTTPRequestHandler 子类；
+    测试结束后自动关闭所有启动的服务器。
+    """
+    servers = []
+
+    def start(handler) -> str:
+        server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    yield start
+
+    for server in servers:
+        server.shutdown()
+        server.server_close()
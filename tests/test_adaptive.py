@@ -0,0 +1,180 @@
+"""自适应下载并发测试（本地模拟图片服务器）"""
+
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from comichub.core.breaker import CircuitBreakers
+from comichub.core.ratelimit import RateLimiter
+from comichub.downloader.adaptive import percentile
+from comichub.downloader.batch import BatchDownloader
+
+
+class StandInServer:
+    """模拟图片服务器：延迟随并发增长，超过容量时返回 429，按比例随机返回 500"""
+
+    def __init__(self, capacity: int = 8, base_latency: float = 0.01,
+                 error_rate: float = 0.0, image_size: int = 1024):
+        self.capacity = capacity
+        self.base_latency = base_latency
+        self.error_rate = error_rate
+        self.body = b'\xff' * image_size
+
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.server.daemon_threads = True
+
+    def _handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                with stand_in._lock:
+                    stand_in.active += 1
+                    stand_in.peak = max(stand_in.peak, stand_in.active)
+                    active = stand_in.active
+                try:
+                    if active > stand_in.capacity:
+                        self._reply(429, b'')
+                        return
+                    time.sleep(stand_in.base_latency * (1 + active / stand_in.capacity))
+                    if random.random() < stand_in.error_rate:
+                        self._reply(500, b'')
+                        return
+                    self._reply(200, stand_in.body)
+                finally:
+                    with stand_in._lock:
+                        stand_in.active -= 1
+
+            def _reply(self, status, body):
+                self.send_response(status)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stand_in():
+    """按参数启动模拟服务器：stand_in(capacity=..., error_rate=...)"""
+    servers = []
+
+    def start(**kwargs) -> StandInServer:
+        server = StandInServer(**kwargs)
+        server.start()
+        servers.append(server)
+        return server
+
+    yield start
+
+    for server in servers:
+        server.stop()
+
+
+@pytest.fixture(params=['threads', 'async'])
+def download(request, tmp_path):
+    """用 BatchDownloader 的章节下载路径（不连接数据库、不启动浏览器）下载一批图片"""
+    downloaders = []
+
+    def run(server: StandInServer, images: int, **adaptive) -> BatchDownloader:
+        downloader = BatchDownloader(
+            use_database=False,
+            fetch_config={
+                'engine': request.param,
+                'retry': 8,
+                'timeout': 10,
+                'fsync': 'none',
+                'max_in_flight': 32,
+                'per_host_limit': 32,
+                'adaptive': {'enabled': True, 'window': 10, 'target_p95': 1.0, **adaptive},
+            },
+            limiter=RateLimiter({'enabled': False, 'backoff': {'base': 0.01, 'max': 0.05}}),
+            # 注入的 5xx 用于观察并发调整，不触发熔断
+            breakers=CircuitBreakers({'enabled': False})
+        )
+        downloaders.append(downloader)
+        resolved = {
+            'images': [{'page': i, 'url': f"{server.url}/{i}.jpg"} for i in range(1, images + 1)],
+            'total_count': images
+        }
+        downloader.download_chapter(comic_id=None, chapter_url=f"{server.url}/chapter",
+                                    chapter_num='1', chapter_title=f"{len(downloaders)}",
+                                    comic_dir=tmp_path, resolved=resolved)
+        return downloader
+
+    yield run
+
+    for downloader in downloaders:
+        downloader.close()
+
+
+def limits(downloader: BatchDownloader):
+    return [new for _, new, _ in downloader.adaptive.history]
+
+
+def test_ramps_up_under_capacity(stand_in, download):
+    server = stand_in(capacity=64)
+    downloader = download(server, 120, initial=2, min=1, max=6)
+
+    assert downloader.adaptive.limit > 2
+    assert all(old < new for old, new, _ in downloader.adaptive.history)
+    assert max(limits(downloader)) <= 6
+    assert server.peak <= 6
+
+
+def test_backs_off_on_429(stand_in, download):
+    server = stand_in(capacity=3)
+    downloader = download(server, 80, initial=12, min=2, max=16)
+
+    decreases = [(old, new) for old, new, _ in downloader.adaptive.history if new < old]
+    assert decreases
+    assert decreases[0] == (12, 6)
+    assert min(limits(downloader)) >= 2
+
+
+def test_backs_off_on_server_errors(stand_in, download):
+    server = stand_in(capacity=64, error_rate=0.5)
+    downloader = download(server, 40, initial=8, min=3, max=16)
+
+    reasons = [reason for _, _, reason in downloader.adaptive.history]
+    assert any(reason.startswith('错误率') for reason in reasons)
+    assert downloader.adaptive.limit < 8
+    assert min(limits(downloader)) >= 3
+
+
+def test_percentile_nearest_rank():
+    values = [float(i) for i in range(1, 21)]
+    assert percentile(values, 95) == 19.0
+    assert percentile(values, 50) == 10.0
+    assert percentile(values, 100) == 20.0
+    assert percentile(values, 0) == 1.0
+
+
+def test_percentile_independent_of_parity():
+    assert percentile([float(i) for i in range(1, 11)], 95) == 10.0
+    assert percentile([float(i) for i in range(1, 101)], 95) == 95.0
+    assert percentile([float(i) for i in range(1, 41)], 95) == 38.0
+    assert percentile([3.0], 95) == 3.0
+    assert percentile([], 95) == 0.0
@@ -0,0 +1,120 @@
+"""按主机熔断测试"""
+
+import time
+
+from comichub.core.breaker import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+    CircuitBreakers,
+)
+
+URL = 'http://img.example.com/1.jpg'
+
+
+def make_breaker(**kwargs):
+    events = []
+    settings = {'failure_threshold': 3, 'open_seconds': 0.05, 'max_open_seconds': 0.15}
+    settings.update(kwargs)
+    return CircuitBreaker('img.example.com', on_transition=events.append, **settings), events
+
+
+def test_opens_after_consecutive_failures():
+    breaker, events = make_breaker()
+    breaker.record_failure('timeout')
+    breaker.record_failure('timeout')
+    assert breaker.state == STATE_CLOSED
+    assert breaker.reserve() == 0.0
+
+    breaker.record_failure('timeout')
+
+    assert breaker.state == STATE_OPEN
+    assert breaker.is_tripped()
+    assert 0 < breaker.reserve() <= 0.05
+    assert events == [{'host': 'img.example.com', 'from': STATE_CLOSED, 'to': STATE_OPEN,
+                       'failures': 3, 'open_seconds': 0.05, 'error': 'timeout'}]
+
+
+def test_success_resets_failure_count():
+    breaker, _ = make_breaker()
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == STATE_CLOSED
+
+
+def test_half_open_probe_success_closes():
+    breaker, events = make_breaker()
+    for _ in range(3):
+        breaker.record_failure()
+    time.sleep(0.06)
+
+    # 冷却结束：放行一个探测请求，其余请求等待
+    assert breaker.reserve() == 0.0
+    assert breaker.state == STATE_HALF_OPEN
+    assert breaker.reserve() > 0
+
+    breaker.record_success()
+
+    assert breaker.state == STATE_CLOSED
+    assert breaker.reserve() == 0.0
+    assert [event['to'] for event in events] == [STATE_OPEN, STATE_HALF_OPEN, STATE_CLOSED]
+    assert breaker.open_time > 0
+
+
+def test_half_open_probe_failure_doubles_cooldown():
+    breaker, events = make_breaker()
+    for _ in range(3):
+        breaker.record_failure()
+
+    for expected in (0.1, 0.15):
+        time.sleep(breaker.open_until - time.monotonic() + 0.01)
+        assert breaker.reserve() == 0.0
+        breaker.record_failure('still down')
+        assert breaker.state == STATE_OPEN
+        # 探测失败后冷却时间加倍，不超过上限
+        assert breaker.cooldown == expected
+
+    assert [event['to'] for event in events] == [
+        STATE_OPEN, STATE_HALF_OPEN, STATE_OPEN, STATE_HALF_OPEN, STATE_OPEN]
+    assert breaker.opened == 3
+
+
+def test_breakers_per_host_and_status():
+    breakers = CircuitBreakers({'failure_threshold': 2, 'hosts': {'slow.example.com': {'failure_threshold': 5}}})
+    events = []
+    breakers.add_listener(events.append)
+
+    breakers.record_status(URL, 404)
+    breakers.record_status(URL, 502)
+    assert not breakers.is_tripped(URL)
+    breakers.record_status(URL, 503)
+    assert breakers.is_tripped(URL)
+    assert not breakers.is_tripped('http://other.example.com/1.jpg')
+
+    for _ in range(4):
+        breakers.record_failure('http://slow.example.com/1.jpg', 'timeout')
+    assert not breakers.is_tripped('http://slow.example.com/1.jpg')
+    assert [(event['host'], event['to']) for event in events] == [('img.example.com', STATE_OPEN)]
+
+
+def test_breakers_wait_until_half_open():
+    breakers = CircuitBreakers({'failure_threshold': 1, 'open_seconds': 0.05})
+    breakers.record_failure(URL, 'down')
+
+    started = time.monotonic()
+    breakers.wait(URL)
+
+    assert time.monotonic() - started >= 0.04
+    assert breakers.breaker(URL).state == STATE_HALF_OPEN
+    assert breakers.total_pause > 0
+
+
+def test_disabled_breakers_never_trip():
+    breakers = CircuitBreakers({'enabled': False, 'failure_threshold': 1})
+    breakers.record_failure(URL, 'down')
+    assert not breakers.is_tripped(URL)
+    breakers.wait(URL)
@@ -0,0 +1,34 @@
+"""浏览器抓取器的页面缓存测试（不启动 Chrome）"""
+
+import pytest
+
+from comichub.core import fetcher as fetcher_module
+
+
+@pytest.fixture
+def fetcher(monkeypatch):
+    def no_chrome(*args, **kwargs):
+        raise RuntimeError('chrome not available in tests')
+    monkeypatch.setattr(fetcher_module.webdriver, 'Chrome', no_chrome)
+    return fetcher_module.ManhuaGuiFetcherSelenium()
+
+
+def test_page_cache_evicts_least_recently_used(fetcher):
+    fetcher.page_cache_size = 2
+    fetcher._cache_page('a', {'page': 'a'})
+    fetcher._cache_page('b', {'page': 'b'})
+    assert fetcher._get_comic_snapshot('a') == {'page': 'a'}
+
+    fetcher._cache_page('c', {'page': 'c'})
+
+    assert list(fetcher._page_cache) == ['a', 'c']
+
+
+def test_page_cache_prunes_expired_on_insert(fetcher):
+    fetcher._cache_page('old', {'page': 'old'})
+    cached_at, snapshot = fetcher._page_cache['old']
+    fetcher._page_cache['old'] = (cached_at - fetcher.page_cache_ttl, snapshot)
+
+    fetcher._cache_page('new', {'page': 'new'})
+
+    assert list(fetcher._page_cache) == ['new']
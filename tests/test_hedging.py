@@ -0,0 +1,59 @@
+"""尾延迟控制测试"""
+
+from comichub.core.breaker import CircuitBreakers
+from comichub.core.ratelimit import RateLimiter
+from comichub.downloader.adaptive import AdaptiveConcurrency
+from comichub.downloader.hedging import TailLatency
+
+URL = 'http://img.example.com/1.jpg'
+
+
+def make_tail(max_rate: float = 1.0) -> TailLatency:
+    tail = TailLatency(hedge_config={'enabled': True, 'max_rate': max_rate})
+    for _ in range(10):
+        tail.record_request()
+    return tail
+
+
+def test_admit_hedge_takes_adaptive_slot_and_token():
+    tail = make_tail()
+    limiter = RateLimiter({'default': {'rate': 0.001, 'burst': 1}})
+    adaptive = AdaptiveConcurrency({'min': 1, 'max': 4}, initial=2)
+
+    assert tail.admit_hedge(URL, limiter, CircuitBreakers(), adaptive)
+    assert adaptive.in_use == 1
+    assert tail.hedges == 1
+
+
+def test_admit_hedge_rolls_back_when_limiter_refuses():
+    tail = make_tail()
+    limiter = RateLimiter({'default': {'rate': 0.001, 'burst': 1}})
+    limiter.wait(URL)
+    adaptive = AdaptiveConcurrency({'min': 1, 'max': 4}, initial=2)
+
+    assert not tail.admit_hedge(URL, limiter, CircuitBreakers(), adaptive)
+    assert adaptive.in_use == 0
+    assert tail.hedges == 0
+
+
+def test_admit_hedge_rolls_back_when_budget_exhausted():
+    tail = make_tail(max_rate=0.0)
+    adaptive = AdaptiveConcurrency({'min': 1, 'max': 4}, initial=2)
+
+    assert not tail.admit_hedge(URL, RateLimiter({'enabled': False}), CircuitBreakers(), adaptive)
+    assert adaptive.in_use == 0
+
+
+def test_admit_hedge_refused_when_adaptive_full_or_breaker_tripped():
+    tail = make_tail()
+    limiter = RateLimiter({'enabled': False})
+    adaptive = AdaptiveConcurrency({'min': 1, 'max': 1}, initial=1)
+    adaptive.acquire()
+    assert not tail.admit_hedge(URL, limiter, CircuitBreakers(), adaptive)
+    adaptive.release()
+
+    breakers = CircuitBreakers({'failure_threshold': 1})
+    breakers.record_failure(URL, 'down')
+    assert not tail.admit_hedge(URL, limiter, breakers, adaptive)
+    assert adaptive.in_use == 0
+    assert tail.hedges == 0
@@ -0,0 +1,49 @@
+"""混合抓取器测试（只走 HTTP 路径，不启动浏览器）"""
+
+import socket
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from comichub.core.breaker import CircuitBreakers
+from comichub.core.http_fetcher import HybridFetcher
+from comichub.core.ratelimit import RateLimiter
+
+
+@pytest.fixture
+def hybrid():
+    fetcher = HybridFetcher()
+    fetcher.seed_cookies = False
+    fetcher.limiter = RateLimiter({'enabled': False})
+    fetcher.breakers = CircuitBreakers({'enabled': False})
+    fetcher.timeout = 2
+    yield fetcher
+    fetcher.close()
+
+
+@pytest.fixture
+def refused_url():
+    # 绑定后不监听的端口：连接立即被拒绝
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    yield f"http://127.0.0.1:{sock.getsockname()[1]}/"
+    sock.close()
+
+
+def test_parallel_failures_disable_http(hybrid, refused_url):
+    hybrid.max_failures = 20
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(hybrid._http_get, [refused_url] * 20))
+
+    assert results == [None] * 20
+    assert hybrid._consecutive_failures == 20
+    assert hybrid._http_disabled
+
+
+def test_failures_below_limit_keep_http(hybrid, refused_url):
+    hybrid.max_failures = 3
+    hybrid._http_get(refused_url)
+    hybrid._http_get(refused_url)
+
+    assert not hybrid._http_disabled
@@ -0,0 +1,97 @@
+"""页级下载队列测试（用替身代替数据库）"""
+
+import time
+
+from comichub.downloader.jobqueue import ImageJobQueue
+
+
+class LeaseDatabase:
+    """只实现领取 / 续约 / 完成 / 章节图片查询的数据库替身"""
+
+    def __init__(self, rows, images=()):
+        self.rows = rows
+        self.images = list(images)
+        self.renewals = []
+        self.completed = []
+
+    def enqueue_images(self, chapter_id, images):
+        pass
+
+    def get_lease_owners(self, chapter_id):
+        return []
+
+    def release_leases(self, chapter_id, owners):
+        pass
+
+    def get_chapter_images(self, chapter_id):
+        return self.images
+
+    def lease_images(self, chapter_id, owner, lease_seconds, max_attempts):
+        return self.rows
+
+    def renew_leases(self, image_ids, owner, lease_seconds):
+        self.renewals.append((sorted(image_ids), owner, lease_seconds))
+        return len(image_ids)
+
+    def complete_image(self, image_id):
+        self.completed.append(image_id)
+
+
+def make_queue(lease_seconds=3):
+    db = LeaseDatabase([{'id': 1}, {'id': 2}, {'id': 3}])
+    queue = ImageJobQueue(db, lease_seconds=lease_seconds)
+    return queue, db
+
+
+def test_renew_waits_for_interval():
+    queue, db = make_queue()
+    assert len(queue.prepare(1, [])) == 3
+
+    assert queue.renew() == 0
+    assert db.renewals == []
+
+
+def test_renew_only_held_leases():
+    queue, db = make_queue()
+    queue.prepare(1, [])
+    queue.complete(2)
+    queue._renewed_at -= queue.renew_interval + 1
+
+    assert queue.renew() == 2
+    assert db.renewals == [([1, 3], queue.owner, 3)]
+    # 刚续约过，不重复写数据库
+    assert queue.renew() == 0
+    assert len(db.renewals) == 1
+
+
+def test_renew_failure_is_logged_not_raised():
+    queue, db = make_queue()
+    queue.prepare(1, [])
+    queue._renewed_at -= queue.renew_interval + 1
+
+    def broken(*args):
+        raise ConnectionError('database unavailable')
+    db.renew_leases = broken
+
+    assert queue.renew() == 0
+
+
+def test_chapter_complete_requires_every_page(tmp_path):
+    done = tmp_path / '1.jpg'
+    done.write_bytes(b'image')
+    db = LeaseDatabase([], images=[{'status': 'done', 'file_path': str(done)},
+                                   {'status': 'in_flight', 'file_path': str(tmp_path / '2.jpg')}])
+    queue = ImageJobQueue(db)
+
+    # 第 2 页由其他进程持有，章节尚未完成
+    assert not queue.chapter_complete(1)
+
+    (tmp_path / '2.jpg').write_bytes(b'image')
+    db.images[1]['status'] = 'done'
+    assert queue.chapter_complete(1)
+
+
+def test_chapter_complete_missing_file(tmp_path):
+    db = LeaseDatabase([], images=[{'status': 'done', 'file_path': str(tmp_path / '1.jpg')}])
+    assert not ImageJobQueue(db).chapter_complete(1)
+    assert not ImageJobQueue(LeaseDatabase([])).chapter_complete(1)
@@ -0,0 +1,75 @@
+"""章节流水线测试"""
+
+import threading
+import time
+
+import pytest
+
+from comichub.downloader.pipeline import prefetch
+
+
+class Source:
+    """记录生产进度的结果序列"""
+
+    def __init__(self, count: int, fail_at: int = None):
+        self.count = count
+        self.fail_at = fail_at
+        self.produced = 0
+        self.closed = False
+        self.thread = None
+
+    def __iter__(self):
+        self.thread = threading.current_thread()
+        try:
+            for i in range(self.count):
+                if i == self.fail_at:
+                    raise ValueError(f"resolve failed at {i}")
+                self.produced += 1
+                yield i
+        finally:
+            self.closed = True
+
+
+def test_preserves_order():
+    assert list(prefetch(Source(50), 3)) == list(range(50))
+
+
+def test_runs_source_in_background_thread():
+    source = Source(3)
+    assert list(prefetch(source, 2, name='test-prefetch')) == [0, 1, 2]
+    assert source.thread.name == 'test-prefetch'
+
+
+def test_backpressure_bounds_lookahead():
+    source = Source(100)
+    items = prefetch(source, 2)
+    assert next(items) == 0
+    time.sleep(0.2)
+
+    # 队列容量 2，外加生产者手中等待放入的一个
+    assert source.produced <= 1 + 2 + 1
+    items.close()
+
+
+def test_close_stops_producer():
+    source = Source(100)
+    items = prefetch(source, 2)
+    assert next(items) == 0
+
+    items.close()
+
+    assert source.closed
+    assert source.produced < 100
+
+
+def test_producer_error_raised_in_order():
+    items = prefetch(Source(10, fail_at=3), 2)
+    assert [next(items) for _ in range(3)] == [0, 1, 2]
+    with pytest.raises(ValueError, match='at 3'):
+        next(items)
+
+
+def test_zero_depth_is_serial():
+    source = Source(3)
+    assert list(prefetch(source, 0)) == [0, 1, 2]
+    assert source.thread is threading.current_thread()
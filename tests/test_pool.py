@@ -0,0 +1,107 @@
+"""WebDriver 池测试（用替身代替 Chrome）"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from comichub.core import pool as pool_module
+from comichub.core.pool import FetcherPool, resolve_pool_size
+
+
+class FakeFetcher:
+    """记录实例数和并发使用情况的抓取器替身"""
+
+    created = 0
+    fail_next = 0
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def __init__(self, headless=True, config_path="config.yaml"):
+        with FakeFetcher.lock:
+            if FakeFetcher.fail_next:
+                FakeFetcher.fail_next -= 1
+                raise RuntimeError('chrome failed to start')
+            FakeFetcher.created += 1
+        # 启动 Chrome 需要时间，放大并发借用时的竞争窗口
+        time.sleep(0.05)
+        self.closed = False
+        self.in_use = False
+
+    def get_images(self, chapter_url):
+        assert not self.in_use, '同一个抓取器被两个线程同时使用'
+        self.in_use = True
+        with FakeFetcher.lock:
+            FakeFetcher.active += 1
+            FakeFetcher.peak = max(FakeFetcher.peak, FakeFetcher.active)
+        time.sleep(0.02)
+        with FakeFetcher.lock:
+            FakeFetcher.active -= 1
+        self.in_use = False
+        return {'images': [{'page': 1, 'url': chapter_url + '/1.jpg'}], 'total_count': 1}
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def fake_fetcher(monkeypatch):
+    FakeFetcher.created = 0
+    FakeFetcher.fail_next = 0
+    FakeFetcher.active = 0
+    FakeFetcher.peak = 0
+    monkeypatch.setattr(pool_module, 'ManhuaGuiFetcherSelenium', FakeFetcher)
+
+
+def test_concurrent_borrowers_respect_size():
+    pool = FetcherPool(size=2)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(pool.get_images, [f"http://example.com/{i}" for i in range(24)]))
+
+    assert len(results) == 24
+    assert FakeFetcher.created == 2
+    assert FakeFetcher.peak <= 2
+    pool.close()
+
+
+def test_failed_spawn_releases_slot():
+    pool = FetcherPool(size=2)
+    with pool.borrow():
+        FakeFetcher.fail_next = 1
+        with pytest.raises(RuntimeError):
+            with pool.borrow():
+                pass
+        # 启动失败的名额已释放，可以重新启动
+        with pool.borrow() as fetcher:
+            assert fetcher is not None
+
+    assert FakeFetcher.created == 2
+    pool.close()
+
+
+def test_imap_images_keeps_order():
+    pool = FetcherPool(size=3)
+    urls = [f"http://example.com/{i}" for i in range(10)]
+
+    results = list(pool.imap_images(urls))
+
+    assert [result['images'][0]['url'] for result in results] == [url + '/1.jpg' for url in urls]
+    assert FakeFetcher.created <= 3
+    pool.close()
+
+
+def test_close_closes_all_instances():
+    pool = FetcherPool(size=2)
+    with pool.borrow() as first, pool.borrow() as second:
+        pass
+    pool.close()
+
+    assert first.closed and second.closed
+
+
+def test_resolve_pool_size_memory_budget():
+    assert resolve_pool_size({'pool_size': 4}) == 4
+    assert resolve_pool_size({'pool_size': 4, 'memory_budget_mb': 1000, 'driver_memory_mb': 400}) == 2
+    assert resolve_pool_size({'pool_size': 0}) == 1
@@ -0,0 +1,53 @@
+"""持久化配置目录测试"""
+
+import yaml
+
+from comichub.core import fetcher as fetcher_module
+from comichub.core import profile as profile_module
+from comichub.core.profile import ProfileLock, acquire_profile_dir
+
+
+def test_lock_is_exclusive(tmp_path):
+    first = ProfileLock(tmp_path / 'slot-0')
+    second = ProfileLock(tmp_path / 'slot-0')
+
+    assert first.acquire()
+    assert not second.acquire()
+    first.release()
+    assert second.acquire()
+    second.release()
+
+
+def test_acquire_uses_next_free_slot(tmp_path):
+    first_dir, first_lock = acquire_profile_dir(str(tmp_path))
+    second_dir, second_lock = acquire_profile_dir(str(tmp_path))
+
+    assert (first_dir.name, second_dir.name) == ('slot-0', 'slot-1')
+    first_lock.release()
+    second_lock.release()
+
+
+def test_no_lock_support_refuses_profile(tmp_path, monkeypatch):
+    monkeypatch.setattr(profile_module, 'fcntl', None)
+    monkeypatch.setattr(profile_module, 'msvcrt', None)
+
+    assert acquire_profile_dir(str(tmp_path)) is None
+
+
+def test_failed_driver_start_releases_profile(tmp_path, monkeypatch):
+    config_path = tmp_path / 'config.yaml'
+    config_path.write_text(yaml.safe_dump({
+        'browser': {'profile': {'enabled': True, 'dir': str(tmp_path / 'profiles')}}}))
+
+    def broken_chrome(*args, **kwargs):
+        raise RuntimeError('chrome failed to start')
+    monkeypatch.setattr(fetcher_module.webdriver, 'Chrome', broken_chrome)
+
+    fetcher = fetcher_module.ManhuaGuiFetcherSelenium(config_path=str(config_path))
+
+    assert fetcher.driver is None
+    assert fetcher._profile_lock is None
+    # 配置目录已释放，下一个实例仍可使用 slot-0
+    profile_dir, lock = acquire_profile_dir(str(tmp_path / 'profiles'))
+    assert profile_dir.name == 'slot-0'
+    lock.release()
@@ -0,0 +1,84 @@
+"""按主机限速测试"""
+
+import time
+from email.utils import formatdate
+
+import pytest
+
+from comichub.core.ratelimit import RateLimiter, TokenBucket, parse_retry_after
+
+URL = 'http://img.example.com/1.jpg'
+
+
+def test_parse_retry_after_seconds():
+    assert parse_retry_after('120') == 120.0
+    assert parse_retry_after(' 5 ') == 5.0
+
+
+def test_parse_retry_after_http_date():
+    delay = parse_retry_after(formatdate(time.time() + 30, usegmt=True))
+    assert 28 <= delay <= 30
+    assert parse_retry_after(formatdate(time.time() - 30, usegmt=True)) == 0.0
+
+
+def test_parse_retry_after_invalid():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('') is None
+    assert parse_retry_after('soon') is None
+
+
+def test_token_bucket_burst_then_wait():
+    bucket = TokenBucket(rate=10, burst=3)
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+
+def test_token_bucket_try_take():
+    bucket = TokenBucket(rate=1, burst=2)
+    assert bucket.try_take()
+    assert bucket.try_take()
+    assert not bucket.try_take()
+    # 取不到令牌时不预约，不影响后续等待时间
+    assert bucket.reserve() == pytest.approx(1.0, abs=0.01)
+
+
+def test_token_bucket_pause():
+    bucket = TokenBucket(rate=0, burst=1)
+    assert bucket.try_take()
+    bucket.pause(5)
+    assert not bucket.try_take()
+    assert bucket.reserve() == pytest.approx(5, abs=0.05)
+
+
+def test_try_acquire_per_host():
+    limiter = RateLimiter({'default': {'rate': 0.001, 'burst': 1},
+                           'hosts': {'fast.example.com': {'rate': 1000, 'burst': 5}}})
+    assert limiter.try_acquire(URL)
+    assert not limiter.try_acquire(URL)
+    # 其他主机有独立的令牌桶
+    assert limiter.try_acquire('http://other.example.com/1.jpg')
+    assert all(limiter.try_acquire('http://fast.example.com/1.jpg') for _ in range(5))
+
+
+def test_try_acquire_disabled_respects_pause():
+    limiter = RateLimiter({'enabled': False, 'backoff': {'jitter': False}})
+    assert all(limiter.try_acquire(URL) for _ in range(100))
+    limiter.penalize(URL, 0, retry_after=10)
+    assert not limiter.try_acquire(URL)
+    assert limiter.try_acquire('http://other.example.com/1.jpg')
+
+
+def test_penalize_prefers_retry_after():
+    limiter = RateLimiter({'backoff': {'base': 1, 'max': 60, 'jitter': False}})
+    assert limiter.penalize(URL, 0) == 1
+    assert limiter.penalize(URL, 3) == 8
+    assert limiter.penalize(URL, 0, retry_after=30) == 30
+    # Retry-After 不超过退避上限
+    assert limiter.penalize(URL, 0, retry_after=600) == 60
+
+
+def test_backoff_delay_jitter_bounds():
+    limiter = RateLimiter({'backoff': {'base': 1, 'max': 4}})
+    for attempt in range(6):
+        assert 0 <= limiter.backoff_delay(attempt) <= min(4, 2 ** attempt)
@@ -0,0 +1,229 @@
+"""图片落盘测试"""
+
+import gzip
+import json
+import re
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+import requests
+
+from comichub.downloader.storage import (
+    IncompleteDownloadError,
+    is_partial_file,
+    part_path,
+    resume_meta_path,
+    resume_request_headers,
+    save_response,
+)
+
+BODY = bytes(range(256)) * 400
+
+
+def image_handler(body: bytes = BODY, cut_at: int = None):
+    """返回完整图片的处理器，cut_at 指定时发送到该字节数后断开连接"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body[:cut_at] if cut_at is not None else body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def range_handler(body: bytes = BODY, etag: str = '"v1"', cut_at: int = None, requests_seen: list = None):
+    """支持 Range + If-Range 的处理器，cut_at 指定时完整响应发送到该字节数后断开连接"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if requests_seen is not None:
+                requests_seen.append(dict(self.headers))
+            match = re.match(r'bytes=(\d+)-$', self.headers.get('Range', ''))
+            if match and self.headers.get('If-Range') == etag:
+                start = int(match.group(1))
+                self.send_response(206)
+                self.send_header('Content-Range', f"bytes {start}-{len(body) - 1}/{len(body)}")
+                self.send_header('Content-Length', str(len(body) - start))
+                self.send_header('ETag', etag)
+                self.end_headers()
+                self.wfile.write(body[start:])
+                return
+
+            self.send_response(200)
+            self.send_header('Accept-Ranges', 'bytes')
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body[:cut_at] if cut_at is not None else body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+class GzipHandler(BaseHTTPRequestHandler):
+    """以 Content-Encoding: gzip 返回图片"""
+
+    def do_GET(self):
+        data = gzip.compress(BODY)
+        self.send_response(200)
+        self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def download(url: str, save_path, **kwargs):
+    with requests.get(url, stream=True) as response:
+        return save_response(response, save_path, **kwargs)
+
+
+def test_save_response_renames_part_file(http_server, tmp_path):
+    base_url = http_server(image_handler())
+    save_path = tmp_path / '01.jpg'
+
+    written, resumed = download(f"{base_url}/01.jpg", save_path, fsync='full')
+
+    assert (written, resumed) == (len(BODY), 0)
+    assert save_path.read_bytes() == BODY
+    assert not part_path(save_path).exists()
+    assert not resume_meta_path(save_path).exists()
+
+
+def test_truncated_body_leaves_no_final_file(http_server, tmp_path):
+    base_url = http_server(image_handler(cut_at=1000))
+    save_path = tmp_path / '01.jpg'
+
+    with pytest.raises((IOError, requests.RequestException)):
+        download(f"{base_url}/01.jpg", save_path)
+
+    assert not save_path.exists()
+    # 服务器不支持续传时不保留临时文件
+    assert not part_path(save_path).exists()
+
+
+def test_on_chunk_error_aborts_transfer(http_server, tmp_path):
+    base_url = http_server(image_handler())
+    save_path = tmp_path / '01.jpg'
+
+    def stall(nbytes):
+        raise IOError('stalled')
+
+    with pytest.raises(IOError, match='stalled'):
+        download(f"{base_url}/01.jpg", save_path, on_chunk=stall)
+
+    assert not save_path.exists()
+    assert not part_path(save_path).exists()
+
+
+def interrupted_download(http_server, save_path, cut_at: int, etag: str = '"v1"'):
+    """模拟中断的下载（与下载器一样带 on_chunk，数据到达即写入），返回保留的临时文件字节数"""
+    base_url = http_server(range_handler(etag=etag, cut_at=cut_at))
+    with pytest.raises((IOError, requests.RequestException)):
+        download(f"{base_url}/01.jpg", save_path, on_chunk=lambda nbytes: None)
+    return part_path(save_path).stat().st_size
+
+
+def test_interrupted_download_keeps_part_for_resume(http_server, tmp_path):
+    save_path = tmp_path / '01.jpg'
+
+    offset = interrupted_download(http_server, save_path, cut_at=30000)
+
+    assert offset == 30000
+    assert not save_path.exists()
+    meta = json.loads(resume_meta_path(save_path).read_text(encoding='utf-8'))
+    assert meta == {'etag': '"v1"', 'last_modified': None, 'length': len(BODY)}
+    assert resume_request_headers(save_path) == ({'Range': 'bytes=30000-', 'If-Range': '"v1"'}, 30000)
+
+
+def test_resume_with_range(http_server, tmp_path):
+    save_path = tmp_path / '01.jpg'
+    offset = interrupted_download(http_server, save_path, cut_at=30000)
+    seen = []
+    base_url = http_server(range_handler(requests_seen=seen))
+
+    headers, offset = resume_request_headers(save_path)
+    with requests.get(f"{base_url}/01.jpg", headers=headers, stream=True) as response:
+        written, resumed = save_response(response, save_path, offset=offset)
+
+    assert seen[0]['Range'] == 'bytes=30000-'
+    assert (written, resumed) == (len(BODY) - 30000, 30000)
+    assert save_path.read_bytes() == BODY
+    assert not part_path(save_path).exists()
+    assert not resume_meta_path(save_path).exists()
+
+
+def test_resume_restarts_when_file_changed(http_server, tmp_path):
+    save_path = tmp_path / '01.jpg'
+    interrupted_download(http_server, save_path, cut_at=30000)
+    changed = bytes(reversed(BODY))
+    base_url = http_server(range_handler(body=changed, etag='"v2"'))
+
+    # If-Range 不匹配：服务器返回完整的 200 响应，从头写入
+    headers, offset = resume_request_headers(save_path)
+    with requests.get(f"{base_url}/01.jpg", headers=headers, stream=True) as response:
+        written, resumed = save_response(response, save_path, offset=offset)
+
+    assert (written, resumed) == (len(changed), 0)
+    assert save_path.read_bytes() == changed
+
+
+def test_resume_rejects_mismatched_content_range(http_server, tmp_path):
+    save_path = tmp_path / '01.jpg'
+    interrupted_download(http_server, save_path, cut_at=30000)
+    base_url = http_server(range_handler())
+
+    with requests.get(f"{base_url}/01.jpg", headers={'Range': 'bytes=100-', 'If-Range': '"v1"'},
+                      stream=True) as response:
+        with pytest.raises(IncompleteDownloadError):
+            save_response(response, save_path, offset=30000)
+
+    assert not part_path(save_path).exists()
+    assert resume_request_headers(save_path) == ({}, 0)
+
+
+def test_weak_etag_not_resumable(http_server, tmp_path):
+    save_path = tmp_path / '01.jpg'
+    base_url = http_server(range_handler(etag='W/"v1"', cut_at=30000))
+
+    with pytest.raises((IOError, requests.RequestException)):
+        download(f"{base_url}/01.jpg", save_path)
+
+    assert not part_path(save_path).exists()
+    assert resume_request_headers(save_path) == ({}, 0)
+
+
+def test_is_partial_file(tmp_path):
+    save_path = tmp_path / '01.jpg'
+    assert is_partial_file(part_path(save_path))
+    assert is_partial_file(resume_meta_path(save_path))
+    assert not is_partial_file(save_path)
+
+
+def test_encoded_body_decoded_with_on_chunk(http_server, tmp_path):
+    base_url = http_server(GzipHandler)
+    save_path = tmp_path / '01.jpg'
+    chunks = []
+
+    written, _ = download(f"{base_url}/01.jpg", save_path, on_chunk=chunks.append)
+
+    assert save_path.read_bytes() == BODY
+    assert written == len(BODY) == sum(chunks)
+
+
+def test_encoded_body_decoded_without_on_chunk(http_server, tmp_path):
+    base_url = http_server(GzipHandler)
+    save_path = tmp_path / '01.jpg'
+
+    download(f"{base_url}/01.jpg", save_path)
+
+    assert save_path.read_bytes() == BODY
@@ -0,0 +1,162 @@
+"""阅读页内嵌脚本解码测试"""
+
+import json
+import random
+import re
+
+from comichub.core.unpacker import (
+    _encode_base,
+    decode_chapter_images,
+    extract_chapter_data,
+    lzstring_decompress_from_base64,
+    signed_url_expiry,
+    unpack_packed_script,
+)
+
+_BASE64_ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/="
+
+
+def lzstring_compress_to_base64(text: str) -> str:
+    """LZString.compressToBase64（测试用，生成与页面相同格式的关键字表）"""
+    dictionary = {}
+    to_create = set()
+    data = []
+    state = {'val': 0, 'position': 0, 'enlarge_in': 2, 'num_bits': 2}
+
+    def write_bits(value: int, count: int):
+        for _ in range(count):
+            state['val'] = (state['val'] << 1) | (value & 1)
+            value >>= 1
+            if state['position'] == 5:
+                state['position'] = 0
+                data.append(_BASE64_ALPHABET[state['val']])
+                state['val'] = 0
+            else:
+                state['position'] += 1
+
+    def enlarge():
+        state['enlarge_in'] -= 1
+        if state['enlarge_in'] == 0:
+            state['enlarge_in'] = 1 << state['num_bits']
+            state['num_bits'] += 1
+
+    def emit(w: str):
+        if w in to_create:
+            code = ord(w[0])
+            if code < 256:
+                write_bits(0, state['num_bits'])
+                write_bits(code, 8)
+            else:
+                write_bits(1, state['num_bits'])
+                write_bits(code, 16)
+            enlarge()
+            to_create.discard(w)
+        else:
+            write_bits(dictionary[w], state['num_bits'])
+        enlarge()
+
+    w = ''
+    for c in text:
+        if c not in dictionary:
+            dictionary[c] = len(dictionary) + 3
+            to_create.add(c)
+        if w + c in dictionary:
+            w = w + c
+        else:
+            emit(w)
+            dictionary[w + c] = len(dictionary) + 3
+            w = c
+    if w:
+        emit(w)
+    write_bits(2, state['num_bits'])
+
+    while True:
+        state['val'] <<= 1
+        if state['position'] == 5:
+            data.append(_BASE64_ALPHABET[state['val']])
+            break
+        state['position'] += 1
+
+    result = ''.join(data)
+    return result + '=' * (-len(result) % 4)
+
+
+def pack(source: str, a: int = 62):
+    """按 p,a,c,k,e,d 格式打包脚本（测试用）"""
+    words = []
+    for word in re.findall(r"\b\w+\b", source, re.ASCII):
+        if word not in words:
+            words.append(word)
+    mapping = {word: _encode_base(i, a) for i, word in enumerate(words)}
+    p = re.sub(r"\b\w+\b", lambda m: mapping[m.group(0)], source, flags=re.ASCII)
+    return p, a, len(words), words
+
+
+def reader_page(chapter_data: dict) -> str:
+    """生成带打包脚本的阅读页 HTML"""
+    source = f"SMH.imgData({json.dumps(chapter_data, ensure_ascii=False)}).preInit();"
+    p, a, c, words = pack(source)
+    p = p.replace('\\', '\\\\').replace("'", "\\'")
+    k = lzstring_compress_to_base64('|'.join(words))
+    return ("<html><script>window[\"\\x65\\x76\\x61\\x6c\"](function(p,a,c,k,e,d){return p;}"
+            f"('{p}',{a},{c},'{k}'['\\x73\\x70\\x6c\\x69\\x63']('\\x7c'),0,{{}}))</script></html>")
+
+
+def test_lzstring_round_trip():
+    rng = random.Random(1)
+    samples = ['', 'a', 'aaaaaaaaaa', 'SMH|imgData|files|path|len|sl|preInit', '第1话|第2话|中文标题']
+    samples += [''.join(rng.choice('ab|.jpg第话') for _ in range(rng.randint(1, 300))) for _ in range(50)]
+    for text in samples:
+        assert lzstring_decompress_from_base64(lzstring_compress_to_base64(text)) == text
+
+
+def test_lzstring_corrupt_data():
+    assert lzstring_decompress_from_base64('////') in ('', None)
+
+
+def test_unpack_packed_script():
+    source = 'var files=["1.jpg","2.jpg"];var path="/ps1/x/";'
+    p, a, c, words = pack(source)
+    assert p != source
+    assert unpack_packed_script(p, a, c, words) == source
+
+
+def test_unpack_keeps_empty_keywords():
+    # 关键字表中为空的项保留原标识符
+    assert unpack_packed_script('0 1', 62, 2, ['', 'b']) == '0 b'
+
+
+def test_unpack_tokens_adjacent_to_cjk():
+    # JS 的 \w 只匹配 ASCII：中文字符紧邻的标识符仍需替换（169f313）
+    p, a, c, words = pack('x y z w "第3话" ["y.jpg"]')
+    assert '第3话' not in p
+    assert unpack_packed_script(p, a, c, words) == 'x y z w "第3话" ["y.jpg"]'
+    assert unpack_packed_script('"第1话"', 62, 2, ['zero', 'one']) == '"第one话"'
+
+
+def test_extract_chapter_data():
+    chapter = {'bid': 1128, 'cid': 9771, 'files': ['1.jpg.webp', '第2话.jpg'],
+               'path': '/ps1/h/海贼王/第1话/', 'len': 2, 'sl': {'e': 1700000000, 'm': 'abc'}}
+    assert extract_chapter_data(reader_page(chapter)) == chapter
+
+
+def test_extract_chapter_data_without_script():
+    assert extract_chapter_data('<html><body>no script</body></html>') is None
+
+
+def test_decode_chapter_images():
+    chapter = {'files': ['1.jpg.webp', '2.jpg.webp', '3.jpg.webp'], 'path': '/ps1/a/第1话/', 'len': 3,
+               'sl': {'e': 1700000000, 'm': 'abc'}}
+    result = decode_chapter_images(reader_page(chapter), image_host='https://i.example.com/')
+
+    assert result['total_count'] == 3
+    assert [img['page'] for img in result['images']] == [1, 2, 3]
+    assert result['images'][0]['url'] == (
+        'https://i.example.com/ps1/a/%E7%AC%AC1%E8%AF%9D/1.jpg.webp?e=1700000000&m=abc')
+
+
+def test_signed_url_expiry():
+    assert signed_url_expiry('https://i.example.com/1.jpg?e=1700000000&m=abc') == 1700000000
+    assert signed_url_expiry('https://i.example.com/1.jpg?e=1700000000000') == 1700000000
+    assert signed_url_expiry('https://i.example.com/1.jpg?m=abc') is None
+    assert signed_url_expiry('https://i.example.com/1.jpg?e=soon') is None
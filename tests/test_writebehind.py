@@ -0,0 +1,102 @@
+"""数据库写缓冲测试"""
+
+import threading
+import time
+
+from comichub.core.writebehind import WriteBehind
+
+
+class RecordingDatabase:
+    """记录 write_batch 调用的数据库替身（可指定前几次写入失败）"""
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.batches = []
+        self.written = threading.Event()
+
+    def write_batch(self, done, failed, chapters, history, expired):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError('database unavailable')
+        self.batches.append({'done': list(done), 'failed': list(failed), 'chapters': list(chapters),
+                             'history': list(history), 'expired': list(expired)})
+        self.written.set()
+        return len(done) + len(failed) + len(chapters) + len(history) + len(expired)
+
+
+def test_flush_writes_all_buffers():
+    db = RecordingDatabase()
+    writer = WriteBehind(db, batch_size=100, flush_interval=60)
+    writer.complete_image(1)
+    writer.fail_image(2, 'timeout')
+    writer.expire_image(3)
+    writer.mark_chapter_downloaded(10)
+    writer.add_fetch_history(chapter_id=10, fetch_type='chapter')
+
+    assert writer.flush() == 5
+    assert db.batches[0]['done'] == [1]
+    assert db.batches[0]['failed'] == [(2, 'timeout')]
+    assert db.batches[0]['expired'] == [3]
+    assert db.batches[0]['chapters'] == [10]
+    assert db.batches[0]['history'][0]['fetch_type'] == 'chapter'
+    assert writer.flush() == 0
+    writer.close()
+
+
+def test_background_flush_on_batch_size():
+    db = RecordingDatabase()
+    writer = WriteBehind(db, batch_size=3, flush_interval=60)
+    for image_id in range(3):
+        writer.complete_image(image_id)
+
+    assert db.written.wait(2)
+    assert db.batches[0]['done'] == [0, 1, 2]
+    writer.close()
+
+
+def test_background_flush_on_interval():
+    db = RecordingDatabase()
+    writer = WriteBehind(db, batch_size=100, flush_interval=0.05)
+    writer.complete_image(1)
+
+    assert db.written.wait(2)
+    writer.close()
+
+
+def test_failed_flush_is_retried_in_order():
+    db = RecordingDatabase(failures=1)
+    writer = WriteBehind(db, batch_size=100, flush_interval=60)
+    writer.complete_image(1)
+    writer.complete_image(2)
+
+    assert writer.flush() == 0
+    writer.complete_image(3)
+    assert writer.stats()['pending'] == 3
+    assert writer.flush() == 3
+    assert db.batches[0]['done'] == [1, 2, 3]
+    writer.close()
+
+
+def test_drops_oldest_when_over_capacity():
+    db = RecordingDatabase()
+    writer = WriteBehind(db, batch_size=100, flush_interval=60, max_pending=3)
+    for image_id in range(1, 6):
+        writer.complete_image(image_id)
+
+    assert writer.rows_dropped == 2
+    assert writer.flush() == 3
+    assert db.batches[0]['done'] == [3, 4, 5]
+    writer.close()
+
+
+def test_close_flushes_remaining_rows():
+    db = RecordingDatabase()
+    writer = WriteBehind(db, batch_size=100, flush_interval=60)
+    writer.complete_image(1)
+
+    started = time.monotonic()
+    writer.close()
+
+    assert time.monotonic() - started < 1
+    assert db.batches[0]['done'] == [1]
+    assert writer.rows_written == 1